@@ -0,0 +1,72 @@
+"""启动耗时检查：用 -X importtime 测量模块导入耗时，并确认没有提前导入重型依赖
+
+命令行版本只输出词频表、GUI窗口出现之前都不应导入matplotlib或NumPy。
+任一模块超出预算或提前导入了重型依赖时退出码为1，可直接用于CI。
+
+用法:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget-ms 150 --repeat 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 待检查的模块及其导入耗时预算（毫秒），预算按共享服务器上的冷启动留有余量
+MODULE_BUDGETS_MS = {
+    'ris_title_analyzer': 300,
+    'ris_title_analyzer_gui': 400,
+}
+# 启动时不应导入的重型依赖
+HEAVY_MODULES = ('matplotlib', 'numpy', 'pyarrow')
+
+
+def measure_import(module, repeat):
+    """在新的解释器中导入模块，返回 (最短导入耗时毫秒, 被提前导入的重型依赖)"""
+    code = (f"import sys, {module}; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    best = None
+    loaded = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        # importtime每行格式: "import time: self [us] | cumulative | imported package"
+        for line in result.stderr.splitlines():
+            fields = line.split('|')
+            if len(fields) == 3 and fields[2].strip() == module:
+                elapsed = int(fields[1]) / 1000
+                best = elapsed if best is None else min(best, elapsed)
+        loaded = [name for name in result.stdout.strip().split(',') if name]
+    return best, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="检查模块导入耗时和重型依赖的延迟导入")
+    parser.add_argument('--budget-ms', type=float, help="统一的导入耗时预算（毫秒），默认按模块分别设定")
+    parser.add_argument('--repeat', type=int, default=3, help="重复次数，取最短耗时（默认3）")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module, budget in MODULE_BUDGETS_MS.items():
+        budget = args.budget_ms or budget
+        try:
+            elapsed, loaded = measure_import(module, args.repeat)
+        except subprocess.CalledProcessError as e:
+            # 例如缺少tkinter的环境，无法导入GUI模块
+            print(f"⚠️ {module}: 无法导入，跳过\n{e.stderr.strip().splitlines()[-1]}")
+            continue
+
+        status = "✓" if elapsed <= budget and not loaded else "❌"
+        print(f"{status} {module}: {elapsed:.1f} ms (预算 {budget:.0f} ms)")
+        if loaded:
+            print(f"   启动时导入了重型依赖: {', '.join(loaded)}")
+        if status != "✓":
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
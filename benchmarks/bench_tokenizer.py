@@ -0,0 +1,90 @@
+"""分词器基准测试：对比原逐标题re.sub+split实现与预编译单遍分词的吞吐量
+
+用法:
+    python benchmarks/bench_tokenizer.py                 # 使用合成标题
+    python benchmarks/bench_tokenizer.py export.ris      # 使用真实RIS文件的标题
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ris_title_analyzer import STOP_WORDS, count_words, normalize_word, parse_ris_file  # noqa: E402
+
+VOCABULARY = (
+    "deep learning neural network networks control system systems discrete event supervisory "
+    "climate change model models analysis analyses theory theories process processes data "
+    "optimization robust adaptive estimation graph graphs reinforcement policy policies "
+    "the of and for in on with a using based novel approach approaches via toward"
+).split()
+PUNCTUATION = ['', '', '', ',', ':', '-', '(', ')', "'s", '2.0', '3D']
+
+
+def synthetic_titles(count, seed=42):
+    """生成可复现的合成标题"""
+    rng = random.Random(seed)
+    titles = []
+    for _ in range(count):
+        words = [rng.choice(VOCABULARY) + rng.choice(PUNCTUATION) for _ in range(rng.randint(5, 16))]
+        words[0] = words[0].capitalize()
+        titles.append(' '.join(words))
+    return titles
+
+
+def legacy_count_words(titles, stop_words=STOP_WORDS):
+    """原实现：逐标题re.sub、split、isalpha、长度和停用词检查、规范化后再次检查"""
+    all_words = []
+    for title in titles:
+        clean_title = re.sub(r'[^\w\s]', ' ', title.lower())
+        words = clean_title.split()
+        filtered_words = []
+        for word in words:
+            if word.isalpha() and len(word) > 2 and word not in stop_words:
+                normalized_word = normalize_word(word)
+                if normalized_word not in stop_words:
+                    filtered_words.append(normalized_word)
+        all_words.extend(filtered_words)
+    return Counter(all_words)
+
+
+def best_of(func, repeat):
+    """多次运行取最短耗时"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="分词器吞吐量基准测试")
+    parser.add_argument('ris_file', nargs='?', help="RIS文件路径（省略时使用合成标题）")
+    parser.add_argument('--titles', type=int, default=200000, help="合成标题数量（默认200000）")
+    parser.add_argument('--repeat', type=int, default=3, help="重复次数，取最短耗时（默认3）")
+    args = parser.parse_args(argv)
+
+    titles = parse_ris_file(args.ris_file) if args.ris_file else synthetic_titles(args.titles)
+    raw_tokens = sum(len(title.split()) for title in titles)
+    print(f"标题数量: {len(titles):,}，原始词数: {raw_tokens:,}")
+
+    legacy_time, legacy_counts = best_of(lambda: legacy_count_words(titles), args.repeat)
+    new_time, new_result = best_of(lambda: count_words(titles), args.repeat)
+
+    identical = list(legacy_counts.most_common()) == list(new_result[0].most_common())
+    print(f"原实现:   {legacy_time:.3f} 秒, {raw_tokens / legacy_time:,.0f} 词/秒")
+    print(f"新分词器: {new_time:.3f} 秒, {raw_tokens / new_time:,.0f} 词/秒")
+    print(f"加速比:   {legacy_time / new_time:.2f}x")
+    print(f"结果一致: {'是' if identical else '否'}")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
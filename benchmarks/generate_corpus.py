@@ -0,0 +1,146 @@
+"""合成RIS语料生成器：按固定随机种子生成可复现的RIS文件，用于基准测试
+
+生成的记录包含跨行标题、缺少ER标记的记录、缺少PY字段的记录和非ASCII字符，
+可按比例附带多行摘要（AB）和关键词（KW，每个一行或以分号分隔）；
+文件可以用UTF-8、带BOM的UTF-8、UTF-16或cp1252编码，UTF-8文件中还可按比例
+混入孤立的cp1252字节（模拟拼接不同来源导出文件时产生的坏字节）。
+记录逐条编码写入，生成500万条记录的文件也只占用很少内存。
+
+用法:
+    python benchmarks/generate_corpus.py corpus.ris --records 100000
+    python benchmarks/generate_corpus.py corpus_utf16.ris --records 1000 --encoding utf-16
+    python benchmarks/generate_corpus.py abstracts.ris --records 100000 --abstract-rate 0.9 --keyword-rate 0.8
+"""
+import argparse
+import codecs
+import random
+import sys
+
+ENCODINGS = ('utf-8', 'utf-8-sig', 'utf-16', 'cp1252')
+
+SUBJECTS = (
+    "deep learning neural network networks control system systems discrete event supervisory "
+    "climate change model models analysis analyses theory theories process processes data "
+    "optimization robust adaptive estimation graph graphs reinforcement policy policies "
+    "study studies approach approaches method methods framework frameworks transformer "
+    "attention protein structure prediction sensor sensors signal signals image images "
+    "classification segmentation detection diffusion dynamics stochastic bayesian inference"
+).split()
+FUNCTION_WORDS = "the of and for in on with a using based novel via toward towards from".split()
+ACCENTED = ("Schrödinger", "Poincaré", "Gödel", "naïve", "café", "Möbius", "Erdős")
+SEPARATORS = (' ', ' ', ' ', ' ', ': ', ', ', ' – ', ' - ', ' (', ') ')
+JOURNALS = ("IEEE Transactions on Automatic Control", "Nature", "Automatica",
+            "Journal of Machine Learning Research", "Physical Review E")
+# UTF-8文件中混入的孤立cp1252字节：弯引号、破折号、é
+STRAY_BYTES = (b'\x93', b'\x94', b'\x96', b'\x97', b'\xe9')
+
+
+def make_title(rng):
+    """生成一个标题，约5%含带重音符号的人名"""
+    words = []
+    for _ in range(rng.randint(4, 18)):
+        words.append(rng.choice(FUNCTION_WORDS) if rng.random() < 0.3 else rng.choice(SUBJECTS))
+        words.append(rng.choice(SEPARATORS))
+    if rng.random() < 0.05:
+        words.insert(rng.randrange(len(words)), rng.choice(ACCENTED) + ' ')
+    title = ''.join(words).strip(' -–:,(')
+    return title[0].upper() + title[1:]
+
+
+def make_keyword(rng):
+    """生成一个1到3个词的关键词短语"""
+    return ' '.join(rng.choice(SUBJECTS) for _ in range(rng.randint(1, 3)))
+
+
+def make_record(rng, multiline_rate, missing_er_rate, missing_year_rate, abstract_rate=0.0, keyword_rate=0.0):
+    """生成一条RIS记录（不含结尾的换行符差异）
+
+    abstract_rate和keyword_rate为0时不消耗随机数，生成的记录与不含摘要和关键词的版本完全相同。
+    """
+    lines = ['TY  - JOUR']
+    for _ in range(rng.randint(1, 4)):
+        lines.append(f"AU  - Author{rng.randint(1, 9999)}, {chr(rng.randint(65, 90))}.")
+
+    title = make_title(rng)
+    if rng.random() < multiline_rate and ' ' in title[20:]:
+        # 跨行标题：在第20个字符之后的空格处折行，续行缩进
+        cut = title.index(' ', 20)
+        lines.append(f"TI  - {title[:cut]}")
+        lines.append(f"   {title[cut + 1:]}")
+    else:
+        lines.append(f"TI  - {title}")
+
+    lines.append(f"T2  - {rng.choice(JOURNALS)}")
+    if abstract_rate and rng.random() < abstract_rate:
+        # 摘要由若干句组成，每两句折一行
+        sentences = [make_title(rng) + '.' for _ in range(rng.randint(4, 12))]
+        lines.append(f"AB  - {' '.join(sentences[:2])}")
+        lines.extend(' '.join(sentences[i:i + 2]) for i in range(2, len(sentences), 2))
+    if keyword_rate and rng.random() < keyword_rate:
+        keywords = [make_keyword(rng) for _ in range(rng.randint(3, 6))]
+        if rng.random() < 0.3:
+            lines.append(f"KW  - {'; '.join(keywords)}")
+        else:
+            lines.extend(f"KW  - {keyword}" for keyword in keywords)
+    if rng.random() >= missing_year_rate:
+        lines.append(f"PY  - {rng.randint(1990, 2024)}")
+    lines.append(f"DO  - 10.{rng.randint(1000, 9999)}/{rng.getrandbits(32):08x}")
+    if rng.random() >= missing_er_rate:
+        lines.append('ER  - ')
+    return lines
+
+
+def generate_corpus(file_path, records=10000, seed=42, encoding='utf-8', multiline_rate=0.1,
+                    missing_er_rate=0.02, missing_year_rate=0.05, stray_byte_rate=0.001,
+                    abstract_rate=0.0, keyword_rate=0.0):
+    """生成合成RIS文件，相同的参数总是生成完全相同的文件，返回写入的字节数"""
+    if encoding not in ENCODINGS:
+        raise ValueError(f"不支持的编码: {encoding}")
+    rng = random.Random(seed)
+    encoder = codecs.getincrementalencoder(encoding)()
+    written = 0
+
+    with open(file_path, 'wb') as file:
+        for index in range(records):
+            lines = make_record(rng, multiline_rate, missing_er_rate, missing_year_rate, abstract_rate, keyword_rate)
+            # 约十分之一的记录使用Windows换行符
+            newline = '\r\n' if index % 10 == 0 else '\n'
+            text = newline.join(lines) + newline + newline
+            if encoding == 'cp1252':
+                # cp1252无法表示的字符（如ő）替换为问号
+                text = text.encode('cp1252', errors='replace').decode('cp1252')
+            data = encoder.encode(text)
+            # 无论何种编码都消耗同样的随机数，保证同一种子在各编码下生成相同的记录
+            stray_byte = rng.choice(STRAY_BYTES) if rng.random() < stray_byte_rate else None
+            if stray_byte and encoding == 'utf-8':
+                data += stray_byte + b'\n'
+            file.write(data)
+            written += len(data)
+        written += file.write(encoder.encode('', final=True))
+
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成可复现的合成RIS语料")
+    parser.add_argument('output', help="输出文件路径")
+    parser.add_argument('--records', type=int, default=10000, help="记录数（默认10000，支持1千到500万）")
+    parser.add_argument('--seed', type=int, default=42, help="随机种子（默认42）")
+    parser.add_argument('--encoding', choices=ENCODINGS, default='utf-8', help="文件编码（默认utf-8）")
+    parser.add_argument('--multiline-rate', type=float, default=0.1, help="跨行标题比例（默认0.1）")
+    parser.add_argument('--missing-er-rate', type=float, default=0.02, help="缺少ER标记的记录比例（默认0.02）")
+    parser.add_argument('--stray-byte-rate', type=float, default=0.001,
+                        help="UTF-8文件中混入孤立cp1252字节的记录比例（默认0.001）")
+    parser.add_argument('--abstract-rate', type=float, default=0.0, help="带摘要(AB)的记录比例（默认0）")
+    parser.add_argument('--keyword-rate', type=float, default=0.0, help="带关键词(KW)的记录比例（默认0）")
+    args = parser.parse_args(argv)
+
+    size = generate_corpus(args.output, args.records, args.seed, args.encoding, args.multiline_rate,
+                           args.missing_er_rate, stray_byte_rate=args.stray_byte_rate,
+                           abstract_rate=args.abstract_rate, keyword_rate=args.keyword_rate)
+    print(f"✓ 已生成 {args.records:,} 条记录 ({size / 1024 / 1024:.1f} MB, {args.encoding}): {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""分析服务负载测试：并发上传合成RIS文件，记录吞吐量和延迟
+
+分两轮发送同样数量的请求：第一轮（cold）每个请求上传内容不同的文件，都需要进程池分析；
+第二轮（cached）重新上传同样的文件，应全部命中结果缓存。每个请求使用 wait=1，
+延迟为从开始上传到收到完整结果的时间。各并发客户端使用keep-alive连接。
+
+未指定 --url 时在随机端口上启动一个本机服务，测试结束后停止。
+
+用法:
+    python benchmarks/load_test.py --requests 100 --concurrency 8 --records 2000
+    python benchmarks/load_test.py --url http://127.0.0.1:8765 --json load.json
+"""
+import argparse
+import http.client
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_corpus import generate_corpus  # noqa: E402
+
+PHASES = ('cold', 'cached')
+
+
+def start_server(workers, max_queue):
+    """在随机端口上启动分析服务，返回 (进程, URL)"""
+    command = [sys.executable, os.path.join(ROOT, 'ris_server.py'), '--port', '0', '--max-queue', str(max_queue)]
+    if workers:
+        command += ['--workers', str(workers)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True, encoding='utf-8')
+    line = process.stdout.readline()
+    match = re.search(r'http://[\w.:]+:\d+', line)
+    if match is None:
+        process.kill()
+        raise RuntimeError(f"分析服务启动失败: {line.strip()}")
+    return process, match.group(0)
+
+
+def stop_server(process):
+    # SIGINT让服务正常关闭进程池并删除上传目录；Windows上只能直接结束进程
+    if os.name == 'nt':
+        process.terminate()
+    else:
+        process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_phase(url, payloads, concurrency, query):
+    """并发发送全部请求，返回 (各请求延迟秒数, 被拒绝或失败的请求数, 缓存命中数, 总耗时)"""
+    address = urlsplit(url)
+    local = threading.local()
+    lock = threading.Lock()
+    latencies = []
+    errors = 0
+    hits = 0
+
+    def send(payload):
+        nonlocal errors, hits
+        if getattr(local, 'conn', None) is None:
+            local.conn = http.client.HTTPConnection(address.hostname, address.port, timeout=600)
+        started = time.perf_counter()
+        try:
+            local.conn.request('POST', f'/jobs?wait=1&{query}', body=payload,
+                               headers={'Content-Type': 'application/octet-stream'})
+            response = local.conn.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            local.conn.close()
+            local.conn = None
+            with lock:
+                errors += 1
+            return
+        elapsed = time.perf_counter() - started
+        if response.getheader('Connection', '').lower() == 'close':
+            local.conn.close()
+            local.conn = None
+        data = json.loads(body)
+        with lock:
+            if response.status != 200 or data.get('status') != 'done':
+                errors += 1
+            else:
+                latencies.append(elapsed)
+                hits += data['cached']
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, payloads))
+    return latencies, errors, hits, time.perf_counter() - started
+
+
+def summarize(phase, latencies, errors, hits, seconds, total_bytes):
+    summary = {'phase': phase, 'requests': len(latencies) + errors, 'errors': errors, 'cache_hits': hits,
+               'seconds': round(seconds, 4), 'requests_per_second': round(len(latencies) / seconds, 2),
+               'mb_per_second': round(total_bytes / seconds / 1024 / 1024, 2)}
+    if latencies:
+        for name, fraction in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+            summary[f'{name}_ms'] = round(percentile(latencies, fraction) * 1000, 2)
+        summary['max_ms'] = round(max(latencies) * 1000, 2)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="并发上传RIS文件，测量分析服务的吞吐量和延迟")
+    parser.add_argument('--url', help="已运行的分析服务地址，省略时启动一个本机服务")
+    parser.add_argument('--workers', type=int, help="启动本机服务时的分析进程数（默认全部CPU核心）")
+    parser.add_argument('--requests', type=int, default=100, help="每轮的请求数（默认100）")
+    parser.add_argument('--concurrency', type=int, default=8, help="并发客户端数（默认8）")
+    parser.add_argument('--records', type=int, default=2000, help="每个上传文件的记录数（默认2000）")
+    parser.add_argument('--fields', default='TI', help="分析字段，逗号分隔（默认TI）")
+    parser.add_argument('--json', metavar='PATH', help="保存JSON格式的测试结果")
+    args = parser.parse_args(argv)
+
+    # 每个请求的文件内容不同（随机种子不同），cold轮不会命中缓存
+    with tempfile.TemporaryDirectory() as workdir:
+        payloads = []
+        corpus_path = os.path.join(workdir, 'corpus.ris')
+        for seed in range(args.requests):
+            generate_corpus(corpus_path, records=args.records, seed=seed, abstract_rate=0.5, keyword_rate=0.5)
+            with open(corpus_path, 'rb') as f:
+                payloads.append(f.read())
+    total_bytes = sum(len(payload) for payload in payloads)
+    print(f"📄 {args.requests} 个上传文件，每个 {args.records:,} 条记录，共 {total_bytes / 1024 / 1024:.1f} MB")
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_server(args.workers, max_queue=max(args.requests, args.concurrency))
+        print(f"🌐 已启动分析服务: {url}")
+    try:
+        results = []
+        for phase in PHASES:
+            latencies, errors, hits, seconds = run_phase(url, payloads, args.concurrency, f'fields={args.fields}')
+            results.append(summarize(phase, latencies, errors, hits, seconds, total_bytes))
+    finally:
+        if process is not None:
+            stop_server(process)
+
+    print(f"{'轮次':<8}{'请求数':>8}{'失败':>6}{'缓存命中':>10}{'请求/秒':>10}{'MB/秒':>9}"
+          f"{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'最大(ms)':>10}")
+    for summary in results:
+        print(f"{summary['phase']:<8}{summary['requests']:>8}{summary['errors']:>6}{summary['cache_hits']:>10}"
+              f"{summary['requests_per_second']:>10}{summary['mb_per_second']:>9}"
+              f"{summary.get('p50_ms', '-'):>10}{summary.get('p95_ms', '-'):>10}{summary.get('p99_ms', '-'):>10}"
+              f"{summary.get('max_ms', '-'):>10}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'concurrency': args.concurrency, 'records': args.records, 'fields': args.fields,
+                       'phases': results}, f, ensure_ascii=False, indent=2)
+        print(f"💾 测试结果已保存: {args.json}")
+    return 1 if any(summary['errors'] for summary in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
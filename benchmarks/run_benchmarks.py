@@ -0,0 +1,227 @@
+"""分阶段基准测试：在合成RIS语料上分别计时解析、词形规范化、词频分析和图表更新
+
+每个阶段记录最短耗时、吞吐量和峰值内存（tracemalloc统计的Python分配，单独运行一次，
+不影响计时），并与保存的基线比较：耗时或峰值内存超过基线的比例大于阈值时退出码为1。
+
+用法:
+    python benchmarks/run_benchmarks.py --records 20000 --save-baseline   # 记录基线
+    python benchmarks/run_benchmarks.py --records 20000                   # 与基线比较
+    python benchmarks/run_benchmarks.py --corpus big.ris --stages parse count_file
+
+基线与机器相关，请在同一台机器上记录和比较；默认的 benchmarks/baseline.json 已在.gitignore中忽略。
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_corpus import ENCODINGS, generate_corpus  # noqa: E402
+from ris_title_analyzer import (analyze_word_frequency, count_raw_tokens_parallel, normalize_word,  # noqa: E402
+                                parse_ris_file, plot_word_frequency, tokenize_title)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+STAGES = ('parse', 'normalize', 'analyze', 'count_file', 'plot', 'gui_chart')
+# 耗时低于该值（秒）的阶段受计时抖动影响大，比较时给予该值的绝对余量
+TIME_SLACK = 0.005
+
+
+def best_of(func, repeat):
+    """多次运行取最短耗时，返回 (耗时, 最后一次的结果)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def peak_memory(func):
+    """单独运行一次并返回tracemalloc统计的峰值内存（MB）"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def quiet(func):
+    """包装函数，丢弃其标准输出（被测函数会打印进度信息）"""
+    def run():
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            return func()
+    return run
+
+
+class GuiChartBench:
+    """在隐藏的Tk窗口中测量GUI图表更新（含重绘）的耗时；没有显示器时不可用"""
+
+    def __init__(self, word_counts, cache_dir):
+        import tkinter as tk
+        from ris_title_analyzer_gui import RISAnalyzerGUI
+
+        # 解析缓存写到临时目录，不影响用户缓存
+        os.environ['RIS_ANALYZER_CACHE_DIR'] = cache_dir
+        self.root = tk.Tk()
+        self.root.withdraw()
+        self.gui = RISAnalyzerGUI(self.root)
+        self.gui.word_counts = word_counts
+        self.gui.word_count_var.set(str(len(word_counts)))
+
+    def update(self):
+        self.gui.update_chart()
+        self.gui.chart_canvas.draw()
+        self.root.update_idletasks()
+
+    def close(self):
+        self.root.destroy()
+
+
+def run_stages(corpus_path, stages, repeat, workdir):
+    """依次运行各阶段，返回 {阶段: {seconds, peak_mb, throughput, unit}}"""
+    results = {}
+    file_size = os.path.getsize(corpus_path)
+
+    def record(name, func, amount, unit):
+        seconds, result = best_of(func, repeat)
+        results[name] = {
+            'seconds': round(seconds, 6),
+            'peak_mb': round(peak_memory(func), 3),
+            'throughput': round(amount / seconds, 1) if seconds else None,
+            'unit': unit,
+        }
+        print(f"  {name:<11} {seconds:9.4f} 秒  {results[name]['peak_mb']:9.1f} MB  "
+              f"{results[name]['throughput'] or 0:>14,.1f} {unit}")
+        return result
+
+    # 后续阶段依赖解析结果，因此解析总是执行（不在stages中时不计入结果）
+    parse = quiet(lambda: parse_ris_file(corpus_path))
+    titles = record('parse', parse, file_size / 1024 / 1024, 'MB/秒') if 'parse' in stages else parse()
+
+    if 'normalize' in stages:
+        tokens = [word for title in titles for word in tokenize_title(title)]
+        record('normalize', lambda: [normalize_word(word) for word in tokens], len(tokens), '词/秒')
+
+    word_counts = record('analyze', quiet(lambda: analyze_word_frequency(titles, top_n=200)),
+                         len(titles), '标题/秒') if 'analyze' in stages else None
+
+    if 'count_file' in stages:
+        record('count_file', lambda: count_raw_tokens_parallel(corpus_path), file_size / 1024 / 1024, 'MB/秒')
+
+    if word_counts is None and ('plot' in stages or 'gui_chart' in stages):
+        word_counts = quiet(lambda: analyze_word_frequency(titles, top_n=200))()
+
+    if 'plot' in stages:
+        chart_path = os.path.join(workdir, 'chart.png')
+        record('plot', quiet(lambda: plot_word_frequency(word_counts, chart_path, show=False)), 1, '次/秒')
+
+    if 'gui_chart' in stages:
+        try:
+            bench = GuiChartBench(word_counts, os.path.join(workdir, 'cache'))
+        except Exception as e:
+            print(f"  {'gui_chart':<11} 跳过（无法创建Tk窗口: {e}）")
+        else:
+            try:
+                bench.update()  # 首次更新包含创建图表，不计入
+                record('gui_chart', bench.update, 1, '次/秒')
+            finally:
+                bench.close()
+
+    return results
+
+
+def compare(results, baseline, threshold, memory_threshold):
+    """与基线比较，返回超出阈值的阶段说明列表"""
+    regressions = []
+    print("\n与基线比较:")
+    for name, current in results.items():
+        base = baseline['stages'].get(name)
+        if base is None:
+            print(f"  {name:<11} 基线中没有该阶段")
+            continue
+        time_ratio = current['seconds'] / base['seconds'] if base['seconds'] else 1.0
+        memory_ratio = current['peak_mb'] / base['peak_mb'] if base['peak_mb'] else 1.0
+        slow = current['seconds'] > base['seconds'] * (1 + threshold) + TIME_SLACK
+        bloated = current['peak_mb'] > base['peak_mb'] * (1 + memory_threshold)
+        status = "❌" if slow or bloated else "✓"
+        print(f"  {status} {name:<11} 耗时 {time_ratio:6.2f}x  内存 {memory_ratio:6.2f}x")
+        if slow:
+            regressions.append(f"{name}: 耗时 {base['seconds']:.4f} → {current['seconds']:.4f} 秒")
+        if bloated:
+            regressions.append(f"{name}: 峰值内存 {base['peak_mb']:.1f} → {current['peak_mb']:.1f} MB")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RIS分析各阶段的基准测试与回归检查")
+    parser.add_argument('--corpus', help="使用已有的RIS文件（默认在临时目录中生成合成语料）")
+    parser.add_argument('--records', type=int, default=20000, help="合成语料的记录数（默认20000）")
+    parser.add_argument('--seed', type=int, default=42, help="合成语料的随机种子（默认42）")
+    parser.add_argument('--encoding', choices=ENCODINGS, default='utf-8', help="合成语料的编码（默认utf-8）")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES), help="要运行的阶段（默认全部）")
+    parser.add_argument('--repeat', type=int, default=3, help="每个阶段的重复次数，取最短耗时（默认3）")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="基线文件路径")
+    parser.add_argument('--save-baseline', action='store_true', help="把本次结果保存为基线")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="耗时超过基线的比例阈值（默认0.25，即慢25%%以上视为回归）")
+    parser.add_argument('--memory-threshold', type=float, default=0.25, help="峰值内存超过基线的比例阈值（默认0.25）")
+    parser.add_argument('--json', dest='json_path', help="把本次结果另存为JSON")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.corpus:
+            corpus_path = args.corpus
+            corpus = {'path': os.path.abspath(corpus_path)}
+        else:
+            corpus_path = os.path.join(workdir, 'corpus.ris')
+            generate_corpus(corpus_path, args.records, args.seed, args.encoding)
+            corpus = {'records': args.records, 'seed': args.seed, 'encoding': args.encoding}
+        corpus['bytes'] = os.path.getsize(corpus_path)
+
+        print(f"语料: {corpus}")
+        print(f"  {'阶段':<9} {'耗时':>10}  {'峰值内存':>8}  {'吞吐量':>14}")
+        results = run_stages(corpus_path, args.stages, args.repeat, workdir)
+
+    report = {'corpus': corpus, 'python': platform.python_version(), 'machine': platform.machine(),
+              'stages': results}
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 基线已保存到: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\n未找到基线文件 {args.baseline}，可使用 --save-baseline 记录基线")
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('corpus') != corpus:
+        print(f"\n⚠️ 语料与基线不同，不进行比较（基线语料: {baseline.get('corpus')}）")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold, args.memory_threshold)
+    if regressions:
+        print("\n❌ 性能回归:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("\n✓ 没有超出阈值的性能回归")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
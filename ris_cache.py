@@ -0,0 +1,222 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from contextlib import contextmanager
+
+# 缓存格式版本，记录结构变化时递增，旧缓存自动失效
+CACHE_FORMAT_VERSION = 2
+# 默认缓存容量上限（压缩后的字节数）
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# 内容指纹的采样块大小：读取文件头、中、尾各一块
+FINGERPRINT_BLOCK_SIZE = 1024 * 1024
+# 序列化的记录中标记一条记录结束的行（RIS的ER标签，记录中不保存ER字段）
+RECORD_END_LINE = 'ER'
+
+
+def default_cache_dir():
+    """缓存目录：优先使用环境变量RIS_ANALYZER_CACHE_DIR，否则使用用户缓存目录"""
+    cache_dir = os.environ.get('RIS_ANALYZER_CACHE_DIR')
+    if cache_dir:
+        return cache_dir
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ris-title-analyzer')
+
+
+def file_fingerprint(file_path, size):
+    """文件内容指纹：对文件大小及头、中、尾采样块做哈希，无需读取整个文件"""
+    digest = hashlib.blake2b(str(size).encode('ascii'), digest_size=16)
+    with open(file_path, 'rb') as file:
+        if size <= 3 * FINGERPRINT_BLOCK_SIZE:
+            digest.update(file.read())
+        else:
+            for offset in (0, size // 2, size - FINGERPRINT_BLOCK_SIZE):
+                file.seek(offset)
+                digest.update(file.read(FINGERPRINT_BLOCK_SIZE))
+    return digest.hexdigest()
+
+
+def hash_file_range(file_path, start, end, digest=None):
+    """对文件[start, end)范围内的全部字节做哈希（不采样），返回hashlib对象
+
+    digest为已有的hashlib对象时在其上继续累加，监视模式用它维护已解析部分的完整哈希。
+    """
+    if digest is None:
+        digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = file.read(min(FINGERPRINT_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest
+
+
+def serialize_records(records):
+    """把 (标签序列, 值序列) 形式的记录序列化为文本：每个字段一行（两个字符的标签后接值），
+    每条记录以单独的ER行结束。字段值由去掉首尾空白的行拼接而成，不含换行符"""
+    lines = []
+    for tags, values in records:
+        lines.extend(map(str.__add__, tags, values))
+        lines.append(RECORD_END_LINE)
+    return '\n'.join(lines)
+
+
+def deserialize_records(text):
+    """serialize_records的逆操作，返回 (标签元组, 值元组) 的列表，标签字符串各记录共享"""
+    records = []
+    tags = []
+    values = []
+    for line in text.split('\n') if text else ():
+        if line == RECORD_END_LINE:
+            records.append((tuple(tags), tuple(values)))
+            tags = []
+            values = []
+        else:
+            tags.append(sys.intern(line[:2]))
+            values.append(line[2:])
+    return records
+
+
+class ParseCache:
+    """持久化解析缓存：按路径、大小、修改时间和内容指纹保存已解析出的记录
+
+    每条记录保存分析可能用到的字段（标题、摘要、关键词、出版年份和DOI），之后分析
+    其他字段或去除重复记录时也无需重新解析。使用SQLite单文件存储，记录序列化后
+    zlib压缩；超过容量上限时按最近使用时间淘汰（LRU）。
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.db_path = os.path.join(self.cache_dir, 'parse_cache.sqlite3')
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._init_db()
+
+    @contextmanager
+    def _connect(self):
+        """打开数据库连接，正常结束时提交事务，并始终关闭连接"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        with self._connect() as conn:
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            if version != CACHE_FORMAT_VERSION:
+                conn.execute('DROP TABLE IF EXISTS records')
+                conn.execute(f'PRAGMA user_version = {CACHE_FORMAT_VERSION}')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS records (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    record_count INTEGER NOT NULL,
+                    payload BLOB NOT NULL,
+                    last_used REAL NOT NULL
+                )''')
+
+    @staticmethod
+    def _file_key(file_path):
+        path = os.path.normcase(os.path.abspath(file_path))
+        stat = os.stat(file_path)
+        return path, stat.st_size, stat.st_mtime_ns
+
+    def file_state(self, file_path):
+        """文件当前的 (路径, 大小, 修改时间, 内容指纹)，在解析开始前取得后传给get和put"""
+        path, size, mtime_ns = self._file_key(file_path)
+        return path, size, mtime_ns, file_fingerprint(file_path, size)
+
+    def get(self, file_path, file_state=None):
+        """查找缓存，命中时返回 (标签元组, 值元组) 形式的记录列表，未命中或文件已变化时返回None
+
+        file_state为file_state()的结果，省略时在此读取。
+        """
+        path, size, mtime_ns, fingerprint = file_state or self.file_state(file_path)
+        with self._connect() as conn:
+            row = conn.execute('SELECT size, mtime_ns, fingerprint, payload FROM records WHERE path = ?',
+                               (path,)).fetchone()
+            if row is None:
+                return None
+            if row[0] != size or row[1] != mtime_ns or row[2] != fingerprint:
+                conn.execute('DELETE FROM records WHERE path = ?', (path,))
+                return None
+            conn.execute('UPDATE records SET last_used = ? WHERE path = ?', (time.time(), path))
+            payload = row[3]
+
+        return deserialize_records(zlib.decompress(payload).decode('utf-8'))
+
+    def put(self, file_path, records, file_state=None):
+        """保存解析出的记录，并在超出容量上限时淘汰最久未使用的条目，返回是否已保存
+
+        file_state为解析开始前取得的file_state()；文件在解析期间发生变化时不保存，
+        因为记录可能混合了改动前后的内容。省略时按文件当前的状态保存。
+        """
+        current = self.file_state(file_path)
+        if file_state is not None and file_state != current:
+            return False
+        path, size, mtime_ns, fingerprint = current
+        payload = zlib.compress(serialize_records(records).encode('utf-8'), 6)
+        if len(payload) > self.max_bytes:
+            return False
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)',
+                         (path, size, mtime_ns, fingerprint, len(records), payload, time.time()))
+            self._evict(conn)
+        return True
+
+    def _evict(self, conn):
+        total = conn.execute('SELECT COALESCE(SUM(LENGTH(payload)), 0) FROM records').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for path, nbytes in conn.execute('SELECT path, LENGTH(payload) FROM records '
+                                         'ORDER BY last_used').fetchall():
+            conn.execute('DELETE FROM records WHERE path = ?', (path,))
+            total -= nbytes
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        """清空缓存并回收磁盘空间"""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM records')
+        with self._connect() as conn:
+            conn.execute('VACUUM')
+
+    def stats(self):
+        """返回 (条目数, 压缩后总字节数)"""
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) '
+                                'FROM records').fetchone()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RIS解析缓存管理")
+    parser.add_argument('--clear', action='store_true', help="清空解析缓存")
+    args = parser.parse_args(argv)
+
+    cache = ParseCache()
+    if args.clear:
+        cache.clear()
+        print(f"✓ 已清空解析缓存: {cache.db_path}")
+    else:
+        count, nbytes = cache.stats()
+        print(f"缓存位置: {cache.db_path}")
+        print(f"缓存条目: {count} 个，占用 {nbytes / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
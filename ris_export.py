@@ -0,0 +1,125 @@
+import csv
+import importlib.util
+import os
+import sqlite3
+from itertools import islice
+
+# 完整词汇表导出：按扩展名判断格式
+EXPORT_FORMATS = {
+    '.csv': 'csv',
+    '.tsv': 'tsv',
+    '.sqlite': 'sqlite',
+    '.sqlite3': 'sqlite',
+    '.db': 'sqlite',
+    '.parquet': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+}
+EXPORT_COLUMNS = ('rank', 'word', 'frequency', 'document_frequency')
+PYARROW_FORMATS = ('parquet', 'arrow')
+PYARROW_REQUIRED = "导出Parquet/Arrow需要安装pyarrow: pip install pyarrow"
+# 每批写入的行数，内存中最多只有一批行
+BATCH_ROWS = 65536
+
+
+def export_format(file_path):
+    """按扩展名判断导出格式，不支持的扩展名抛出ValueError"""
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式: {extension or file_path}（支持 {', '.join(EXPORT_FORMATS)}）")
+    return EXPORT_FORMATS[extension]
+
+
+def pyarrow_available():
+    """不导入pyarrow，只检查是否已安装"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def iter_vocabulary_rows(word_counts, doc_counts=None):
+    """按频次从高到低逐行产出 (排名, 词, 频次, 文档频率)，同频词的顺序与most_common相同
+
+    只对词本身排序，不复制 (词, 频次) 元组列表；没有doc_counts时文档频率为None。
+    """
+    words = sorted(word_counts, key=word_counts.__getitem__, reverse=True)
+    for rank, word in enumerate(words, 1):
+        yield rank, word, word_counts[word], doc_counts.get(word, 0) if doc_counts is not None else None
+
+
+def _batches(rows, size=BATCH_ROWS):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def write_vocabulary_csv(rows, file_path, delimiter=','):
+    """逐行写入CSV/TSV；CSV带BOM，便于Excel正确识别UTF-8"""
+    encoding = 'utf-8-sig' if delimiter == ',' else 'utf-8'
+    with open(file_path, 'w', newline='', encoding=encoding) as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(['Rank', 'Word', 'Frequency', 'DocumentFrequency'])  # 与词频表一致使用英文标题
+        writer.writerows(rows)
+
+
+def write_vocabulary_sqlite(rows, file_path, metadata=None):
+    """写入SQLite数据库的word_frequency表（已存在时替换），metadata写入metadata表"""
+    with sqlite3.connect(file_path) as conn:
+        conn.execute("DROP TABLE IF EXISTS word_frequency")
+        conn.execute("CREATE TABLE word_frequency (rank INTEGER PRIMARY KEY, word TEXT NOT NULL UNIQUE, "
+                     "frequency INTEGER NOT NULL, document_frequency INTEGER)")
+        conn.executemany("INSERT INTO word_frequency VALUES (?, ?, ?, ?)", rows)
+        conn.execute("CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute("DELETE FROM metadata")
+        conn.executemany("INSERT INTO metadata VALUES (?, ?)",
+                         [(key, str(value)) for key, value in (metadata or {}).items()])
+    conn.close()
+
+
+def write_vocabulary_arrow(rows, file_path, fmt='parquet', metadata=None):
+    """按批写入Parquet或Arrow IPC文件（需要pyarrow）"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError(PYARROW_REQUIRED) from None
+
+    schema = pa.schema([('rank', pa.int64()), ('word', pa.string()), ('frequency', pa.int64()),
+                        ('document_frequency', pa.int64())],
+                       metadata={str(key): str(value) for key, value in (metadata or {}).items()})
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(file_path, schema)
+    else:
+        writer = pa.ipc.new_file(file_path, schema)
+    with writer:
+        for batch in _batches(rows):
+            columns = [pa.array(column, type=field.type) for column, field in zip(zip(*batch), schema)]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+
+
+def export_vocabulary(word_counts, file_path, fmt=None, doc_counts=None, metadata=None):
+    """流式导出完整词汇表（排名、词、频次、文档频率），返回写入的行数
+
+    fmt为csv、tsv、sqlite、parquet或arrow，None时按扩展名判断。行从word_counts逐行生成，
+    CSV和SQLite逐行写入，Parquet/Arrow每BATCH_ROWS行写一批。
+    """
+    fmt = fmt or export_format(file_path)
+    row_count = 0
+
+    def counted(rows):
+        nonlocal row_count
+        for row in rows:
+            row_count += 1
+            yield row
+
+    rows = counted(iter_vocabulary_rows(word_counts, doc_counts))
+    if fmt in ('csv', 'tsv'):
+        write_vocabulary_csv(rows, file_path, ',' if fmt == 'csv' else '\t')
+    elif fmt == 'sqlite':
+        write_vocabulary_sqlite(rows, file_path, metadata)
+    elif fmt in PYARROW_FORMATS:
+        write_vocabulary_arrow(rows, file_path, fmt, metadata)
+    else:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+    return row_count
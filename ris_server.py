@@ -0,0 +1,610 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+from ris_dedup import DEDUP_MODES, NEAR_THRESHOLD, RecordDeduplicator
+from ris_stats import RunStats
+from ris_title_analyzer import (ANALYSIS_FIELDS, DEFAULT_FIELDS, KEYWORD_FIELD, STOP_WORDS, apply_stop_words,
+                                count_ngrams_in_file, count_raw_tokens_parallel)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# 排队和正在运行的任务数上限，超出时返回503
+DEFAULT_MAX_QUEUE = 64
+# 结果缓存的条目数上限（按最近使用淘汰）
+RESULT_CACHE_SIZE = 256
+# 保留状态的已完成任务数
+MAX_FINISHED_JOBS = 1000
+MAX_UPLOAD_BYTES = 1024 * 1024 * 1024
+MAX_JSON_BYTES = 1024 * 1024
+MAX_TOP = 10000
+READ_BLOCK_SIZE = 1024 * 1024
+# 工作进程发送进度的最小间隔（秒）
+PROGRESS_INTERVAL = 0.2
+JSON_CONTENT_TYPE = 'application/json; charset=utf-8'
+NDJSON_CONTENT_TYPE = 'application/x-ndjson; charset=utf-8'
+
+_progress_queue = None
+
+
+class HTTPError(Exception):
+    """以JSON错误响应返回给客户端的请求错误"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def content_hash(file_path):
+    """文件完整内容的哈希，相同内容的上传和路径共用结果缓存"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(READ_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _digest_matches(file_path, digest):
+    """文件当前内容的哈希是否仍为digest，文件已无法读取时为False"""
+    try:
+        return content_hash(file_path) == digest
+    except OSError:
+        return False
+
+
+def _split_list(value):
+    if isinstance(value, str):
+        return [item for item in value.replace(',', ' ').split() if item]
+    return list(value)
+
+
+def parse_options(params):
+    """把查询参数或JSON中的分析选项规范化为只含基本类型的字典，不合法时抛出HTTPError(400)
+
+    fields和stop_words可以是列表或逗号分隔的字符串。
+    """
+    try:
+        fields = [field.upper() for field in _split_list(params.get('fields', DEFAULT_FIELDS))]
+        top = int(params.get('top', 50))
+        ngram = int(params.get('ngram', 1))
+        dedup = params.get('dedup') or None
+        threshold = float(params.get('dedup_threshold', NEAR_THRESHOLD))
+        stop_words = sorted({str(word).lower() for word in _split_list(params.get('stop_words', ()))})
+    except (TypeError, ValueError) as e:
+        raise HTTPError(400, f"分析选项不合法: {e}") from None
+    unknown = [field for field in fields if field not in ANALYSIS_FIELDS]
+    if unknown or not fields:
+        raise HTTPError(400, f"不支持的字段: {', '.join(unknown) or '（空）'}（支持 {', '.join(ANALYSIS_FIELDS)}）")
+    if not 1 <= top <= MAX_TOP:
+        raise HTTPError(400, f"top必须在1到{MAX_TOP}之间")
+    if ngram not in (1, 2, 3):
+        raise HTTPError(400, "ngram必须为1、2或3")
+    if KEYWORD_FIELD in fields and ngram > 1:
+        raise HTTPError(400, "关键词(KW)字段按整个短语统计，不能与ngram 2/3同时使用")
+    if dedup is not None and dedup not in DEDUP_MODES:
+        raise HTTPError(400, f"dedup必须为 {' 或 '.join(DEDUP_MODES)}")
+    if not 0 < threshold <= 1:
+        raise HTTPError(400, "dedup_threshold必须在0到1之间")
+    return {'fields': [field for field in ANALYSIS_FIELDS if field in fields], 'top': top, 'ngram': ngram,
+            'dedup': dedup, 'dedup_threshold': threshold if dedup == 'near' else None, 'stop_words': stop_words}
+
+
+def _options_key(options):
+    return (tuple(options['fields']), options['top'], options['ngram'], options['dedup'],
+            options['dedup_threshold'], tuple(options['stop_words']))
+
+
+def _init_worker(progress_queue):
+    """工作进程初始化：保存进度队列，忽略Ctrl+C（由服务进程负责关闭进程池）"""
+    global _progress_queue
+    _progress_queue = progress_queue
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def run_analysis_job(job_id, file_path, options):
+    """在工作进程中分析一个文件，进度通过进度队列发回服务进程，返回可JSON序列化的结果
+
+    每个任务在一个工作进程中单进程统计，并行度由进程池的大小决定。
+    """
+    started = time.perf_counter()
+    total_bytes = os.path.getsize(file_path)
+    last_sent = 0.0
+
+    def send(status, bytes_read=0, records=0, tokens=0):
+        if _progress_queue is not None:
+            _progress_queue.put((job_id, status, {'bytes_read': bytes_read, 'total_bytes': total_bytes,
+                                                  'records': records, 'tokens': tokens}))
+
+    def progress(bytes_read, records, tokens):
+        nonlocal last_sent
+        now = time.perf_counter()
+        if now - last_sent >= PROGRESS_INTERVAL:
+            last_sent = now
+            send('running', bytes_read or 0, records, tokens)
+
+    send('running')
+    stats = RunStats()
+    stop_words = STOP_WORDS.union(options['stop_words']) if options['stop_words'] else STOP_WORDS
+    dedup = None
+    if options['dedup']:
+        dedup = RecordDeduplicator(near=options['dedup'] == 'near',
+                                   threshold=options['dedup_threshold'] or NEAR_THRESHOLD)
+    fields = tuple(options['fields'])
+    if options['ngram'] > 1:
+        ngram_counts, text_count = count_ngrams_in_file(file_path, stop_words, progress=progress, stats=stats,
+                                                        fields=fields, dedup=dedup)
+        word_counts = ngram_counts[options['ngram']]
+        token_count = sum(word_counts.values())
+    else:
+        raw_counts, text_count = count_raw_tokens_parallel(file_path, workers=1, progress=progress, stats=stats,
+                                                           fields=fields, dedup=dedup)
+        word_counts, token_count = apply_stop_words(raw_counts, stop_words, stats)
+    if dedup is not None:
+        dedup.record_stats(stats)
+
+    result = {
+        'documents': text_count,
+        'tokens': token_count,
+        'vocabulary': len(word_counts),
+        # 与命令行 --format json 的词频表相同
+        'words': [{'rank': rank, 'word': word, 'frequency': count}
+                  for rank, (word, count) in enumerate(word_counts.most_common(options['top']), 1)],
+        'duplicates': dedup.summary() if dedup is not None else None,
+        'stats': stats.to_dict(),
+        'seconds': round(time.perf_counter() - started, 6),
+    }
+    return result
+
+
+class Job:
+    """一个分析任务的状态；订阅者是asyncio.Queue，每次状态或进度变化时收到一份快照"""
+
+    def __init__(self, key, content_hash, options, source):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.content_hash = content_hash
+        self.options = options
+        self.source = source
+        self.status = 'queued'
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.cached = False
+        self.done = asyncio.Event()
+        self._subscribers = set()
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed')
+
+    def to_dict(self):
+        data = {'id': self.id, 'status': self.status, 'cached': self.cached, 'content_hash': self.content_hash,
+                'source': self.source, 'options': self.options, 'progress': self.progress}
+        if self.error is not None:
+            data['error'] = self.error
+        if self.result is not None:
+            data['result'] = self.result
+        return data
+
+    def update(self, status, progress=None):
+        self.status = status
+        if progress is not None:
+            self.progress = progress
+        if self.finished:
+            self.done.set()
+        snapshot = self.to_dict()
+        for queue in self._subscribers:
+            queue.put_nowait(snapshot)
+
+    def subscribe(self):
+        queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+
+
+class AnalysisService:
+    """任务队列和结果缓存：任务提交到有界的进程池，结果按 (内容哈希, 分析选项) 缓存
+
+    相同内容和选项的任务正在排队或运行时，新的请求直接共用该任务。
+    """
+
+    def __init__(self, workers=None, max_queue=DEFAULT_MAX_QUEUE, cache_size=RESULT_CACHE_SIZE,
+                 max_upload_bytes=MAX_UPLOAD_BYTES):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.cache_size = cache_size
+        self.max_upload_bytes = max_upload_bytes
+        self.jobs = OrderedDict()
+        self.results = OrderedDict()  # 缓存键 -> 结果
+        self.pending = {}  # 缓存键 -> 排队或运行中的任务
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.completed = 0
+        self.failed = 0
+        self.upload_dir = None
+        self._executor = None
+        self._progress_queue = None
+        self._progress_thread = None
+        self._loop = None
+
+    def start(self):
+        """在事件循环中调用：创建进程池、上传目录和进度转发线程"""
+        self._loop = asyncio.get_running_loop()
+        self.upload_dir = tempfile.mkdtemp(prefix='ris-server-')
+        self._progress_queue = multiprocessing.Queue()
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(self._progress_queue,))
+        self._progress_thread = threading.Thread(target=self._forward_progress, daemon=True)
+        self._progress_thread.start()
+
+    def close(self):
+        if self._executor is not None:
+            # 取消尚未开始的任务（Python 3.9+），等待正在运行的任务结束
+            if sys.version_info >= (3, 9):
+                self._executor.shutdown(wait=True, cancel_futures=True)
+            else:
+                self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._progress_queue is not None:
+            self._progress_queue.put(None)
+            self._progress_thread.join()
+            self._progress_queue = None
+        if self.upload_dir is not None:
+            shutil.rmtree(self.upload_dir, ignore_errors=True)
+            self.upload_dir = None
+
+    def _forward_progress(self):
+        """从工作进程的进度队列读取进度，转交给事件循环"""
+        while True:
+            item = self._progress_queue.get()
+            if item is None:
+                return
+            self._loop.call_soon_threadsafe(self._on_progress, *item)
+
+    def _on_progress(self, job_id, status, progress):
+        job = self.jobs.get(job_id)
+        if job is not None and not job.finished:
+            job.update(status, progress)
+
+    @property
+    def active(self):
+        return len(self.pending)
+
+    def submit(self, file_path, digest, options, source, cleanup=False):
+        """提交任务，返回Job；结果已缓存时返回已完成的任务（cached为True），不经过进程池
+
+        cleanup为True时文件（上传的临时文件）在任务结束后删除，共用已有任务或命中缓存时立即删除。
+        """
+        key = (digest,) + _options_key(options)
+        job = self.pending.get(key)
+        if job is None and key in self.results:
+            self.results.move_to_end(key)
+            self.cache_hits += 1
+            job = Job(key, digest, options, source)
+            job.cached = True
+            job.result = self.results[key]
+            job.update('done')
+            self._remember(job)
+        if job is not None:
+            if cleanup:
+                os.remove(file_path)
+            return job
+        if self.active >= self.max_queue:
+            if cleanup:
+                os.remove(file_path)
+            raise HTTPError(503, f"任务队列已满（{self.max_queue} 个），请稍后重试")
+
+        self.cache_misses += 1
+        job = Job(key, digest, options, source)
+        self.pending[key] = job
+        self._remember(job)
+        asyncio.ensure_future(self._run(job, file_path, cleanup))
+        return job
+
+    async def _run(self, job, file_path, cleanup):
+        try:
+            job.result = await self._loop.run_in_executor(self._executor, run_analysis_job, job.id, file_path,
+                                                          job.options)
+            # 本机路径的文件可能在提交后、分析期间被修改：内容哈希不变时才缓存结果，
+            # 否则结果不对应job.content_hash；上传的临时文件只有本服务写入，不需要核对
+            cacheable = cleanup or await self._loop.run_in_executor(None, _digest_matches, file_path,
+                                                                    job.content_hash)
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+            self.failed += 1
+            job.update('failed')
+        else:
+            self.completed += 1
+            if cacheable:
+                self.results[job.key] = job.result
+                while len(self.results) > self.cache_size:
+                    self.results.popitem(last=False)
+            job.update('done', dict(job.progress, bytes_read=job.progress.get('total_bytes', 0)))
+        finally:
+            self.pending.pop(job.key, None)
+            if cleanup:
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    pass
+
+    def _remember(self, job):
+        self.jobs[job.id] = job
+        # 只保留最近的已完成任务
+        finished = [job_id for job_id, item in self.jobs.items() if item.finished]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    def status(self):
+        running = sum(1 for job in self.pending.values() if job.status == 'running')
+        return {'status': 'ok', 'workers': self.workers, 'max_queue': self.max_queue,
+                'queued': self.active - running, 'running': running, 'completed': self.completed,
+                'failed': self.failed, 'cache': {'entries': len(self.results), 'capacity': self.cache_size,
+                                                 'hits': self.cache_hits, 'misses': self.cache_misses}}
+
+
+async def read_request(reader):
+    """读取请求行和请求头，返回 (方法, 目标, 协议版本, 请求头)，连接已关闭时返回None"""
+    try:
+        line = await reader.readline()
+        if not line:
+            return None
+        method, target, version = line.decode('latin-1').split()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if not line:
+                return None
+            if line in (b'\r\n', b'\n'):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+    except ValueError:
+        # 请求行格式不对，或单行超过StreamReader的长度上限
+        raise HTTPError(400, "请求格式不正确") from None
+    return method.upper(), target, version, headers
+
+
+def write_head(writer, status, headers):
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    lines.extend(f"{name}: {value}" for name, value in headers)
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+
+
+def write_json(writer, status, data, keep_alive=True, headers=()):
+    body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+    write_head(writer, status, [('Content-Type', JSON_CONTENT_TYPE), ('Content-Length', len(body)),
+                                ('Connection', 'keep-alive' if keep_alive else 'close')] + list(headers))
+    writer.write(body)
+
+
+def write_chunk(writer, data):
+    """分块传输编码的一块；空数据表示结束"""
+    writer.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+
+
+def content_length(headers):
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        raise HTTPError(411, "请求需要提供Content-Length，不支持分块上传")
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise HTTPError(400, "Content-Length不正确") from None
+    if length < 0:
+        raise HTTPError(400, "Content-Length不正确")
+    return length
+
+
+def _is_true(value):
+    return value is True or str(value).lower() in ('1', 'true', 'yes')
+
+
+class AnalysisServer:
+    """HTTP接口（HTTP/1.1，支持keep-alive）
+
+    POST /jobs              上传RIS文件（请求体为文件内容，可以是压缩文件），或以JSON {"path": ...} 指定本机文件；
+                            分析选项放在查询参数或JSON中；wait=1时等任务完成后再返回
+    GET  /jobs/{id}         任务状态、进度和结果
+    GET  /jobs/{id}/events  以NDJSON流式返回任务状态，每次进度变化一行，任务结束后关闭
+    GET  /health            队列长度、进程数和结果缓存命中情况
+    """
+
+    def __init__(self, service):
+        self.service = service
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HTTPError as e:
+                    write_json(writer, e.status, {'error': str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, target, version, headers = request
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                try:
+                    await self.dispatch(method, target, headers, reader, writer, keep_alive)
+                except HTTPError as e:
+                    # 出错时请求体可能还没有读完，POST请求之后关闭连接
+                    keep_alive = keep_alive and method != 'POST'
+                    extra = [('Retry-After', 1)] if e.status == 503 else []
+                    write_json(writer, e.status, {'error': str(e)}, keep_alive, extra)
+                except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+                    raise
+                except Exception as e:
+                    keep_alive = False
+                    write_json(writer, 500, {'error': f"服务器内部错误: {e}"}, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # 服务停止时空闲的keep-alive连接被取消，直接关闭
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, headers, reader, writer, keep_alive):
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+        parts = [part for part in url.path.split('/') if part]
+        if parts == ['health']:
+            self._require(method, 'GET')
+            write_json(writer, 200, self.service.status(), keep_alive)
+        elif parts == ['jobs']:
+            self._require(method, 'POST')
+            await self.create_job(params, headers, reader, writer, keep_alive)
+        elif len(parts) in (2, 3) and parts[0] == 'jobs' and parts[2:] in ([], ['events']):
+            self._require(method, 'GET')
+            job = self.service.jobs.get(parts[1])
+            if job is None:
+                raise HTTPError(404, f"任务不存在: {parts[1]}")
+            if parts[2:]:
+                await self.stream_events(job, writer, keep_alive)
+            else:
+                write_json(writer, 200, job.to_dict(), keep_alive)
+        else:
+            raise HTTPError(404, f"未知的路径: {url.path}")
+
+    @staticmethod
+    def _require(method, expected):
+        if method != expected:
+            raise HTTPError(405, f"只支持{expected}请求")
+
+    async def create_job(self, params, headers, reader, writer, keep_alive):
+        service = self.service
+        length = content_length(headers)
+        if headers.get('content-type', '').startswith('application/json'):
+            if length > MAX_JSON_BYTES:
+                raise HTTPError(413, "JSON请求体过大")
+            try:
+                body = json.loads((await reader.readexactly(length)).decode('utf-8'))
+            except (UnicodeDecodeError, ValueError):
+                raise HTTPError(400, "请求体不是合法的JSON") from None
+            if not isinstance(body, dict):
+                raise HTTPError(400, "JSON请求体必须是对象")
+            params.update(body)
+            length = 0
+        elif length > service.max_upload_bytes:
+            raise HTTPError(413, f"上传文件超过 {service.max_upload_bytes // (1024 * 1024)} MB 上限")
+        options = parse_options(params)
+
+        if length:
+            file_path, digest = await self.receive_upload(reader, length)
+            job = service.submit(file_path, digest, options, params.get('name') or 'upload', cleanup=True)
+        elif params.get('path'):
+            file_path = os.path.abspath(str(params['path']))
+            if not os.path.isfile(file_path):
+                raise HTTPError(400, f"文件不存在: {file_path}")
+            try:
+                digest = await asyncio.get_running_loop().run_in_executor(None, content_hash, file_path)
+            except OSError as e:
+                raise HTTPError(400, f"无法读取文件: {e}") from None
+            job = service.submit(file_path, digest, options, file_path)
+        else:
+            raise HTTPError(400, "请在请求体中上传RIS文件，或用path指定本机上的文件")
+
+        if _is_true(params.get('wait')):
+            await job.done.wait()
+        if job.finished:
+            write_json(writer, 200, job.to_dict(), keep_alive)
+        else:
+            write_json(writer, 202, job.to_dict(), keep_alive, [('Location', f"/jobs/{job.id}")])
+
+    async def receive_upload(self, reader, length):
+        """把请求体写入上传目录中的临时文件，同时计算内容哈希，返回 (路径, 哈希)"""
+        digest = hashlib.blake2b(digest_size=20)
+        fd, file_path = tempfile.mkstemp(suffix='.ris', dir=self.service.upload_dir)
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                remaining = length
+                while remaining:
+                    block = await reader.readexactly(min(READ_BLOCK_SIZE, remaining))
+                    digest.update(block)
+                    file.write(block)
+                    remaining -= len(block)
+        except BaseException:
+            os.remove(file_path)
+            raise
+        return file_path, digest.hexdigest()
+
+    async def stream_events(self, job, writer, keep_alive):
+        """先发送当前状态，之后每次状态或进度变化发送一行，任务结束（含结果）后结束响应"""
+        queue = job.subscribe()
+        try:
+            write_head(writer, 200, [('Content-Type', NDJSON_CONTENT_TYPE), ('Transfer-Encoding', 'chunked'),
+                                     ('Cache-Control', 'no-cache'),
+                                     ('Connection', 'keep-alive' if keep_alive else 'close')])
+            snapshot = job.to_dict()
+            while True:
+                write_chunk(writer, json.dumps(snapshot, ensure_ascii=False).encode('utf-8') + b'\n')
+                await writer.drain()
+                if snapshot['status'] in ('done', 'failed'):
+                    break
+                snapshot = await queue.get()
+            write_chunk(writer, b'')
+        finally:
+            job.unsubscribe(queue)
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, max_queue=DEFAULT_MAX_QUEUE,
+                cache_size=RESULT_CACHE_SIZE, max_upload_bytes=MAX_UPLOAD_BYTES):
+    """启动分析服务并一直运行，直到被取消"""
+    service = AnalysisService(workers, max_queue, cache_size, max_upload_bytes)
+    service.start()
+    try:
+        server = await asyncio.start_server(AnalysisServer(service).handle_connection, host, port)
+        address = server.sockets[0].getsockname()
+        print(f"🌐 分析服务已启动: http://{address[0]}:{address[1]}（{service.workers} 个工作进程，Ctrl+C停止）",
+              flush=True)
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地RIS词频分析服务（HTTP）")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"监听地址（默认{DEFAULT_HOST}，只接受本机连接）")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"监听端口（默认{DEFAULT_PORT}，0表示随机端口）")
+    parser.add_argument('--workers', type=int, default=None, help="分析进程数，默认使用全部CPU核心")
+    parser.add_argument('--max-queue', type=int, default=DEFAULT_MAX_QUEUE,
+                        help=f"排队和运行中的任务数上限，超出时返回503（默认{DEFAULT_MAX_QUEUE}）")
+    parser.add_argument('--cache-size', type=int, default=RESULT_CACHE_SIZE,
+                        help=f"结果缓存的条目数（默认{RESULT_CACHE_SIZE}）")
+    parser.add_argument('--max-upload-mb', type=int, default=MAX_UPLOAD_BYTES // (1024 * 1024),
+                        help=f"单个上传文件的大小上限（MB，默认{MAX_UPLOAD_BYTES // (1024 * 1024)}）")
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1 or args.max_queue < 1 or args.cache_size < 0:
+        parser.error("--workers 和 --max-queue 必须大于0，--cache-size 不能为负数")
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_queue, args.cache_size,
+                          args.max_upload_mb * 1024 * 1024))
+    except KeyboardInterrupt:
+        print("⏹️ 分析服务已停止")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+import heapq
+
+
+class SpaceSavingCounter:
+    """Space-Saving流式高频项统计：只跟踪固定数量的词，内存占用与语料规模无关
+
+    每个被跟踪的词记录计数count和误差上界error，真实频次满足
+    count - error <= 真实频次 <= count，且error不超过 总计数 / capacity。
+    真实频次大于 总计数 / capacity 的词一定会被跟踪到。
+    """
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity必须为正整数")
+        self.capacity = capacity
+        self.total = 0
+        self._counts = {}
+        self._errors = {}
+        # 最小堆，每个被跟踪的词恰有一项；词的计数增加时不更新堆，
+        # 淘汰时再把过期的项刷新为当前计数（惰性更新）
+        self._heap = []
+
+    def __len__(self):
+        return len(self._counts)
+
+    def __contains__(self, item):
+        return item in self._counts
+
+    def add(self, item, count=1):
+        """累加一个词的计数（支持带权重的批量累加）"""
+        self.total += count
+        counts = self._counts
+        if item in counts:
+            counts[item] += count
+            return
+        if len(counts) < self.capacity:
+            counts[item] = count
+            self._errors[item] = 0
+            heapq.heappush(self._heap, (count, item))
+            return
+
+        # 找到当前计数最小的词并由新词取代，新词继承其计数作为误差
+        heap = self._heap
+        while True:
+            min_count, victim = heap[0]
+            actual = counts[victim]
+            if actual == min_count:
+                break
+            heapq.heapreplace(heap, (actual, victim))
+        del counts[victim]
+        del self._errors[victim]
+        counts[item] = min_count + count
+        self._errors[item] = min_count
+        heapq.heapreplace(heap, (min_count + count, item))
+
+    def update(self, counts):
+        """批量累加 {词: 计数} 映射"""
+        add = self.add
+        for item, count in counts.items():
+            add(item, count)
+
+    def error_bound(self):
+        """所有计数共同的误差上界：未被跟踪的词的真实频次也不超过该值
+
+        尚未发生淘汰时计数是精确的；否则为当前最小计数（不超过 总计数 / capacity）。
+        """
+        if len(self._counts) < self.capacity:
+            return 0
+        return min(self._counts.values())
+
+    def most_common(self, n=None):
+        """返回按计数降序排列的 (词, 计数, 误差上界) 列表"""
+        items = ((item, count, self._errors[item]) for item, count in self._counts.items())
+        if n is None:
+            return sorted(items, key=lambda entry: entry[1], reverse=True)
+        return heapq.nlargest(n, items, key=lambda entry: entry[1])
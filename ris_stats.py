@@ -0,0 +1,177 @@
+import io
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+# 报告中计数器和阶段的显示名称及顺序
+COUNTER_LABELS = {
+    'files': '文件数',
+    'bytes_read': '读取字节数',
+    'records': '记录数',
+    'titles': '文本数（多字段时为记录数）',
+    'duplicates_exact': '完全重复的记录数',
+    'duplicates_near': '近似重复的记录数',
+    'tokens': '原始词数',
+    'tokens_kept': '保留词数',
+    'tokens_dropped': '停用词过滤词数',
+    'raw_vocabulary': '原始词汇量',
+    'vocabulary': '词汇量',
+}
+STAGE_LABELS = {
+    'cache': '读写解析缓存',
+    'io': '读取文件',
+    'parse': '解码和解析',
+    'tokenize': '分词',
+    'count': '计数',
+    'parse_count': '解析和统计（多进程）',
+    'stop_words': '停用词过滤',
+    'analyze': '分析',
+    'output': '保存结果',
+    'chart': '绘制图表',
+    'display': '显示结果和图表',
+}
+
+
+def peak_rss_mb(children=False):
+    """进程的峰值常驻内存（MB）；children为True时返回已结束子进程中的最大值，无法获取时返回None"""
+    try:
+        import resource
+    except ImportError:
+        return None if children else _windows_peak_rss_mb()
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # Linux上ru_maxrss的单位是KB，macOS上是字节
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return usage.ru_maxrss / divisor
+
+
+def _windows_peak_rss_mb():
+    """Windows上通过GetProcessMemoryInfo读取峰值工作集"""
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return None
+        return counters.PeakWorkingSetSize / 1024 / 1024
+    except Exception:
+        return None
+
+
+class RunStats:
+    """一次分析运行的计数器和分阶段耗时
+
+    计数器和阶段耗时都是累加的；多进程解析时各工作进程的统计通过merge合并，
+    其阶段耗时为各进程耗时之和（CPU时间），墙钟时间记录在parse_count阶段。
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.stage_seconds = {}
+        self.started = time.perf_counter()
+
+    def add(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name, value):
+        self.counters[name] = value
+
+    def add_time(self, stage, seconds):
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name):
+        """计时上下文：with stats.stage('chart'): ..."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def merge(self, data):
+        """合并to_dict()导出的统计（用于汇总工作进程的统计）"""
+        for name, value in data['counters'].items():
+            self.add(name, value)
+        for stage, seconds in data['stage_seconds'].items():
+            self.add_time(stage, seconds)
+
+    def to_dict(self):
+        """只含计数器和阶段耗时，可在进程间传递"""
+        return {'counters': dict(self.counters), 'stage_seconds': dict(self.stage_seconds)}
+
+    def report(self, **extra):
+        """完整的运行报告：计数器、各阶段耗时、总耗时和峰值内存"""
+        report = dict(extra)
+        report.update({
+            'counters': dict(self.counters),
+            'stage_seconds': {stage: round(seconds, 6) for stage, seconds in self.stage_seconds.items()},
+            'wall_seconds': round(time.perf_counter() - self.started, 6),
+            'peak_rss_mb': peak_rss_mb(),
+            'peak_rss_children_mb': peak_rss_mb(children=True),
+        })
+        return report
+
+    def format_lines(self):
+        """供界面显示的 (名称, 数值) 列表"""
+        lines = [(COUNTER_LABELS.get(name, name), f"{value:,}") for name, value in self.counters.items()]
+        lines.extend((STAGE_LABELS.get(stage, stage), f"{seconds:.3f} 秒")
+                     for stage, seconds in self.stage_seconds.items())
+        lines.append(("总耗时", f"{time.perf_counter() - self.started:.3f} 秒"))
+        peak = peak_rss_mb()
+        if peak is not None:
+            lines.append(("峰值内存", f"{peak:.1f} MB"))
+        return lines
+
+
+def timed(stats, stage):
+    """stats为None时不计时的stats.stage(stage)"""
+    return stats.stage(stage) if stats is not None else nullcontext()
+
+
+def save_report(report, file_path):
+    """保存JSON运行报告，file_path为'-'时写到标准输出"""
+    if file_path == '-':
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write('\n')
+        return
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+class TimedReader(io.BufferedReader):
+    """记录读取字节数和读取耗时的缓冲读取器，作为TextIOWrapper的底层流"""
+
+    def __init__(self, raw, stats, buffer_size=io.DEFAULT_BUFFER_SIZE):
+        super().__init__(raw, buffer_size)
+        self.stats = stats
+
+    def read1(self, size=-1):
+        start = time.perf_counter()
+        data = super().read1(size)
+        self.stats.add_time('io', time.perf_counter() - start)
+        self.stats.add('bytes_read', len(data))
+        return data
+
+    def read(self, size=-1):
+        start = time.perf_counter()
+        data = super().read(size)
+        self.stats.add_time('io', time.perf_counter() - start)
+        self.stats.add('bytes_read', len(data))
+        return data
+
+
+def open_timed(file_path, stats, buffer_size=io.DEFAULT_BUFFER_SIZE):
+    """以二进制方式打开文件，读取时把字节数和耗时计入stats"""
+    return TimedReader(io.FileIO(os.fspath(file_path), 'r'), stats, buffer_size)
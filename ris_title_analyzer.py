@@ -1,78 +1,538 @@
+import argparse
+import codecs
+import contextlib
+import csv
+import glob
+import io
+import json
+import mmap
+import os
 import re
-from collections import Counter
-import matplotlib.pyplot as plt
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from itertools import islice
+
+from ris_cache import hash_file_range
+from ris_export import PYARROW_FORMATS, PYARROW_REQUIRED, export_format, export_vocabulary, pyarrow_available
+from ris_dedup import DEDUP_MODES, DEDUP_TAGS, NEAR_THRESHOLD, RecordDeduplicator, format_dedup_summary
+from ris_sketch import SpaceSavingCounter
+from ris_stats import RunStats, open_timed, save_report, timed
+
+# 学术文章标题专用停用词列表
+# 保留学术价值高的词汇，移除常见的功能词和连接词
+STOP_WORDS = frozenset({
+    # 基础功能词
+    'a', 'an', 'the', 'and', 'or', 'but', 'if', 'of', 'at', 'by',
+    'for', 'with', 'about', 'to', 'from', 'in', 'on', 'is', 'are',
+    'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
+    'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may',
+    'might', 'must', 'can', 'this', 'that', 'these', 'those',
+
+    # 代词（在学术标题中很少出现，但保留以防万一）
+    'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her',
+    'us', 'them', 'my', 'your', 'his', 'its', 'our', 'their',
+
+    # 疑问词和副词（某些在学术标题中可能有意义，谨慎移除）
+    'what', 'which', 'who', 'whom', 'whose', 'where', 'when', 'why', 'how',
+
+    # 量词和限定词
+    'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such',
+    'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very',
+
+    # 常见副词和介词
+    'just', 'now', 'also', 'as', 'up', 'out', 'down', 'off', 'over', 'under',
+    'again', 'further', 'then', 'once', 'here', 'there', 'into', 'onto',
+    'upon', 'within', 'without', 'through', 'during', 'before', 'after',
+    'above', 'below', 'between', 'among',
+
+    # 学术标题中常见但信息量较低的词汇
+    'study', 'studies', 'research', 'investigation', 'paper', 'article',
+    'review', 'survey', 'overview', 'introduction', 'conclusion',
+    'case', 'cases', 'example', 'examples', 'method', 'methods',
+    'approach', 'approaches', 'technique', 'techniques', 'way', 'ways',
+    'new', 'novel', 'improved', 'enhanced', 'advanced', 'modern',
+    'recent', 'current', 'latest', 'state', 'art', 'based', 'using',
+    'via', 'through', 'toward', 'towards', 'into', 'onto', 'upon'
+})
+
+# 字段行格式为 "XX  - 值"：两个字符的标签（大写字母开头，第二个字符为大写字母或数字）后接 "  -"
+FIELD_SEPARATOR = '  -'
+RECORD_START_TAG = 'TY'
+RECORD_END_TAG = 'ER'
+# 出版年份字段，PY优先
+YEAR_TAGS = ('PY', 'Y1')
+# 字段行分派表中表示不保留的字段、记录开始（TY）和记录结束（ER）的标记
+_SKIP_FIELD = object()
+_RECORD_START = object()
+_RECORD_END = object()
+# 出版年份：字段值中的第一个四位年份
+_YEAR_PATTERN = re.compile(r'(?<!\d)(?:1[5-9]|20)\d\d(?!\d)')
+
+# 字节序标记(BOM)与对应编码，UTF-32的BOM以UTF-16的BOM开头，需优先匹配
+_BOM_ENCODINGS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+# cp1252中未定义的字节，出现这些字节时只能按latin-1解释
+_CP1252_UNDEFINED = frozenset(b'\x81\x8d\x8f\x90\x9d')
+# 单字节回退表：坏字节优先按cp1252解释，未定义的按latin-1解释
+_FALLBACK_CHARS = tuple(chr(i) if i in _CP1252_UNDEFINED else bytes([i]).decode('cp1252')
+                        for i in range(256))
+ENCODING_ERRORS = 'ris-fallback'
+# 压缩格式的魔数（文件头），压缩输入边读边解压
+COMPRESSION_MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'PK\x03\x04', 'zip'),
+    (b'PK\x05\x06', 'zip'),  # 空的zip文件
+)
+# 目录输入时视为RIS文件的扩展名
+RIS_FILE_SUFFIXES = ('.ris', '.ris.gz', '.ris.bz2', '.ris.xz', '.zip')
+# 编码嗅探的样本大小，也是读取RIS输入的缓冲区大小（样本直接取自缓冲区，不重复读取）
+ENCODING_SAMPLE_SIZE = 64 * 1024
+# 可以按字节切块并行解析的编码（换行符为单字节）
+PARALLEL_ENCODINGS = frozenset({'utf-8', 'utf-8-sig', 'cp1252', 'latin-1'})
+# 并行解析的块大小，以及启用并行的最小文件大小
+PARALLEL_CHUNK_SIZE = 32 * 1024 * 1024
+MIN_PARALLEL_SIZE = 8 * 1024 * 1024
+
+# 分词模式：长度至少为3的连续字母/数字/下划线串，再用str.isalpha过滤出纯字母单词
+_WORD_PATTERN = re.compile(r'\w{3,}')
+# 分词时每批拼接的标题数量
+TOKENIZE_BATCH_SIZE = 1024
+# 短语统计：按单词切分（保留所有字母数字串以便识别短语边界），以及视为短语边界的句读标点（含拼接多个字段用的换行符）
+_TOKEN_PATTERN = re.compile(r'\w+')
+_PHRASE_BOUNDARY_PATTERN = re.compile(r'[.,;:!?()\[\]{}"\u201c\u201d\n]')
+# 每种长度的短语最多保留的条目数，超过后淘汰低频短语
+MAX_PHRASES = 2000000
+# 统计单位名称
+NGRAM_LABELS = {1: '单词', 2: '二元短语', 3: '三元短语'}
+# 可分析的字段：标题和摘要分词统计，关键词按整个短语统计
+ANALYSIS_FIELDS = {'TI': '标题', 'AB': '摘要', 'KW': '关键词'}
+# 图表标题中字段的英文名称
+FIELD_NAMES_EN = {'TI': 'Title', 'AB': 'Abstract', 'KW': 'Keyword'}
+DEFAULT_FIELDS = ('TI',)
+KEYWORD_FIELD = 'KW'
+# 各种分析（所选字段、年度趋势、去重）可能用到的全部字段，解析缓存保存这些字段
+RECORD_CACHE_TAGS = frozenset(ANALYSIS_FIELDS).union(YEAR_TAGS, DEDUP_TAGS)
+# 关键词短语首尾去掉的标点
+_KEYWORD_STRIP_CHARS = ' .,;:!?"\'()[]{}\u201c\u201d'
+# 命令行输出文件格式
+OUTPUT_FORMATS = ('csv', 'tsv', 'json')
+# 命令行退出码，便于在定时任务和工作流中判断结果
+EXIT_OK = 0
+EXIT_FAILURE = 1  # 分析出错，或批量模式下有文件分析失败
+EXIT_USAGE = 2  # 参数错误（与argparse一致）
+EXIT_NO_INPUT = 3  # 输入文件不存在或没有匹配的文件
+EXIT_NO_DATA = 4  # 没有解析到标题或有效词汇
+# 并行解析时等待各块结果的轮询间隔（秒），期间回调进度以便及时响应取消
+PROGRESS_POLL_INTERVAL = 0.1
+# 监视模式检查文件变化的默认间隔（秒）
+WATCH_INTERVAL = 10.0
+
+
+class AnalysisCancelled(Exception):
+    """分析被取消：由进度回调抛出，统计函数将其原样传播"""
+
+
+def _fallback_decode_error(exc):
+    """解码错误处理：孤立的坏字节按cp1252/latin-1逐字节解码，不中断解析也不重读文件"""
+    if not isinstance(exc, UnicodeDecodeError):
+        raise exc
+    bad = exc.object[exc.start:exc.end]
+    return ''.join(_FALLBACK_CHARS[b] for b in bad), exc.end
+
+codecs.register_error(ENCODING_ERRORS, _fallback_decode_error)
+
+def detect_encoding(file_path, sample_size=ENCODING_SAMPLE_SIZE):
+    """根据文件开头的样本嗅探编码，只读取一次样本
+
+    压缩文件取解压后内容的样本，zip取第一个RIS成员；没有内容时返回utf-8。
+    """
+    with open_ris_binary(file_path) as raw:
+        for _, stream in iter_ris_streams(raw):
+            return detect_sample_encoding(stream.peek(sample_size)[:sample_size])
+    return 'utf-8'
+
+def detect_sample_encoding(sample):
+    """根据字节样本嗅探编码"""
+    for bom, encoding in _BOM_ENCODINGS:
+        if sample.startswith(bom):
+            return encoding
+
+    # 无BOM的UTF-16（如EndNote导出）：ASCII字符的高位字节为0
+    if len(sample) >= 4:
+        even_zeros = sample[0::2].count(0)
+        odd_zeros = sample[1::2].count(0)
+        half = len(sample) // 2
+        if odd_zeros > half * 0.3 and even_zeros < half * 0.05:
+            return 'utf-16-le'
+        if even_zeros > half * 0.3 and odd_zeros < half * 0.05:
+            return 'utf-16-be'
+
+    # 样本末尾可能截断了多字节字符，不计入解码错误
+    text = codecs.getincrementaldecoder('utf-8')('replace').decode(sample)
+    bad_chars = text.count('\ufffd')
+    if bad_chars == 0:
+        return 'utf-8'
+    # 合法的多字节序列多于坏字节时，视为夹杂个别坏字节的UTF-8文件
+    multibyte_chars = sum(1 for ch in text if ch > '\x7f') - bad_chars
+    if multibyte_chars > bad_chars:
+        return 'utf-8'
+
+    if _CP1252_UNDEFINED.isdisjoint(sample):
+        return 'cp1252'
+    return 'latin-1'
+
+def detect_compression(file_path):
+    """根据文件头的魔数判断压缩格式（gzip、bz2、xz、zip），未压缩时返回None"""
+    with open(file_path, 'rb') as file:
+        header = file.read(8)
+    for magic, compression in COMPRESSION_MAGIC:
+        if header.startswith(magic):
+            return compression
+    return None
+
+def open_ris_binary(file_path, stats=None):
+    """以二进制方式打开RIS输入文件（可能是压缩文件）
+
+    指定stats（RunStats）时把读取的字节数和读取耗时计入其中；压缩文件计入的是压缩后的字节数。
+    """
+    if stats is not None:
+        return open_timed(file_path, stats, ENCODING_SAMPLE_SIZE)
+    return open(file_path, 'rb', buffering=ENCODING_SAMPLE_SIZE)
+
+def iter_ris_streams(raw):
+    """按魔数识别压缩格式，逐个产出 (成员名, 解压后的二进制流)
+
+    未压缩文件和gz/bz2/xz文件只有一个流（成员名为None），zip文件产出其中的每个.ris成员
+    （没有.ris成员时为全部文件成员）。解压在读取时流式进行，不写临时文件；
+    产出的流都支持peek，raw.tell()即为已读取的（压缩后）字节数。
+    """
+    header = raw.peek(8)[:8]
+    compression = next((name for magic, name in COMPRESSION_MAGIC if header.startswith(magic)), None)
+    if compression is None:
+        yield None, raw
+        return
+
+    # 解压模块只在遇到压缩文件时导入
+    if compression == 'gzip':
+        import gzip
+        yield None, io.BufferedReader(gzip.GzipFile(fileobj=raw), ENCODING_SAMPLE_SIZE)
+    elif compression == 'bz2':
+        import bz2
+        yield None, io.BufferedReader(bz2.BZ2File(raw), ENCODING_SAMPLE_SIZE)
+    elif compression == 'xz':
+        import lzma
+        yield None, io.BufferedReader(lzma.LZMAFile(raw), ENCODING_SAMPLE_SIZE)
+    else:
+        import zipfile
+        with zipfile.ZipFile(raw) as archive:
+            members = [info.filename for info in archive.infolist()
+                       if not info.is_dir() and not info.filename.startswith('__MACOSX/')]
+            ris_members = [name for name in members if name.lower().endswith('.ris')]
+            for name in ris_members or members:
+                with archive.open(name) as member:
+                    yield name, io.BufferedReader(member, ENCODING_SAMPLE_SIZE)
+
+def iter_ris_texts(raw, encoding=None):
+    """逐个产出RIS输入中各个流的文本包装：未指定编码时按每个流开头的样本分别检测，
+    孤立坏字节按行内回退解码；用完的包装与流分离，不关闭raw，之后仍可读取raw.tell()"""
+    for _, stream in iter_ris_streams(raw):
+        stream_encoding = encoding or detect_sample_encoding(stream.peek(ENCODING_SAMPLE_SIZE))
+        text = io.TextIOWrapper(stream, encoding=stream_encoding, errors=ENCODING_ERRORS)
+        try:
+            yield text
+        finally:
+            text.detach()
+
+def _file_progress(raw, progress):
+    """把 progress(字节数, 记录数, 词数) 包装为标题级回调，已读字节数取自底层文件位置"""
+    return lambda _, records, tokens: progress(raw.tell(), records, tokens)
+
+def parse_year(value):
+    """从PY/Y1字段值（如"2020"、"2020/05/01/"）中提取四位出版年份，无法识别时返回None"""
+    match = _YEAR_PATTERN.search(value)
+    return int(match.group()) if match else None
+
+class RISRecord:
+    """一条RIS记录：按出现顺序保存的 (标签, 值) 字段
+
+    标签和值分别存为元组，同一标签可出现多次（如AU、KW）；跨行的字段值以空格连接。
+    使用__slots__且不为每条记录建立字典，保存大量记录时内存占用较小。
+    """
+
+    __slots__ = ('tags', 'values')
+
+    def __init__(self, tags, values):
+        self.tags = tags
+        self.values = values
+
+    def get(self, tag, default=None):
+        """第一个tag字段的值"""
+        for field_tag, value in zip(self.tags, self.values):
+            if field_tag == tag:
+                return value
+        return default
+
+    def get_all(self, tag):
+        """所有tag字段的值列表"""
+        return [value for field_tag, value in zip(self.tags, self.values) if field_tag == tag]
+
+    @property
+    def titles(self):
+        """TI字段中的非空标题，多余空白压缩为单个空格"""
+        titles = []
+        for field_tag, value in zip(self.tags, self.values):
+            if field_tag == 'TI':
+                title = ' '.join(value.split())
+                if title:
+                    titles.append(title)
+        return titles
+
+    @property
+    def year(self):
+        """出版年份：取自PY字段，没有PY时取Y1，都缺失或无法识别时为None"""
+        return _record_year(self.tags, self.values)
+
+    def to_dict(self):
+        """{标签: [值, ...]}"""
+        fields = {}
+        for field_tag, value in zip(self.tags, self.values):
+            fields.setdefault(field_tag, []).append(value)
+        return fields
+
+    def __repr__(self):
+        return f"RISRecord({self.to_dict()!r})"
+
+def _record_year(tags, values):
+    """记录的出版年份（见RISRecord.year）"""
+    for year_tag in YEAR_TAGS:
+        for tag, value in zip(tags, values):
+            if tag == year_tag:
+                return parse_year(value)
+    return None
+
+def _iter_record_fields(lines, tags=None, stats=None):
+    """通用RIS解析状态机：识别任意 "XX  - " 字段行，每条记录结束（ER、下一个TY或文件末尾）时
+    产出该记录保留的 (标签列表, 值列表)，不建立RISRecord
+
+    按行首5个字符（标签和分隔符）查表分派，每种字段行只在第一次出现时判断一次标签，之后
+    直接查表；以字段标签开头的行无需先去掉首尾空白。不是字段行的非空行是上一个字段的续行。
+    tags为要保留的字段标签集合，None表示保留全部字段；不保留的字段仍会结束上一个字段，
+    其续行被忽略。指定stats时在解析结束后记入记录数（TY行数）。
+    """
+    keep_all = tags is None
+    # 行首 "XX  -" -> 保留时使用的标签字符串（各记录共享），或不保留/记录开始/记录结束标记
+    dispatch = {} if keep_all else {tag + FIELD_SEPARATOR: sys.intern(tag) for tag in tags}
+    start_tag = sys.intern(RECORD_START_TAG) if keep_all or RECORD_START_TAG in tags else None
+    dispatch[RECORD_START_TAG + FIELD_SEPARATOR] = _RECORD_START
+    dispatch[RECORD_END_TAG + FIELD_SEPARATOR] = _RECORD_END
+    lookup = dispatch.get
+    record_count = 0
+    in_record = False
+    record_tags = []
+    record_values = []
+    keep = False  # 续行是否追加到上一个字段
+
+    for line in lines:
+        action = lookup(line[:5])
+        if action is None:
+            # 空行、续行、行首有空白的行或第一次出现的字段
+            line = line.strip()
+            action = lookup(line[:5])
+            if action is None:
+                if line[2:5] == FIELD_SEPARATOR and line[:2].isupper():
+                    action = dispatch[line[:5]] = sys.intern(line[:2]) if keep_all else _SKIP_FIELD
+                else:
+                    if keep and line:
+                        # 字段可能跨多行，继续添加
+                        record_values[-1] = f"{record_values[-1]} {line}" if record_values[-1] else line
+                    continue
+
+        if action is _SKIP_FIELD:
+            # 不保留的字段结束上一个字段
+            in_record = True
+            keep = False
+        elif action is _RECORD_END:
+            if in_record:
+                yield record_tags, record_values
+                record_tags = []
+                record_values = []
+            in_record = keep = False
+        elif action is _RECORD_START:
+            record_count += 1
+            # 上一条记录缺少ER标记
+            if in_record:
+                yield record_tags, record_values
+                record_tags = []
+                record_values = []
+            in_record = True
+            keep = start_tag is not None
+            if keep:
+                record_tags.append(start_tag)
+                record_values.append(line[5:].strip())
+        else:
+            in_record = keep = True
+            record_tags.append(action)
+            record_values.append(line[5:].strip())
+
+    # 处理文件末尾没有ER标记的情况
+    if in_record:
+        yield record_tags, record_values
+
+    if stats is not None:
+        stats.add('records', record_count)
+
+def iter_records_from_lines(lines, tags=None, stats=None):
+    """通用RIS解析：每条记录结束（ER、下一个TY或文件末尾）时产出RISRecord
+
+    不是字段行的非空行是上一个字段的续行。tags为要保留的字段标签集合，
+    None表示保留全部字段；不保留的字段仍会结束上一个字段，其续行被忽略。
+    指定stats时在解析结束后记入记录数（TY行数）。
+    """
+    for record_tags, record_values in _iter_record_fields(lines, tags, stats):
+        yield RISRecord(tuple(record_tags), tuple(record_values))
+
+def iter_titles_from_lines(lines, with_year=False, stats=None):
+    """逐行消费文本行，每解析完一条记录即产出其标题
+
+    with_year为True时产出 (标题, 出版年份)，年份取自同一记录的PY字段
+    （没有PY时取Y1，都缺失时为None）。指定stats时在解析结束后记入记录数（TY行数）。
+    """
+    return iter_field_texts_from_lines(lines, with_year=with_year, stats=stats)
+
+def iter_texts_from_records(records, fields=DEFAULT_FIELDS, keyword_counts=None, with_year=False, stats=None,
+                            dedup=None):
+    """逐条记录产出所选字段的文本，records为 (标签序列, 值序列) 的可迭代对象
+
+    只分析标题时逐个产出清理空白后的标题。选择了标题以外的字段时每条记录只产出一个
+    文本（各字段值用换行符拼接，换行符不属于词语，也是短语边界），文本数量即记录数，
+    文档频率也按记录计。关键词（KW）不分词：按split_keywords拆成短语计入keyword_counts，
+    短语数计入stats的词数（tokens），与分词得到的词同一口径；只有关键词的记录产出一个
+    空字符串，使它也计入记录数。with_year为True时产出 (文本, 出版年份)。
+    dedup为RecordDeduplicator时跳过重复的记录。
+    """
+    titles_only = tuple(fields) == DEFAULT_FIELDS
+    year = None
+    for tags, values in records:
+        if dedup is not None and dedup.is_duplicate(RISRecord(tags, values)):
+            continue
+        if with_year:
+            year = _record_year(tags, values)
+        if titles_only:
+            for tag, value in zip(tags, values):
+                if tag == 'TI':
+                    # 字段值已去掉首尾空白；只含可打印字符且没有连续空格时无需再压缩空白
+                    if not value.isprintable() or '  ' in value:
+                        value = ' '.join(value.split())
+                    if value:
+                        yield (value, year) if with_year else value
+            continue
+        texts = []
+        keyword_total = 0
+        for tag, value in zip(tags, values):
+            if not value or tag not in fields:
+                continue
+            if tag != KEYWORD_FIELD:
+                texts.append(value)
+            elif keyword_counts is not None:
+                phrases = split_keywords(value)
+                keyword_counts.update(phrases)
+                keyword_total += len(phrases)
+        if keyword_total and stats is not None:
+            stats.add('tokens', keyword_total)
+        if texts or keyword_total:
+            text = '\n'.join(texts)
+            yield (text, year) if with_year else text
+
+def iter_field_texts_from_lines(lines, fields=DEFAULT_FIELDS, keyword_counts=None, with_year=False, stats=None,
+                                dedup=None, records=None):
+    """解析文本行并逐条记录产出所选字段的文本（见iter_texts_from_records）
+
+    只保留分析需要的字段。records为列表时解析RECORD_CACHE_TAGS中的全部字段，
+    并把每条记录（去重之前）以 (标签元组, 值元组) 追加到其中，供解析缓存使用。
+    """
+    if records is not None:
+        parsed = _collect_records_into(_iter_record_fields(lines, RECORD_CACHE_TAGS, stats), records)
+    else:
+        tags = set(fields)
+        if with_year:
+            tags.update(YEAR_TAGS)
+        if dedup is not None:
+            tags.update(DEDUP_TAGS)
+        parsed = _iter_record_fields(lines, tags, stats)
+    return iter_texts_from_records(parsed, fields, keyword_counts, with_year, stats, dedup)
+
+def _collect_records_into(records, sink):
+    """透传解析出的记录的同时把 (标签元组, 值元组) 追加到sink列表中"""
+    for tags, values in records:
+        tags = tuple(tags)
+        values = tuple(values)
+        sink.append((tags, values))
+        yield tags, values
+
+def iter_titles_from_binary(raw, encoding=None, with_year=False, stats=None, fields=DEFAULT_FIELDS,
+                            keyword_counts=None, dedup=None, records=None):
+    """解析已打开的RIS输入中的全部标题（或所选字段的文本），zip中的各成员依次解析"""
+    for text in iter_ris_texts(raw, encoding):
+        yield from iter_field_texts_from_lines(text, fields, keyword_counts, with_year, stats, dedup, records)
+
+def iter_ris_full_records(file_path, encoding=None, tags=None, stats=None):
+    """逐条解析RIS文件中的完整记录，产出RISRecord（生成器）
+
+    tags为要保留的字段标签集合，None表示保留全部字段。编码检测和压缩文件的处理同iter_ris_records。
+    """
+    with open_ris_binary(file_path, stats) as raw:
+        for text in iter_ris_texts(raw, encoding):
+            yield from iter_records_from_lines(text, tags, stats)
+
+def iter_ris_records(file_path, encoding=None, with_year=False, stats=None, fields=DEFAULT_FIELDS,
+                     keyword_counts=None, dedup=None):
+    """逐条解析RIS记录，每解析完一条记录即产出其标题（生成器，内存占用恒定）
+
+    encoding为None时从文件开头嗅探编码，整个文件只解码一遍。gz、bz2、xz和zip
+    压缩文件按魔数识别并边读边解压。with_year为True时产出 (标题, 出版年份)。
+    stats用于记录读取字节数、耗时和记录数。fields、keyword_counts和dedup见iter_field_texts_from_lines。
+    """
+    with open_ris_binary(file_path, stats) as raw:
+        yield from iter_titles_from_binary(raw, encoding, with_year, stats, fields, keyword_counts, dedup)
 
 def parse_ris_file(file_path):
-    """解析RIS文件并提取标题"""
+    """解析RIS文件并提取标题（一次性返回全部标题列表）"""
     titles = []
-    current_title = ""
-    in_title = False
 
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            print(f"成功打开文件: {file_path}")
-            for line in file:
-                line = line.strip()
-
-                if line.startswith('TI  - '):  # 标题开始行
-                    current_title = line[6:].strip()
-                    in_title = True
-                elif in_title and line and not line.startswith(('TY  -', 'AU  -', 'PY  -', 'T2  -', 'VL  -', 'IS  -', 'SP  -', 'EP  -', 'DO  -', 'UR  -', 'AB  -', 'KW  -', 'M3  -', 'DB  -', 'N1  -', 'ER  -', 'C7  -', 'ST  -')):
-                    # 标题可能跨多行，继续添加
-                    current_title += " " + line
-                elif line.startswith('ER  - ') or (in_title and line.startswith(('AU  -', 'PY  -', 'T2  -', 'AB  -'))):  # 记录结束或其他字段开始
-                    if current_title:
-                        # 清理标题，移除多余空格
-                        clean_title = ' '.join(current_title.split())
-                        titles.append(clean_title)
-                    current_title = ""
-                    in_title = False
-
-            # 处理文件末尾没有ER标记的情况
-            if current_title:
-                clean_title = ' '.join(current_title.split())
-                titles.append(clean_title)
-                print(f"文件末尾标题: {clean_title}")
-
-            if len(titles) == 0:
-                print("警告: 未找到任何以'TI  - '开头的标题行")
-                print("文件前20行内容预览:")
-                with open(file_path, 'r', encoding='utf-8') as preview:
-                    for i, line in enumerate(preview):
-                        if i < 20:
-                            print(f"{i+1}: {line.strip()}")
-                        else:
-                            break
-    except UnicodeDecodeError:
-        print("UTF-8编码打开失败，尝试其他编码...")
-        try:
-            with open(file_path, 'r', encoding='latin-1') as file:
-                print("使用latin-1编码重新解析...")
-                for line in file:
-                    line = line.strip()
-
-                    if line.startswith('TI  - '):
-                        current_title = line[6:].strip()
-                        in_title = True
-                    elif in_title and line and not line.startswith(('TY  -', 'AU  -', 'PY  -', 'T2  -', 'VL  -', 'IS  -', 'SP  -', 'EP  -', 'DO  -', 'UR  -', 'AB  -', 'KW  -', 'M3  -', 'DB  -', 'N1  -', 'ER  -', 'C7  -', 'ST  -')):
-                        current_title += " " + line
-                    elif line.startswith('ER  - ') or (in_title and line.startswith(('AU  -', 'PY  -', 'T2  -', 'AB  -'))):
-                        if current_title:
-                            clean_title = ' '.join(current_title.split())
-                            titles.append(clean_title)
-                        current_title = ""
-                        in_title = False
-
-                if current_title:
-                    clean_title = ' '.join(current_title.split())
-                    titles.append(clean_title)
-        except Exception as e:
-            print(f"打开文件时出错: {e}")
+        encoding = detect_encoding(file_path)
+        print(f"成功打开文件: {file_path} (编码: {encoding})")
+        # zip中的各成员可能编码不同，逐个检测
+        titles = list(iter_ris_records(file_path, None if detect_compression(file_path) == 'zip' else encoding))
+
+        if len(titles) == 0:
+            preview_ris_file(file_path)
     except Exception as e:
         print(f"打开文件时出错: {e}")
 
     return titles
 
+def preview_ris_file(file_path, max_lines=20):
+    """未找到标题时打印文件开头内容，便于排查格式问题"""
+    print("警告: 未找到任何以'TI  - '开头的标题行")
+    print(f"文件前{max_lines}行内容预览:")
+    with open_ris_binary(file_path) as raw:
+        preview = next(iter_ris_texts(raw), ())
+        for i, line in enumerate(preview):
+            if i < max_lines:
+                print(f"{i+1}: {line.strip()}")
+            else:
+                break
+
 def normalize_word(word):
     """词形规范化：将复数形式转换为单数形式"""
     # 处理常见的复数形式
@@ -95,87 +555,968 @@ def normalize_word(word):
 
     return word
 
-def analyze_word_frequency(titles, top_n=50):
-    """分析标题中的词频"""
-    print(f"开始分析 {len(titles)} 个标题的词频...")
-
-    # 学术文章标题专用停用词列表
-    # 保留学术价值高的词汇，移除常见的功能词和连接词
-    stop_words = {
-        # 基础功能词
-        'a', 'an', 'the', 'and', 'or', 'but', 'if', 'of', 'at', 'by',
-        'for', 'with', 'about', 'to', 'from', 'in', 'on', 'is', 'are',
-        'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
-        'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may',
-        'might', 'must', 'can', 'this', 'that', 'these', 'those',
-
-        # 代词（在学术标题中很少出现，但保留以防万一）
-        'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her',
-        'us', 'them', 'my', 'your', 'his', 'its', 'our', 'their',
-
-        # 疑问词和副词（某些在学术标题中可能有意义，谨慎移除）
-        'what', 'which', 'who', 'whom', 'whose', 'where', 'when', 'why', 'how',
-
-        # 量词和限定词
-        'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such',
-        'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very',
-
-        # 常见副词和介词
-        'just', 'now', 'also', 'as', 'up', 'out', 'down', 'off', 'over', 'under',
-        'again', 'further', 'then', 'once', 'here', 'there', 'into', 'onto',
-        'upon', 'within', 'without', 'through', 'during', 'before', 'after',
-        'above', 'below', 'between', 'among',
-
-        # 学术标题中常见但信息量较低的词汇
-        'study', 'studies', 'research', 'investigation', 'paper', 'article',
-        'review', 'survey', 'overview', 'introduction', 'conclusion',
-        'case', 'cases', 'example', 'examples', 'method', 'methods',
-        'approach', 'approaches', 'technique', 'techniques', 'way', 'ways',
-        'new', 'novel', 'improved', 'enhanced', 'advanced', 'modern',
-        'recent', 'current', 'latest', 'state', 'art', 'based', 'using',
-        'via', 'through', 'toward', 'towards', 'into', 'onto', 'upon'
-    }
-
-    # 使用简单的空格分词
-    all_words = []
-    total_titles = len(titles)
+def split_keywords(value):
+    """把KW字段值拆分为关键词短语：按分号分隔，转小写、压缩空白并去掉首尾标点"""
+    keywords = []
+    for keyword in value.split(';'):
+        keyword = ' '.join(keyword.lower().split()).strip(_KEYWORD_STRIP_CHARS)
+        if keyword:
+            keywords.append(keyword)
+    return keywords
+
+def fields_label(fields):
+    """字段的中文名称，如 "标题/摘要" """
+    return '/'.join(ANALYSIS_FIELDS[field] for field in fields)
+
+def frequency_chart_title(fields=DEFAULT_FIELDS, ngram=1):
+    """词频图表标题，如 "标题/摘要词频分布 (Title/Abstract Word Frequency)" """
+    english = '/'.join(FIELD_NAMES_EN[field] for field in fields)
+    if ngram > 1:
+        return f"{fields_label(fields)}{NGRAM_LABELS[ngram]}频次分布 ({english} Phrase Frequency)"
+    return f"{fields_label(fields)}词频分布 ({english} Word Frequency)"
+
+def iter_tokens(text):
+    """分词：转小写，取连续的字母/数字串，惰性产出长度大于2的纯字母单词
+
+    与"把非字母数字和空白的字符替换为空格后按空白分词"的结果完全一致，
+    但只需一次预编译正则扫描，不生成中间字符串。所有单词计数都经由此函数分词。
+    """
+    return filter(str.isalpha, _WORD_PATTERN.findall(text.lower()))
+
+def tokenize_batch(titles):
+    """批量分词：标题用换行符拼接后整体扫描（换行符不属于词语，不会把相邻标题的词连在一起）"""
+    return iter_tokens('\n'.join(titles))
+
+def is_token(word):
+    """单个已切分的词是否会被iter_tokens保留（短语统计逐词判断时使用）"""
+    return len(word) > 2 and word.isalpha()
+
+def tokenize_title(title):
+    """单个标题的分词结果列表"""
+    return list(iter_tokens(title))
+
+def count_raw_tokens(titles, progress_every=None, batch_size=TOKENIZE_BATCH_SIZE, progress=None, stats=None):
+    """逐条统计标题中的原始词（停用词过滤和词形规范化之前）
+
+    只做与停用词无关的处理：转小写、去标点、分词，保留长度大于2的字母单词。
+    返回 (原始词频Counter, 标题数量)。该词频表与停用词设置无关，
+    修改停用词后可用apply_stop_words在词汇表规模上重新计算。
+
+    标题按批用换行符拼接后整体转小写和分词（换行符不属于词语，不会把相邻
+    标题的词连在一起），计数在C层完成。
+
+    progress为可选回调 progress(字节数, 记录数, 词数)，每处理一批标题调用一次
+    （字节数未知时为None）；回调抛出AnalysisCancelled即可中止统计。
+
+    指定stats时按批记录分词（tokenize）和计数（count）耗时，其余循环耗时扣除
+    读取耗时后记为解析（parse）耗时，并记入标题数和原始词数。
+    """
+    raw_counts = Counter()
+    total_titles = len(titles) if hasattr(titles, '__len__') else None
+    title_count = 0
+    token_count = 0
+    batch = []
+    if stats is not None:
+        started = time.perf_counter()
+        io_before = stats.stage_seconds.get('io', 0.0)
+        busy = 0.0  # 分词和计数耗时
+
+    def flush():
+        nonlocal token_count, busy
+        tokens = tokenize_batch(batch)
+        if progress is None and stats is None:
+            raw_counts.update(tokens)
+            return
+        if stats is not None:
+            batch_started = time.perf_counter()
+            tokens = list(tokens)
+            tokenized = time.perf_counter()
+            raw_counts.update(tokens)
+            counted = time.perf_counter()
+            stats.add_time('tokenize', tokenized - batch_started)
+            stats.add_time('count', counted - tokenized)
+            busy += counted - batch_started
+        else:
+            tokens = list(tokens)
+            raw_counts.update(tokens)
+        token_count += len(tokens)
+        if progress is not None:
+            progress(None, title_count, token_count)
+
+    for title in titles:
+        title_count += 1
+        if progress_every and (title_count % progress_every == 0 or title_count == 1
+                               or title_count == total_titles):
+            if total_titles:
+                print(f"  处理进度: {title_count}/{total_titles} ({title_count/total_titles*100:.1f}%)")
+            else:
+                print(f"  处理进度: {title_count}")
+
+        batch.append(title)
+        if len(batch) >= batch_size:
+            flush()
+            batch.clear()
+
+    if batch:
+        flush()
+
+    if stats is not None:
+        stats.add('titles', title_count)
+        stats.add('tokens', token_count)
+        io_seconds = stats.stage_seconds.get('io', 0.0) - io_before
+        stats.add_time('parse', time.perf_counter() - started - busy - io_seconds)
+    return raw_counts, title_count
+
+def apply_stop_words(raw_counts, stop_words=STOP_WORDS, stats=None):
+    """在原始词频表上过滤停用词并进行词形规范化，耗时只与词汇量有关
+
+    返回 (词频Counter, 保留的词汇总数)。结果（包括同频词的先后顺序）与逐条
+    过滤标题得到的结果完全一致。指定stats时记入过滤耗时，并把原始词数、保留和被过滤的
+    词数及词汇量设为该词频表的值（监视模式下多次调用时反映最新的完整词频表）。
+    """
+    started = time.perf_counter()
+    word_counts = Counter()
+    token_count = 0
+    for word, count in raw_counts.items():
+        if word in stop_words:
+            continue
+        normalized_word = normalize_word(word)
+        # 再次检查规范化后的词是否在停用词中
+        if normalized_word not in stop_words:
+            word_counts[normalized_word] += count
+            token_count += count
+
+    if stats is not None:
+        stats.add_time('stop_words', time.perf_counter() - started)
+        total = sum(raw_counts.values())
+        stats.set('tokens', total)
+        stats.set('tokens_kept', token_count)
+        stats.set('tokens_dropped', total - token_count)
+        stats.set('raw_vocabulary', len(raw_counts))
+        stats.set('vocabulary', len(word_counts))
+    return word_counts, token_count
+
+def count_words(titles, stop_words=STOP_WORDS, progress_every=None, stats=None):
+    """逐条统计标题词频，直接累加到Counter，不构建全量词汇列表
+
+    titles可以是列表或任意可迭代对象（如iter_ris_records生成器），
+    返回 (词频Counter, 标题数量, 词汇总数)。
+    """
+    raw_counts, title_count = count_raw_tokens(titles, progress_every, stats=stats)
+    word_counts, token_count = apply_stop_words(raw_counts, stop_words, stats)
+    return word_counts, title_count, token_count
+
+def approximate_word_frequency(titles, top_n=50, stop_words=STOP_WORDS, capacity=None,
+                               batch_size=TOKENIZE_BATCH_SIZE):
+    """近似词频统计：用Space-Saving在固定内存内找出高频词，适合超大语料
+
+    capacity为跟踪的词数上限（默认top_n的20倍且不少于1000），内存占用与语料
+    规模和词汇量无关。返回 (前top_n个(词, 计数, 误差上界), 标题数量, 词汇总数, 统计器)。
+    """
+    sketch = SpaceSavingCounter(capacity or max(top_n * 20, 1000))
+    title_count = 0
+    batch = []
+
+    def flush():
+        # 批内先局部计数，再逐个不同的词过滤停用词、规范化后带权累加
+        for word, count in Counter(tokenize_batch(batch)).items():
+            if word in stop_words:
+                continue
+            normalized_word = normalize_word(word)
+            if normalized_word not in stop_words:
+                sketch.add(normalized_word, count)
+        batch.clear()
+
+    for title in titles:
+        title_count += 1
+        batch.append(title)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    return sketch.most_common(top_n), title_count, sketch.total, sketch
+
+def _prune_phrases(phrase_counts, max_phrases):
+    """短语表超过上限时，从低频开始删除短语，直到只剩一半容量"""
+    threshold = 1
+    while len(phrase_counts) > max_phrases // 2:
+        for phrase in [phrase for phrase, count in phrase_counts.items() if count <= threshold]:
+            del phrase_counts[phrase]
+        threshold += 1
+
+def count_ngrams(titles, stop_words=STOP_WORDS, max_n=3, max_phrases=MAX_PHRASES, progress=None,
+                 progress_interval=TOKENIZE_BATCH_SIZE, stats=None):
+    """单遍统计单词、二元和三元短语的频次
+
+    停用词、被过滤的词（非纯字母或长度不超过2）以及句读标点都视为短语边界，
+    短语由规范化后的词以空格连接。短语表超过max_phrases时周期性淘汰低频短语，
+    保证内存有界（被保留短语的计数可能略微偏低）。单词计数与count_words一致。
+    返回 ({n: Counter}, 标题数量)。progress回调同count_raw_tokens，
+    每progress_interval个标题调用一次，词数为计入的单词数。
+
+    指定stats时逐个标题记录统计耗时：分词与计数交织进行，都记为计数（count）耗时，
+    其余循环耗时扣除读取耗时后记为解析（parse）耗时。
+    """
+    counts = {n: Counter() for n in range(1, max_n + 1)}
+    unigram_counts = counts[1]
+    # 原始词 -> 规范化后的词（停用词为''，非纯字母或过短的词为None），避免重复规范化
+    normalized_cache = {}
+    title_count = 0
+    token_count = 0
+    dropped_count = 0  # 被停用词过滤的词数
+    if stats is not None:
+        started = time.perf_counter()
+        io_before = stats.stage_seconds.get('io', 0.0)
+        busy = 0.0
+
+    for title in titles:
+        if stats is not None:
+            title_started = time.perf_counter()
+        title_count += 1
+        for segment in _PHRASE_BOUNDARY_PATTERN.split(title.lower()):
+            run = []
+            for word in _TOKEN_PATTERN.findall(segment):
+                normalized_word = normalized_cache.get(word, False)
+                if normalized_word is False:
+                    normalized_word = None
+                    if is_token(word):
+                        normalized_word = ''
+                        if word not in stop_words:
+                            normalized_word = normalize_word(word)
+                            if normalized_word in stop_words:
+                                normalized_word = ''
+                    normalized_cache[word] = normalized_word
+                if not normalized_word:
+                    # 短语边界
+                    if normalized_word is not None:
+                        dropped_count += 1
+                    run = []
+                    continue
+                unigram_counts[normalized_word] += 1
+                token_count += 1
+                run.append(normalized_word)
+                for n in range(2, min(len(run), max_n) + 1):
+                    counts[n][' '.join(run[-n:])] += 1
+
+        for n in range(2, max_n + 1):
+            if len(counts[n]) > max_phrases:
+                _prune_phrases(counts[n], max_phrases)
+
+        if stats is not None:
+            busy += time.perf_counter() - title_started
+        if progress is not None and title_count % progress_interval == 0:
+            progress(None, title_count, token_count)
+
+    if progress is not None:
+        progress(None, title_count, token_count)
+
+    if stats is not None:
+        stats.add('titles', title_count)
+        stats.add('tokens', token_count + dropped_count)
+        stats.add('tokens_kept', token_count)
+        stats.add('tokens_dropped', dropped_count)
+        stats.set('vocabulary', len(unigram_counts))
+        stats.add_time('count', busy)
+        io_seconds = stats.stage_seconds.get('io', 0.0) - io_before
+        stats.add_time('parse', time.perf_counter() - started - busy - io_seconds)
+    return counts, title_count
+
+def count_ngrams_in_file(file_path, stop_words=STOP_WORDS, encoding=None, keep_records=False, progress=None,
+                         stats=None, fields=DEFAULT_FIELDS, dedup=None):
+    """边解析RIS文件边统计单词和短语频次，progress回调报告已读字节数
+
+    返回 ({n: Counter}, 标题数量)，keep_records为True时额外返回解析出的记录列表（供解析缓存使用，
+    见iter_field_texts_from_lines）。fields为要统计的文本字段（TI、AB），关键词字段不参与短语统计；
+    dedup用于跳过重复记录。
+    """
+    kept = [] if keep_records else None
+    with open_ris_binary(file_path, stats) as raw:
+        titles = iter_titles_from_binary(raw, encoding, stats=stats, fields=fields, dedup=dedup, records=kept)
+        file_progress = _file_progress(raw, progress) if progress else None
+        result = count_ngrams(titles, stop_words, progress=file_progress, stats=stats)
+    return result + (kept,) if keep_records else result
+
+def count_term_trends(title_years, top_n=20, stop_words=STOP_WORDS, batch_size=TOKENIZE_BATCH_SIZE):
+    """单遍扫描构建 年份 × 高频词 的词频矩阵
+
+    title_years为 (标题, 年份) 的可迭代对象，如iter_ris_records(path, with_year=True)。
+    扫描时按年份累计原始词频，结束后选出全部有年份标题中的前top_n个高频词。
+    返回 (年份列表, 词列表, 矩阵, 无年份的标题数)：矩阵为NumPy int64数组，
+    形状为 (年份数, 词数)，年份取最小到最大年份的连续区间（缺失的年份计为0）。
+    """
+    import numpy as np
+
+    year_raw_counts = defaultdict(Counter)
+    batches = defaultdict(list)
+    pending = 0
+    undated_count = 0
+
+    def flush():
+        for year, batch in batches.items():
+            year_raw_counts[year].update(tokenize_batch(batch))
+        batches.clear()
+
+    for title, year in title_years:
+        if year is None:
+            undated_count += 1
+            continue
+        batches[year].append(title)
+        pending += 1
+        if pending >= batch_size:
+            flush()
+            pending = 0
+    flush()
+
+    if not year_raw_counts:
+        return [], [], np.zeros((0, 0), dtype=np.int64), undated_count
+
+    years = list(range(min(year_raw_counts), max(year_raw_counts) + 1))
+    total_raw_counts = Counter()
+    for year in sorted(year_raw_counts):
+        total_raw_counts.update(year_raw_counts[year])
+    terms = [term for term, _ in apply_stop_words(total_raw_counts, stop_words)[0].most_common(top_n)]
+
+    matrix = np.zeros((len(years), len(terms)), dtype=np.int64)
+    for row, year in enumerate(years):
+        if year in year_raw_counts:
+            year_counts, _ = apply_stop_words(year_raw_counts[year], stop_words)
+            matrix[row] = [year_counts.get(term, 0) for term in terms]
+
+    return years, terms, matrix, undated_count
+
+def save_term_trends_csv(years, terms, matrix, filename):
+    """保存年度词频矩阵为CSV：每行一个年份，每列一个词"""
+    with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Year'] + list(terms))
+        for year, row in zip(years, matrix.tolist()):
+            writer.writerow([year] + row)
+
+def split_ris_chunks(file_path, chunk_size=PARALLEL_CHUNK_SIZE, start=0, end=None):
+    """将文件（或[start, end)字节范围）切分为若干块，每个切分点都落在"ER  -"行之后，保证记录不跨块"""
+    if end is None:
+        end = os.path.getsize(file_path)
+    if end <= start:
+        return []
+
+    boundaries = [start]
+    with open(file_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        target = start + chunk_size
+        while target < end:
+            er_pos = mm.find(b'\nER  -', target, end)
+            if er_pos == -1:
+                break
+            line_end = mm.find(b'\n', er_pos + 1, end)
+            if line_end == -1:
+                break
+            boundaries.append(line_end + 1)
+            target = max(line_end + 1, target + chunk_size)
+    if boundaries[-1] < end:
+        boundaries.append(end)
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+def find_last_record_end(file_path, start=0, end=None):
+    """[start, end)范围内最后一个完整的"ER  -"行之后的位置，没有完整记录时返回start
+
+    文件末尾正在写入、还没有换行符的ER行不算完整。
+    """
+    if end is None:
+        end = os.path.getsize(file_path)
+    if end <= start:
+        return start
+    with open(file_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        position = end
+        while True:
+            er_pos = mm.rfind(b'\nER  -', max(start - 1, 0), position)
+            if er_pos == -1:
+                return start
+            line_end = mm.find(b'\n', er_pos + 1, end)
+            if line_end != -1:
+                return line_end + 1
+            position = er_pos
+
+def _count_documents_into(titles, doc_counts):
+    """透传标题的同时统计文档频率：每个标题中出现的词（规范化后）在doc_counts中加1"""
+    normalized = {}
+
+    def form(word):
+        result = normalized.get(word)
+        if result is None:
+            result = normalized[word] = normalize_word(word)
+        return result
+
+    for title in titles:
+        # 先对原始词去重，每个不同的词只规范化一次
+        doc_counts.update(set(map(form, set(iter_tokens(title)))))
+        yield title
+
+def _add_keyword_documents(doc_counts, keyword_counts):
+    """关键词短语的文档频率按出现次数计（每个关键词字段值算一个文档）"""
+    for phrase, count in keyword_counts.items():
+        doc_counts[normalize_word(phrase)] += count
+
+def count_raw_tokens_in_chunk(file_path, start, end, encoding, keep_records=False, with_stats=False,
+                              fields=DEFAULT_FIELDS, with_doc_counts=False, dedup=None, progress=None):
+    """统计文件中[start, end)字节范围内标题（或所选字段）的原始词频（进程池任务）
+
+    返回 (原始词频Counter, 文本数量, 记录列表, 关键词Counter, 统计, 文档频率Counter)：记录列表只在
+    keep_records为True时返回，关键词Counter只在fields含KW时返回，统计（RunStats.to_dict()）
+    只在with_stats为True时返回，文档频率只在with_doc_counts为True时返回，否则为None。
+    dedup和progress（见count_raw_tokens）只能在本进程中调用时使用。
+    """
+    stats = RunStats() if with_stats else None
+    read_started = time.perf_counter()
+    with open(file_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = mm[start:end]
+    if stats is not None:
+        stats.add_time('io', time.perf_counter() - read_started)
+        stats.add('bytes_read', len(data))
+    # 与串行解析使用相同的解码和换行处理
+    lines = io.TextIOWrapper(io.BytesIO(data), encoding=encoding, errors=ENCODING_ERRORS)
+    keyword_counts = Counter() if KEYWORD_FIELD in fields else None
+    kept = [] if keep_records else None
+    titles = iter_field_texts_from_lines(lines, fields, keyword_counts, stats=stats, dedup=dedup, records=kept)
+    doc_counts = Counter() if with_doc_counts else None
+    if with_doc_counts:
+        titles = _count_documents_into(titles, doc_counts)
+    raw_counts, title_count = count_raw_tokens(titles, progress=progress, stats=stats)
+    return (raw_counts, title_count, kept, keyword_counts, stats.to_dict() if stats is not None else None,
+            doc_counts)
+
+def count_raw_tokens_parallel(file_path, workers=None, encoding=None, chunk_size=PARALLEL_CHUNK_SIZE,
+                              keep_records=False, progress=None, stats=None, fields=DEFAULT_FIELDS, dedup=None,
+                              doc_counts=None):
+    """多进程统计RIS文件的原始词频，结果（包括词汇的首次出现顺序）与串行统计完全一致
+
+    workers为None时使用全部CPU核心；workers<=1、文件较小、压缩文件、编码非单字节兼容
+    （UTF-16/UTF-32）或指定了dedup（去重需要按顺序看到全部记录）时退回单进程流式统计。返回 (原始词频Counter, 标题数量)，
+    keep_records为True时额外返回按文件顺序排列的记录列表（去重之前，供解析缓存使用，见iter_field_texts_from_lines）。
+
+    fields为要统计的字段（TI、AB、KW的任意组合），此时返回的数量为文本数量。
+    关键词短语不分词，统计完成后整体追加到原始词频表中（位于所有单词之后），
+    之后同样经apply_stop_words过滤和规范化。
+
+    progress为可选回调 progress(已读字节数, 记录数, 词数)：单进程时每批标题调用一次，
+    多进程时每PROGRESS_POLL_INTERVAL秒及每块完成时调用一次。回调抛出
+    AnalysisCancelled时取消尚未开始的块并立即返回，不等待正在运行的块。
+
+    指定stats时记录各阶段耗时和计数；多进程时合并各块的统计（阶段耗时为各进程之和），
+    整体墙钟时间记为parse_count阶段。
+
+    doc_counts为Counter时同时统计文档频率（含每个词的文本数，键为规范化后的词）。
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # 压缩文件只能顺序解压，单进程流式统计（zip各成员分别检测编码）
+    compressed = detect_compression(file_path) is not None
+    if not compressed and encoding is None:
+        encoding = detect_encoding(file_path)
+
+    if (workers <= 1 or compressed or dedup is not None or encoding not in PARALLEL_ENCODINGS
+            or os.path.getsize(file_path) < MIN_PARALLEL_SIZE):
+        keyword_counts = Counter() if KEYWORD_FIELD in fields else None
+        kept = [] if keep_records else None
+        with open_ris_binary(file_path, stats) as raw:
+            titles = iter_titles_from_binary(raw, encoding, stats=stats, fields=fields,
+                                             keyword_counts=keyword_counts, dedup=dedup, records=kept)
+            if doc_counts is not None:
+                titles = _count_documents_into(titles, doc_counts)
+            file_progress = _file_progress(raw, progress) if progress else None
+            raw_counts, title_count = count_raw_tokens(titles, progress=file_progress, stats=stats)
+        if keyword_counts:
+            raw_counts.update(keyword_counts)
+            if doc_counts is not None:
+                _add_keyword_documents(doc_counts, keyword_counts)
+        if keep_records:
+            return raw_counts, title_count, kept
+        return raw_counts, title_count
+
+    started = time.perf_counter()
+    raw_counts, keyword_counts, title_count, kept = count_ris_chunks(
+        file_path, split_ris_chunks(file_path, chunk_size), encoding, workers, keep_records, progress, stats, fields,
+        doc_counts=doc_counts)
+    raw_counts.update(keyword_counts)
+    if doc_counts is not None:
+        _add_keyword_documents(doc_counts, keyword_counts)
+    if stats is not None:
+        stats.add_time('parse_count', time.perf_counter() - started)
+    if keep_records:
+        return raw_counts, title_count, kept
+    return raw_counts, title_count
+
+def count_ris_chunks(file_path, chunks, encoding, workers, keep_records=False, progress=None, stats=None,
+                     fields=DEFAULT_FIELDS, dedup=None, doc_counts=None):
+    """按块的顺序统计并合并split_ris_chunks切出的各块，返回 (单词原始词频, 关键词Counter, 文本数量, 记录列表)
+
+    workers<=1或指定dedup时在本进程中依次统计各块（去重需要按顺序看到全部记录），否则分发到进程池。
+    progress、stats和doc_counts见count_raw_tokens_parallel；记录列表只在keep_records为True时非空。
+    """
+    raw_counts = Counter()
+    keyword_counts = Counter()
+    title_count = 0
+    token_count = 0
+    kept = []
+
+    def merge(result, end):
+        nonlocal title_count, token_count
+        raw_counts.update(result[0])
+        title_count += result[1]
+        if keep_records:
+            kept.extend(result[2])
+        if result[3]:
+            keyword_counts.update(result[3])
+        if stats is not None:
+            stats.merge(result[4])
+        if doc_counts is not None:
+            doc_counts.update(result[5])
+        if progress:
+            token_count += sum(result[0].values())
+            progress(end, title_count, token_count)
+
+    if workers <= 1 or dedup is not None:
+        for start, end in chunks:
+            chunk_progress = None
+            if progress:
+                chunk_progress = lambda _, records, tokens: progress(start, title_count + records,
+                                                                     token_count + tokens)
+            merge(count_raw_tokens_in_chunk(file_path, start, end, encoding, keep_records, stats is not None,
+                                            fields, doc_counts is not None, dedup, chunk_progress), end)
+        return raw_counts, keyword_counts, title_count, kept
+
+    bytes_done = chunks[0][0] if chunks else 0
+    cancelled = False
+    executor = ProcessPoolExecutor(max_workers=min(workers, len(chunks)))
+    try:
+        futures = [executor.submit(count_raw_tokens_in_chunk, file_path, start, end, encoding, keep_records,
+                                   stats is not None, fields, doc_counts is not None)
+                   for start, end in chunks]
+        # 按块的顺序合并，保证词汇的首次出现顺序与串行一致
+        for (start, end), future in zip(chunks, futures):
+            while True:
+                try:
+                    result = future.result(timeout=PROGRESS_POLL_INTERVAL if progress else None)
+                    break
+                except FutureTimeoutError:
+                    progress(bytes_done, title_count, token_count)
+            merge(result, end)
+            bytes_done = end
+    except AnalysisCancelled:
+        cancelled = True
+        raise
+    finally:
+        if cancelled:
+            # 已开始统计的块不会因取消而停止：丢弃排队的块并结束工作进程，不再占用CPU
+            processes = list((executor._processes or {}).values())
+            executor.shutdown(wait=False, cancel_futures=True)
+            for process in processes:
+                process.terminate()
+        else:
+            executor.shutdown()
+    return raw_counts, keyword_counts, title_count, kept
+
+def count_raw_tokens_in_records(records, fields=DEFAULT_FIELDS, dedup=None, progress=None, stats=None):
+    """统计已解析的记录（如解析缓存中的记录）中所选字段的原始词频，无需重新解析文件
+
+    records为 (标签序列, 值序列) 的可迭代对象。返回 (原始词频Counter, 文本数量)，关键词短语的
+    处理同count_raw_tokens_parallel；progress和stats见count_raw_tokens。
+    """
+    keyword_counts = Counter() if KEYWORD_FIELD in fields else None
+    texts = iter_texts_from_records(records, fields, keyword_counts, stats=stats, dedup=dedup)
+    raw_counts, title_count = count_raw_tokens(texts, progress=progress, stats=stats)
+    if keyword_counts:
+        raw_counts.update(keyword_counts)
+    return raw_counts, title_count
+
+def count_words_parallel(file_path, stop_words=STOP_WORDS, workers=None, encoding=None,
+                         chunk_size=PARALLEL_CHUNK_SIZE, stats=None, fields=DEFAULT_FIELDS, dedup=None,
+                         doc_counts=None):
+    """多进程统计RIS文件的词频，返回 (词频Counter, 标题数量, 词汇总数)"""
+    raw_counts, title_count = count_raw_tokens_parallel(file_path, workers, encoding, chunk_size, stats=stats,
+                                                        fields=fields, dedup=dedup, doc_counts=doc_counts)
+    word_counts, token_count = apply_stop_words(raw_counts, stop_words, stats)
+    return word_counts, title_count, token_count
+
+class IncrementalAnalysis:
+    """监视模式的增量统计：记住最后一条完整记录（"ER  -"行）结束处的字节偏移和已统计部分的完整哈希
+
+    文件变化后重新计算已统计部分全部字节的哈希（不采样，任何位置的修改都能发现），
+    若不变，只解析之后新增的完整记录，把原始词频累加到已有结果上；
+    文件变短或已统计部分的内容改变时整体重新统计。末尾尚未写完（还没有ER行）的记录等写完后再统计。
+    压缩文件和UTF-16等无法按字节定位记录边界的编码不能增量解析，每次变化都整体重新统计。
+    dedup_factory为创建RecordDeduplicator的函数，去重状态在增量统计之间保留。
+    """
+
+    def __init__(self, file_path, fields=DEFAULT_FIELDS, workers=None, dedup_factory=None,
+                 chunk_size=PARALLEL_CHUNK_SIZE):
+        self.file_path = file_path
+        self.fields = tuple(fields)
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.dedup_factory = dedup_factory
+        self.chunk_size = chunk_size
+        self._reset()
+
+    def _reset(self):
+        self.file_key = None  # 上次统计时文件的 (大小, 修改时间)
+        self.offset = 0  # 已统计部分的结束位置
+        self.fingerprint = None  # 已统计部分全部字节的哈希
+        self.incremental = False  # 文件能否按字节增量解析
+        self.encoding = None
+        self.dedup = None
+        self.word_counts = Counter()  # 单词的原始词频
+        self.keyword_counts = Counter()
+        self.title_count = 0
+        self.new_titles = 0  # 最近一次更新新增的文本数量
+        self.new_bytes = 0  # 最近一次更新解析的字节数
+
+    def update(self, progress=None, stats=None):
+        """检查文件并更新统计结果，返回 'unchanged'（没有新的完整记录）、'appended' 或 'rebuilt'
+
+        progress和stats见count_raw_tokens_parallel；更新被中断（如AnalysisCancelled）时
+        丢弃全部状态，下次更新整体重新统计。
+        """
+        stat = os.stat(self.file_path)
+        file_key = (stat.st_size, stat.st_mtime_ns)
+        if file_key == self.file_key:
+            return 'unchanged'
+        try:
+            digest = None
+            if self.incremental and stat.st_size >= self.offset:
+                digest = hash_file_range(self.file_path, 0, self.offset)
+            if digest is not None and digest.hexdigest() == self.fingerprint:
+                status = 'appended'
+            else:
+                digest = None
+                self._reset()
+                self._start(stat.st_size, progress, stats)
+                status = 'rebuilt'
+            if self.incremental:
+                self._count_new_records(stat.st_size, progress, stats, digest)
+        except BaseException:
+            self._reset()
+            raise
+        self.file_key = file_key
+        if status == 'appended' and not self.new_bytes:
+            return 'unchanged'
+        return status
+
+    def _start(self, size, progress, stats):
+        """整体重新统计的准备：检测压缩和编码；不能增量解析的文件直接整体流式统计"""
+        self.dedup = self.dedup_factory() if self.dedup_factory else None
+        compressed = detect_compression(self.file_path) is not None
+        self.encoding = None if compressed else detect_encoding(self.file_path)
+        self.incremental = not compressed and self.encoding in PARALLEL_ENCODINGS
+        if self.incremental:
+            return
+        keyword_counts = Counter() if KEYWORD_FIELD in self.fields else None
+        with open_ris_binary(self.file_path, stats) as raw:
+            titles = iter_titles_from_binary(raw, self.encoding, stats=stats, fields=self.fields,
+                                             keyword_counts=keyword_counts, dedup=self.dedup)
+            self.word_counts, self.title_count = count_raw_tokens(
+                titles, progress=_file_progress(raw, progress) if progress else None, stats=stats)
+        self.keyword_counts = keyword_counts or Counter()
+        self.new_titles, self.new_bytes = self.title_count, size
+
+    def _count_new_records(self, size, progress, stats, digest=None):
+        """统计[offset, 最后一条完整记录之后)范围内的记录，大范围按记录边界切块（同多进程解析）
+
+        digest为[0, offset)的哈希（hashlib对象），在其上累加新统计的字节得到新的哈希。
+        """
+        end = find_last_record_end(self.file_path, self.offset, size)
+        chunks = split_ris_chunks(self.file_path, self.chunk_size, self.offset, end)
+        # 追加的少量记录只有一块，直接在本进程中统计
+        workers = self.workers if len(chunks) > 1 else 1
+        word_counts, keyword_counts, title_count, _ = count_ris_chunks(
+            self.file_path, chunks, self.encoding, workers, progress=progress, stats=stats, fields=self.fields,
+            dedup=self.dedup)
+        self.word_counts.update(word_counts)
+        self.keyword_counts.update(keyword_counts)
+        self.title_count += title_count
+        self.new_titles, self.new_bytes = title_count, end - self.offset
+        self.fingerprint = hash_file_range(self.file_path, self.offset, end, digest).hexdigest()
+        self.offset = end
+
+    def raw_counts(self):
+        """当前的原始词频表，关键词短语位于所有单词之后（同count_raw_tokens_parallel）"""
+        raw_counts = Counter(self.word_counts)
+        raw_counts.update(self.keyword_counts)
+        return raw_counts
+
+def analyze_word_frequency(titles, top_n=50, extra_stop_words=None, ngram=1, stats=None):
+    """分析标题中的词频
+
+    titles可以是标题列表，也可以直接传入iter_ris_records生成器流式统计。
+    ngram为2或3时统计二元或三元短语（停用词作为短语边界）。stats用于记录各阶段耗时和计数。
+    """
+    if hasattr(titles, '__len__'):
+        print(f"开始分析 {len(titles)} 个标题的词频...")
+
+    # 合并基础停用词和用户自定义停用词
+    stop_words = STOP_WORDS.union(extra_stop_words) if extra_stop_words else STOP_WORDS
+
+    if ngram > 1:
+        ngram_counts, title_count = count_ngrams(titles, stop_words, max_n=ngram, stats=stats)
+        word_counts = ngram_counts[ngram]
+        print(f"✓ 共分析 {title_count} 个标题，找到 {len(word_counts)} 个不同的{NGRAM_LABELS[ngram]}")
+        return word_counts.most_common(top_n)
 
     # 显示进度，每处理500个标题显示一次进度
-    for i, title in enumerate(titles):
-        if (i + 1) % 500 == 0 or i == 0 or i == total_titles - 1:
-            print(f"  处理进度: {i+1}/{total_titles} ({(i+1)/total_titles*100:.1f}%)")
-
-        # 转小写，移除标点符号，保留字母、数字和空格
-        clean_title = re.sub(r'[^\w\s]', ' ', title.lower())
-        # 分词
-        words = clean_title.split()
-        # 过滤并规范化：只保留字母单词，长度大于2，不在停用词中，然后进行词形规范化
-        filtered_words = []
-        for word in words:
-            if word.isalpha() and len(word) > 2 and word not in stop_words:
-                normalized_word = normalize_word(word)
-                # 再次检查规范化后的词是否在停用词中
-                if normalized_word not in stop_words:
-                    filtered_words.append(normalized_word)
-        all_words.extend(filtered_words)
-
-    print(f"✓ 总共提取到 {len(all_words)} 个词汇")
+    word_counts, title_count, token_count = count_words(titles, stop_words, progress_every=500, stats=stats)
+
+    print(f"✓ 共分析 {title_count} 个标题，总共提取到 {token_count} 个词汇")
 
     # 计算词频
-    word_counts = Counter(all_words)
     most_common = word_counts.most_common(top_n)
 
     print(f"✓ 找到 {len(word_counts)} 个不同的词汇")
     return most_common
 
-def plot_word_frequency(word_counts):
-    """绘制词频分布图"""
+def analyze_ris_file(file_path, top_n=50, extra_stop_words=None, workers=None, encoding=None, ngram=1,
+                     stats=None, fields=DEFAULT_FIELDS, dedup=None, export_paths=None):
+    """分析RIS文件中标题（或fields所选字段）的词频，大文件按记录边界切块后多进程并行统计
+
+    ngram为2或3时单进程流式统计短语频次（关键词字段不参与短语统计）。
+    dedup为RecordDeduplicator时跳过重复记录（单进程统计）。
+    export_paths为单词模式下导出完整词汇表（含文档频率）的路径列表。
+    """
+    if ngram > 1:
+        return analyze_word_frequency(iter_ris_records(file_path, encoding, stats=stats, fields=fields, dedup=dedup),
+                                      top_n, extra_stop_words, ngram, stats)
+
+    stop_words = STOP_WORDS.union(extra_stop_words) if extra_stop_words else STOP_WORDS
+
+    doc_counts = Counter() if export_paths else None
+    word_counts, title_count, token_count = count_words_parallel(file_path, stop_words, workers, encoding,
+                                                                 stats=stats, fields=fields, dedup=dedup,
+                                                                 doc_counts=doc_counts)
+
+    print(f"✓ 共分析 {title_count} 个{fields_label(fields)}，总共提取到 {token_count} 个词汇")
+    print(f"✓ 找到 {len(word_counts)} 个不同的词汇")
+    if export_paths:
+        export_word_counts(word_counts, export_paths, doc_counts,
+                           {'source': file_path, 'fields': ','.join(fields), 'documents': title_count}, stats)
+    return word_counts.most_common(top_n)
+
+def export_word_counts(word_counts, file_paths, doc_counts=None, metadata=None, stats=None):
+    """把完整词汇表导出到每个路径（格式按扩展名判断）"""
+    for file_path in file_paths:
+        with timed(stats, 'output'):
+            row_count = export_vocabulary(word_counts, file_path, doc_counts=doc_counts, metadata=metadata)
+        print(f"💾 完整词汇表已导出 ({row_count:,} 个词): {file_path}")
+
+def collect_ris_files(inputs):
+    """展开输入路径：目录取其中的RIS文件（含压缩的.ris.gz等和.zip），含通配符的按glob匹配，其余视为文件路径"""
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            files.extend(sorted(path for path in glob.glob(os.path.join(item, '*'))
+                                if path.lower().endswith(RIS_FILE_SUFFIXES) and os.path.isfile(path)))
+        elif glob.has_magic(item):
+            files.extend(sorted(path for path in glob.glob(item) if os.path.isfile(path)))
+        else:
+            files.append(item)
+    # 去重并保持顺序
+    return list(dict.fromkeys(files))
+
+def count_file_words(file_path, stop_words=STOP_WORDS, fields=DEFAULT_FIELDS, dedup=None, with_doc_counts=False):
+    """统计单个文件的词频（批量模式下的进程池任务）
+
+    返回 (词频Counter, 标题数量, 词汇总数, 文档频率Counter)，文档频率只在with_doc_counts为True时统计。
+    """
+    doc_counts = Counter() if with_doc_counts else None
+    raw_counts, title_count = count_raw_tokens_parallel(file_path, workers=1, fields=fields, dedup=dedup,
+                                                        doc_counts=doc_counts)
+    word_counts, token_count = apply_stop_words(raw_counts, stop_words)
+    return word_counts, title_count, token_count, doc_counts
+
+def _iter_batch_counts(file_paths, stop_words, workers, fields, dedup, with_doc_counts):
+    """按输入顺序产出各文件的 (文件路径, count_file_words的结果, 异常)"""
+    if dedup is not None:
+        # 跨文件去重需要按顺序看到全部记录，在本进程中依次统计
+        for path in file_paths:
+            try:
+                yield path, count_file_words(path, stop_words, fields, dedup, with_doc_counts), None
+            except Exception as e:
+                yield path, None, e
+        return
+
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(file_paths)))) as executor:
+        futures = [executor.submit(count_file_words, path, stop_words, fields, None, with_doc_counts)
+                   for path in file_paths]
+        for path, future in zip(file_paths, futures):
+            try:
+                yield path, future.result(), None
+            except Exception as e:
+                yield path, None, e
+
+def analyze_ris_batch(file_paths, top_n=50, extra_stop_words=None, workers=None, fields=DEFAULT_FIELDS,
+                      dedup=None, doc_counts=None):
+    """批量分析多个RIS文件：按文件分发到进程池，返回各文件结果和合并后的全语料词频
+
+    返回 (results, corpus_counts)，results中每项为
+    (文件路径, 前top_n个高频词, 标题数量, 词汇总数, 错误信息)。
+    指定dedup时跨文件去重：各文件在本进程中依次统计，重复记录只计入最先出现的文件。
+    doc_counts为Counter时同时累计全语料的文档频率。
+    """
+    stop_words = STOP_WORDS.union(extra_stop_words) if extra_stop_words else STOP_WORDS
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    results = []
+    corpus_counts = Counter()
+
+    # 按输入顺序合并，保证结果可复现
+    for path, counts, error in _iter_batch_counts(file_paths, stop_words, workers, fields, dedup,
+                                                  doc_counts is not None):
+        if error is not None:
+            results.append((path, [], 0, 0, str(error)))
+            continue
+        word_counts, title_count, token_count, file_doc_counts = counts
+        corpus_counts.update(word_counts)
+        if doc_counts is not None:
+            doc_counts.update(file_doc_counts)
+        results.append((path, word_counts.most_common(top_n), title_count, token_count, None))
+
+    return results, corpus_counts
+
+def print_word_counts(word_counts):
+    """打印词频排行表，近似模式下的 (词, 计数, 误差上界) 会附带误差"""
+    print("-" * 40)
+    for i, entry in enumerate(word_counts, 1):
+        word, count = entry[0], entry[1]
+        if len(entry) > 2:
+            print(f"{i:2d}. {word:<20} : {count:3d} 次 (±{entry[2]})")
+        else:
+            print(f"{i:2d}. {word:<20} : {count:3d} 次")
+
+def write_word_counts(word_counts, file, fmt='csv'):
+    """把词频表写入已打开的文本文件，格式为csv、tsv或json
+
+    近似模式下的 (词, 计数, 误差上界) 会额外输出Error列。
+    """
+    rows = [[i] + list(entry) for i, entry in enumerate(word_counts, 1)]
+    with_error = any(len(entry) > 2 for entry in word_counts)
+    header = ['Rank', 'Word', 'Frequency'] + (['Error'] if with_error else [])  # 使用英文标题避免乱码
+
+    if fmt == 'json':
+        keys = [name.lower() for name in header]
+        json.dump([dict(zip(keys, row)) for row in rows], file, ensure_ascii=False, indent=2)
+        file.write('\n')
+    else:
+        writer = csv.writer(file, delimiter='\t' if fmt == 'tsv' else ',')
+        writer.writerow(header)
+        writer.writerows(rows)
+
+def save_word_counts(word_counts, filename, fmt='csv'):
+    """按格式保存词频表；CSV带BOM，便于Excel正确识别UTF-8"""
+    encoding = 'utf-8-sig' if fmt == 'csv' else 'utf-8'
+    with open(filename, 'w', newline='', encoding=encoding) as f:
+        write_word_counts(word_counts, f, fmt)
+
+def save_word_counts_csv(word_counts, filename):
+    """保存词频为CSV格式"""
+    save_word_counts(word_counts, filename, 'csv')
+
+def load_stop_words(file_path):
+    """读取停用词文件：词之间用空格、逗号或换行分隔，#之后为注释"""
+    stop_words = set()
+    with open(file_path, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            line = line.split('#', 1)[0]
+            stop_words.update(word for word in re.split(r'[,\s]+', line.lower()) if word)
+    return stop_words
+
+def run_batch(file_paths, top_n=50, workers=None, output_dir=None, extra_stop_words=None, formats=('csv',),
+              stats=None, fields=DEFAULT_FIELDS, dedup=None, export_paths=None):
+    """命令行批量模式：输出各文件的高频词表和合并后的全语料词频表
+
+    指定output_dir时按formats中的每种格式保存各文件及全语料的词频表，
+    指定export_paths时把全语料的完整词汇表（含文档频率）导出到这些路径。
+    stats只记录整体的分析和保存耗时，以及成功分析的文件的字节数、标题数和词数。
+    """
+    print(f"📂 批量分析 {len(file_paths)} 个文件...")
+    with timed(stats, 'analyze'):
+        doc_counts = Counter() if export_paths else None
+        results, corpus_counts = analyze_ris_batch(file_paths, top_n, extra_stop_words, workers, fields, dedup,
+                                                   doc_counts)
+    report_dedup(dedup, stats)
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    total_titles = 0
+    for path, word_counts, title_count, token_count, error in results:
+        print("\n" + "=" * 60)
+        print(f"📄 {path}")
+        if error:
+            print(f"❌ {path}: 分析失败: {error}", file=sys.stderr)
+            continue
+        total_titles += title_count
+        if stats is not None:
+            stats.add('bytes_read', os.path.getsize(path))
+            stats.add('titles', title_count)
+            stats.add('tokens_kept', token_count)
+        print(f"✓ {title_count} 个{fields_label(fields)}，{token_count} 个词汇")
+        if word_counts:
+            print_word_counts(word_counts)
+            if output_dir:
+                stem = os.path.splitext(os.path.basename(path))[0]
+                with timed(stats, 'output'):
+                    for fmt in formats:
+                        save_word_counts(word_counts, os.path.join(output_dir, f"{stem}_word_frequency.{fmt}"),
+                                         fmt)
+
+    corpus_top = corpus_counts.most_common(top_n)
+    if stats is not None:
+        stats.set('vocabulary', len(corpus_counts))
+    print("\n" + "=" * 60)
+    print(f"📊 全语料词频 ({len(results)} 个文件, {total_titles} 个{fields_label(fields)}, "
+          f"{len(corpus_counts)} 个不同词汇)")
+    print_word_counts(corpus_top)
+    if output_dir:
+        with timed(stats, 'output'):
+            for fmt in formats:
+                save_word_counts(corpus_top, os.path.join(output_dir, f"corpus_word_frequency.{fmt}"), fmt)
+        print(f"💾 结果已保存到: {output_dir}")
+    if export_paths:
+        export_word_counts(corpus_counts, export_paths, doc_counts,
+                           {'source': ','.join(file_paths), 'fields': ','.join(fields), 'documents': total_titles},
+                           stats)
+
+    return results, corpus_top
+
+def _import_pyplot(show=True):
+    """按需导入pyplot；不显示窗口时使用Agg后端，在没有显示器的服务器上也能保存图片
+
+    matplotlib只在需要绘图时导入，只输出词频表时不付出导入开销。
+    """
+    import matplotlib
+    if not show:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+def _finish_plot(plt, filename, show, label):
+    """保存图片，然后显示窗口或关闭图表"""
+    plt.savefig(filename, dpi=300, bbox_inches='tight')
+    print(f"{label}已保存为 '{filename}'")
+    if show:
+        plt.show()
+    else:
+        plt.close()
+
+def plot_word_frequency(word_counts, filename='title_word_frequency.png', show=True, fields=DEFAULT_FIELDS, ngram=1):
+    """绘制词频分布图，标题按分析字段和统计单位生成，show为False时只保存图片不显示窗口"""
     if len(word_counts) == 0:
         print("没有足够的数据来生成词频图")
         return
 
     words, counts = zip(*word_counts)
 
+    plt = _import_pyplot(show)
+
     # 设置中文字体支持
     plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
     plt.rcParams['axes.unicode_minus'] = False
@@ -189,56 +1530,403 @@ def plot_word_frequency(word_counts):
                 str(count), ha='center', va='bottom', fontsize=10)
 
     plt.xticks(rotation=45, ha='right', fontsize=12)
-    plt.title('标题词频分布 (Title Word Frequency)', fontsize=16, fontweight='bold')
-    plt.xlabel('词语 (Words)', fontsize=14)
+    plt.title(frequency_chart_title(fields, ngram), fontsize=16, fontweight='bold')
+    plt.xlabel('短语 (Phrases)' if ngram > 1 else '词语 (Words)', fontsize=14)
     plt.ylabel('频次 (Frequency)', fontsize=14)
     plt.grid(axis='y', alpha=0.3)
     plt.tight_layout()
 
     # 保存图片
-    plt.savefig('title_word_frequency.png', dpi=300, bbox_inches='tight')
-    print("词频图已保存为 'title_word_frequency.png'")
-    plt.show()
+    _finish_plot(plt, filename, show, "词频图")
 
-if __name__ == "__main__":
-    file_path = input("请输入RIS文件路径: ")
+def plot_term_trends(years, terms, matrix, max_lines=10, filename='title_term_trends.png', show=True,
+                     fields=DEFAULT_FIELDS):
+    """绘制高频词的年度趋势折线图，show为False时只保存图片不显示窗口"""
+    if len(years) == 0 or len(terms) == 0:
+        print("没有足够的数据来生成趋势图")
+        return
+
+    plt = _import_pyplot(show)
+
+    # 设置中文字体支持
+    plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
+    plt.rcParams['axes.unicode_minus'] = False
+
+    plt.figure(figsize=(15, 8))
+    for column, term in enumerate(terms[:max_lines]):
+        plt.plot(years, matrix[:, column], marker='o', linewidth=2, label=term)
+
+    plt.title(f'{fields_label(fields)}高频词年度趋势 (Term Trends by Year)', fontsize=16, fontweight='bold')
+    plt.xlabel('年份 (Year)', fontsize=14)
+    plt.ylabel('频次 (Frequency)', fontsize=14)
+    plt.legend(fontsize=11)
+    plt.grid(alpha=0.3)
+    plt.tight_layout()
+
+    # 保存图片
+    _finish_plot(plt, filename, show, "趋势图")
+
+def run_trend(file_path, encoding=None, top_n=20, csv_path=None, extra_stop_words=None,
+              chart_path='title_term_trends.png', show=True, stats=None, fields=DEFAULT_FIELDS, dedup=None):
+    """命令行趋势模式：单遍扫描统计各年份的高频词频次，输出矩阵并绘制折线图
+
+    chart_path为None时不绘图。返回是否找到带出版年份的标题。
+    """
+    stop_words = STOP_WORDS.union(extra_stop_words) if extra_stop_words else STOP_WORDS
+    with timed(stats, 'analyze'):
+        years, terms, matrix, undated_count = count_term_trends(
+            iter_ris_records(file_path, encoding, with_year=True, stats=stats, fields=fields, dedup=dedup), top_n,
+            stop_words)
+    if not terms:
+        print("❌ 未找到带出版年份(PY)的标题", file=sys.stderr)
+        return False
+
+    print(f"✓ {years[0]}-{years[-1]} 年共 {int(matrix.sum())} 个高频词次，"
+          f"{undated_count} 个{fields_label(fields)}缺少出版年份")
+    # 终端只显示前8个词，完整矩阵请导出CSV
+    shown_terms = terms[:8]
+    print("\n📈 年度词频矩阵:")
+    print("Year  " + "".join(f"{term[:12]:>13}" for term in shown_terms))
+    for year, row in zip(years, matrix.tolist()):
+        print(f"{year}  " + "".join(f"{count:>13d}" for count in row[:len(shown_terms)]))
+
+    if csv_path:
+        with timed(stats, 'output'):
+            save_term_trends_csv(years, terms, matrix, csv_path)
+        print(f"💾 年度词频矩阵已保存到: {csv_path}")
+
+    if chart_path:
+        print("\n📈 正在生成趋势图...")
+        with timed(stats, 'chart'):
+            plot_term_trends(years, terms, matrix, filename=chart_path, show=show, fields=fields)
+    return True
+
+def build_arg_parser():
+    """命令行参数定义"""
+    parser = argparse.ArgumentParser(
+        description="RIS文件标题解析和词频分析工具",
+        epilog=f"退出码: {EXIT_OK}=成功, {EXIT_FAILURE}=分析出错或批量模式下有文件失败, {EXIT_USAGE}=参数错误, "
+               f"{EXIT_NO_INPUT}=输入文件不存在, {EXIT_NO_DATA}=未解析到标题或有效词汇")
+    parser.add_argument('inputs', nargs='*',
+                        help="RIS文件路径、目录或通配符（如 'exports/*.ris'）；省略时在交互终端中提示输入")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="并行解析的进程数，默认使用全部CPU核心，1表示单进程")
+    parser.add_argument('--top', type=int, default=50, help="输出的高频词数量（默认50）")
+    parser.add_argument('--stop-words', metavar='FILE',
+                        help="附加停用词文件（空格、逗号或换行分隔，#之后为注释），与内置停用词合并使用")
+    parser.add_argument('-o', '--output', metavar='PATH',
+                        help="单文件模式下保存词频表的路径，'-'表示输出到标准输出（进度信息改为输出到标准错误）；未指定--format时按扩展名判断格式")
+    parser.add_argument('--output-dir', help="保存词频表的目录（批量模式下包括各文件及全语料词频表）")
+    parser.add_argument('--format', nargs='+', choices=OUTPUT_FORMATS, dest='formats',
+                        help="词频表格式，可指定多个（默认csv）")
+    parser.add_argument('--chart', metavar='PATH',
+                        help="图表保存路径（默认title_word_frequency.png，趋势模式为title_term_trends.png）")
+    parser.add_argument('--no-plot', action='store_true',
+                        help="不显示图表窗口（使用Agg后端），只有指定--chart时才保存图表，适合无显示器的服务器")
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="安静模式：不输出进度和结果表，错误信息输出到标准错误")
+    parser.add_argument('--ngram', type=int, choices=(1, 2, 3), default=1,
+                        help="统计单位：1=单词（默认），2=二元短语，3=三元短语；停用词作为短语边界")
+    parser.add_argument('--trend', action='store_true',
+                        help="趋势模式：按出版年份(PY)统计高频词的年度频次矩阵并绘制折线图")
+    parser.add_argument('--trend-csv', help="趋势模式下保存年度词频矩阵的CSV路径")
+    parser.add_argument('--approximate', action='store_true',
+                        help="近似模式：用Space-Saving在固定内存内统计高频词，并给出每个计数的误差上界")
+    parser.add_argument('--sketch-size', type=int, default=None,
+                        help="近似模式跟踪的词数上限（默认为输出数量的20倍，至少1000）")
+    parser.add_argument('--fields', nargs='+', choices=tuple(ANALYSIS_FIELDS), default=list(DEFAULT_FIELDS),
+                        help="要分析的字段：TI=标题（默认），AB=摘要，KW=关键词（按整个短语统计），可指定多个")
+    parser.add_argument('--export', nargs='+', metavar='PATH',
+                        help="导出完整词汇表（排名、词、频次、文档频率），格式按扩展名判断："
+                             ".csv、.tsv、.sqlite/.db、.parquet、.arrow/.feather（后两种需要pyarrow），可指定多个；"
+                             "批量模式下导出全语料词汇表")
+    parser.add_argument('--dedup', nargs='?', const='near', choices=tuple(DEDUP_MODES),
+                        help="去除重复记录：exact=DOI或规范化标题相同，near=另外用MinHash/LSH识别近似重复的标题"
+                             "（只写--dedup时为near）；批量模式下跨文件去重")
+    parser.add_argument('--dedup-threshold', type=float, default=NEAR_THRESHOLD,
+                        help=f"近似重复的标题相似度阈值（0-1，默认{NEAR_THRESHOLD}）")
+    parser.add_argument('--watch', nargs='?', type=float, const=WATCH_INTERVAL, metavar='SECONDS',
+                        help=f"监视模式：每隔SECONDS秒（默认{WATCH_INTERVAL:g}）检查文件，追加的记录只解析新增部分并"
+                             "累加到已有结果，已解析部分改变时重新统计；Ctrl+C结束")
+    parser.add_argument('--report', metavar='PATH',
+                        help="保存JSON运行报告（各阶段耗时、读取字节数、记录/标题/词数、词汇量和峰值内存），"
+                             "'-'表示输出到标准输出")
+    return parser
+
+def make_deduplicator(args):
+    """按--dedup参数创建RecordDeduplicator，未指定时返回None"""
+    if not args.dedup:
+        return None
+    return RecordDeduplicator(near=args.dedup == 'near', threshold=args.dedup_threshold)
+
+def report_dedup(dedup, stats=None):
+    """输出去除的重复记录数并记入stats，未去重时什么也不做"""
+    if dedup is not None:
+        print(format_dedup_summary(dedup))
+        dedup.record_stats(stats)
+
+def output_format(path, formats):
+    """单文件输出的格式：优先使用--format，否则按扩展名判断，默认csv"""
+    if formats:
+        return formats[0]
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension == 'txt':
+        return 'tsv'
+    return extension if extension in OUTPUT_FORMATS else 'csv'
+
+def save_outputs(args, file_path, word_counts, result_stream, stats=None):
+    """按 -o 和 --output-dir 保存单文件的词频表"""
+    with timed(stats, 'output'):
+        if args.output == '-':
+            write_word_counts(word_counts, result_stream, output_format(args.output, args.formats))
+        elif args.output:
+            save_word_counts(word_counts, args.output, output_format(args.output, args.formats))
+            print(f"💾 词频表已保存到: {args.output}")
+        if args.output_dir:
+            os.makedirs(args.output_dir, exist_ok=True)
+            stem = os.path.splitext(os.path.basename(file_path))[0]
+            for fmt in args.formats or ['csv']:
+                save_word_counts(word_counts, os.path.join(args.output_dir, f"{stem}_word_frequency.{fmt}"), fmt)
+            print(f"💾 结果已保存到: {args.output_dir}")
+
+def run_single(args, file_path, extra_stop_words, result_stream, stats=None):
+    """命令行单文件模式，返回退出码"""
+    if not os.path.isfile(file_path):
+        print(f"❌ 文件不存在: {file_path}", file=sys.stderr)
+        return EXIT_NO_INPUT
 
     print("=" * 60)
     print("RIS文件标题解析和词频分析工具")
     print("=" * 60)
 
-    titles = parse_ris_file(file_path)
-    print(f"\n✓ 成功解析出 {len(titles)} 个标题")
+    # 只读取文件开头的少量记录作为示例，完整统计时再流式解析
+    compression = detect_compression(file_path)
+    encoding = detect_encoding(file_path)
+    if compression == 'zip':
+        # zip中的各成员可能来自不同数据库，分别检测编码
+        print(f"检测到zip压缩文件，第一个成员的编码: {encoding}")
+        encoding = None
+    elif compression:
+        print(f"检测到{compression}压缩文件，编码: {encoding}")
+    else:
+        print(f"检测到文件编码: {encoding}")
+    fields = args.fields
+    if fields == DEFAULT_FIELDS:
+        sample_titles = list(islice(iter_ris_records(file_path, encoding), 6))
+    else:
+        # 其他字段显示前几条记录中所选字段的第一个值，过长时截断
+        records = (record for record in iter_ris_full_records(file_path, encoding, tags=frozenset(fields))
+                   if record.tags)
+        sample_titles = [f"[{record.tags[0]}] {record.values[0][:100]}" for record in islice(records, 6)]
+
+    if len(sample_titles) == 0:
+        print(f"❌ 未找到{fields_label(fields)}，请检查文件格式是否正确: {file_path}", file=sys.stderr)
+        return EXIT_NO_DATA
+
+    # 显示前几个标题作为示例
+    print(f"\n📋 {fields_label(fields)}示例:")
+    for i, title in enumerate(sample_titles[:5]):
+        print(f"  {i+1}. {title}")
+
+    print("\n" + "=" * 60)
+    print("开始词频分析...")
+    print("=" * 60)
+
+    # 默认保存图表并显示窗口；--no-plot时只在指定--chart时保存图表
+    show = not args.no_plot
+    plot = show or args.chart
+    dedup = make_deduplicator(args)
 
-    if len(titles) == 0:
-        print("❌ 未找到标题，请检查文件路径和格式是否正确")
+    if args.trend:
+        found = run_trend(file_path, encoding, args.top, args.trend_csv, extra_stop_words,
+                          (args.chart or 'title_term_trends.png') if plot else None, show, stats, fields, dedup)
+        report_dedup(dedup, stats)
+        return EXIT_OK if found else EXIT_NO_DATA
+
+    if args.approximate:
+        # 固定内存的流式近似统计
+        stop_words = STOP_WORDS.union(extra_stop_words) if extra_stop_words else STOP_WORDS
+        with timed(stats, 'analyze'):
+            word_counts, title_count, token_count, sketch = approximate_word_frequency(
+                iter_ris_records(file_path, encoding, stats=stats, fields=fields, dedup=dedup), args.top, stop_words,
+                capacity=args.sketch_size)
+        if stats is not None:
+            stats.add('titles', title_count)
+            stats.add('tokens_kept', token_count)
+        print(f"✓ 共分析 {title_count} 个{fields_label(fields)}，总共提取到 {token_count} 个词汇")
+        print(f"✓ 近似模式: 跟踪 {len(sketch)}/{sketch.capacity} 个词，计数误差不超过 {sketch.error_bound()}")
     else:
-        # 显示前几个标题作为示例
-        print("\n📋 标题示例:")
-        for i, title in enumerate(titles[:5]):
-            print(f"  {i+1}. {title}")
-        if len(titles) > 5:
-            print(f"  ... 还有 {len(titles) - 5} 个标题")
+        # 大文件按记录边界切块并行统计，小文件直接流式统计
+        word_counts = analyze_ris_file(file_path, args.top, extra_stop_words, workers=args.workers,
+                                       encoding=encoding, ngram=args.ngram, stats=stats, fields=fields, dedup=dedup,
+                                       export_paths=args.export)
+    report_dedup(dedup, stats)
 
-        print("\n" + "=" * 60)
-        print("开始词频分析...")
-        print("=" * 60)
+    if not word_counts:
+        print(f"❌ 未能提取到有效词汇，请检查标题内容: {file_path}", file=sys.stderr)
+        return EXIT_NO_DATA
 
-        word_counts = analyze_word_frequency(titles)
+    print(f"\n📊 词频统计结果 (前 {len(word_counts)} 个高频词):")
+    print_word_counts(word_counts)
+    save_outputs(args, file_path, word_counts, result_stream, stats)
 
-        if word_counts:
-            print(f"\n📊 词频统计结果 (前 {len(word_counts)} 个高频词):")
-            print("-" * 40)
-            for i, (word, count) in enumerate(word_counts, 1):
-                print(f"{i:2d}. {word:<20} : {count:3d} 次")
-
-            print("\n📈 正在生成词频分布图...")
-            plot_word_frequency(word_counts)
-            print("✓ 分析完成！")
-        else:
-            print("❌ 未能提取到有效词汇，请检查标题内容")
+    if plot:
+        print("\n📈 正在生成词频分布图...")
+        with timed(stats, 'chart'):
+            plot_word_frequency([entry[:2] for entry in word_counts], args.chart or 'title_word_frequency.png',
+                                show, fields, args.ngram)
+    print("✓ 分析完成！")
+    return EXIT_OK
+
+def run_watch(args, file_path, extra_stop_words, result_stream, stats=None):
+    """命令行监视模式：每隔args.watch秒检查文件，追加的记录增量统计后重新输出结果，Ctrl+C结束
+
+    不弹出图表窗口，指定--chart时每次更新后保存图表。返回退出码。
+    """
+    if not os.path.isfile(file_path):
+        print(f"❌ 文件不存在: {file_path}", file=sys.stderr)
+        return EXIT_NO_INPUT
+
+    stop_words = STOP_WORDS.union(extra_stop_words) if extra_stop_words else STOP_WORDS
+    analysis = IncrementalAnalysis(file_path, args.fields, args.workers, lambda: make_deduplicator(args))
+    print(f"👀 监视模式: 每 {args.watch:g} 秒检查一次 {file_path}，按 Ctrl+C 结束")
+    try:
+        while True:
+            status = analysis.update(stats=stats)
+            if status != 'unchanged':
+                print(f"\n[{time.strftime('%H:%M:%S')}] ", end='')
+                if status == 'appended':
+                    print(f"➕ 新增 {analysis.new_titles} 个{fields_label(args.fields)}"
+                          f"（只解析新增的 {analysis.new_bytes:,} 字节）")
+                elif analysis.incremental:
+                    print(f"🔄 已完整统计 {analysis.new_bytes:,} 字节")
+                else:
+                    print("🔄 已完整统计（压缩文件或该编码不能增量解析，每次变化都完整统计）")
+                word_counts, token_count = apply_stop_words(analysis.raw_counts(), stop_words, stats)
+                if stats is not None:
+                    stats.set('titles', analysis.title_count)
+                print(f"✓ 共 {analysis.title_count} 个{fields_label(args.fields)}，{token_count} 个词汇，"
+                      f"{len(word_counts)} 个不同的词汇")
+                if analysis.dedup is not None:
+                    print(format_dedup_summary(analysis.dedup))
+                top = word_counts.most_common(args.top)
+                print_word_counts(top)
+                save_outputs(args, file_path, top, result_stream, stats)
+                if args.chart and top:
+                    with timed(stats, 'chart'):
+                        plot_word_frequency(top, args.chart, show=False, fields=args.fields)
+            time.sleep(args.watch)
+    except KeyboardInterrupt:
+        print("\n⏹️ 已停止监视")
+    if analysis.dedup is not None:
+        analysis.dedup.record_stats(stats)
+    return EXIT_OK
+
+def run_cli(args, inputs, extra_stop_words, result_stream, stats=None):
+    """根据输入选择批量模式或单文件模式，返回退出码"""
+    file_paths = collect_ris_files(inputs)
+    if stats is not None:
+        stats.set('files', len(file_paths))
+    # 多个文件、目录或通配符输入时进入批量模式，只启动一次解释器和进程池
+    if len(file_paths) != 1 or os.path.isdir(inputs[0]) or glob.has_magic(inputs[0]):
+        if not file_paths:
+            print("❌ 未找到匹配的RIS文件", file=sys.stderr)
+            return EXIT_NO_INPUT
+        if args.output:
+            print("❌ 批量模式请使用 --output-dir 保存结果", file=sys.stderr)
+            return EXIT_USAGE
+        if args.watch:
+            print("❌ 监视模式只能用于单个文件", file=sys.stderr)
+            return EXIT_USAGE
+        if args.ngram > 1 or args.trend or args.approximate:
+            print("❌ 批量模式只统计单词，不支持 --ngram 2/3、--trend 和 --approximate，请逐个文件分析",
+                  file=sys.stderr)
+            return EXIT_USAGE
+        missing = [path for path in file_paths if not os.path.isfile(path)]
+        if len(missing) == len(file_paths):
+            print(f"❌ 文件不存在: {', '.join(missing)}", file=sys.stderr)
+            return EXIT_NO_INPUT
+        results, _ = run_batch(file_paths, args.top, args.workers, args.output_dir, extra_stop_words,
+                               args.formats or ['csv'], stats, args.fields, make_deduplicator(args), args.export)
+        return EXIT_FAILURE if any(result[4] for result in results) else EXIT_OK
+
+    if args.watch:
+        return run_watch(args, file_paths[0], extra_stop_words, result_stream, stats)
+    exit_code = run_single(args, file_paths[0], extra_stop_words, result_stream, stats)
 
     print("\n" + "=" * 60)
     print("程序执行完毕")
     print("=" * 60)
+    return exit_code
+
+def main(argv=None):
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.output and args.formats and len(args.formats) > 1:
+        parser.error("-o 只能保存一种格式，多种格式请使用 --output-dir")
+    # 字段去重并按固定顺序排列
+    args.fields = tuple(field for field in ANALYSIS_FIELDS if field in args.fields)
+    if KEYWORD_FIELD in args.fields and (args.ngram > 1 or args.trend or args.approximate):
+        parser.error("关键词(KW)字段按整个短语统计，不能与 --ngram 2/3、--trend 或 --approximate 同时使用")
+    if not 0 < args.dedup_threshold <= 1:
+        parser.error("--dedup-threshold 必须在0到1之间")
+    if args.watch is not None:
+        if args.watch <= 0:
+            parser.error("--watch 的检查间隔必须大于0")
+        if args.ngram > 1 or args.trend or args.approximate or args.export:
+            parser.error("--watch 只统计单词，不能与 --ngram 2/3、--trend、--approximate 或 --export 同时使用")
+    if args.export:
+        if args.ngram > 1 or args.trend or args.approximate:
+            parser.error("--export 导出单词的完整词汇表，不能与 --ngram 2/3、--trend 或 --approximate 同时使用")
+        for path in args.export:
+            try:
+                fmt = export_format(path)
+            except ValueError as e:
+                parser.error(str(e))
+            if fmt in PYARROW_FORMATS and not pyarrow_available():
+                parser.error(PYARROW_REQUIRED)
+
+    inputs = args.inputs
+    if not inputs:
+        # 只在交互终端中提示输入，管道和定时任务中直接报错退出，不会阻塞
+        if args.quiet or not sys.stdin.isatty():
+            parser.error("请指定RIS文件路径")
+        inputs = [input("请输入RIS文件路径: ")]
 
+    extra_stop_words = None
+    if args.stop_words:
+        try:
+            extra_stop_words = load_stop_words(args.stop_words)
+        except OSError as e:
+            print(f"❌ 读取停用词文件失败: {e}", file=sys.stderr)
+            return EXIT_NO_INPUT
+
+    # 安静模式下丢弃进度和结果表输出；'-o -' 或 '--report -' 把数据写到标准输出时，进度和结果表改为
+    # 输出到标准错误，不混入数据。数据仍写到原来的标准输出
+    result_stream = sys.stdout
+    stats = RunStats() if args.report else None
+    with contextlib.ExitStack() as stack:
+        if args.quiet:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, 'w'))))
+        elif args.output == '-' or args.report == '-':
+            stack.enter_context(contextlib.redirect_stdout(sys.stderr))
+        try:
+            exit_code = run_cli(args, inputs, extra_stop_words, result_stream, stats)
+        except Exception as e:
+            print(f"❌ 分析过程中出错: {e}", file=sys.stderr)
+            exit_code = EXIT_FAILURE
+
+    if stats is not None:
+        mode = ('trend' if args.trend else 'approximate' if args.approximate else 'watch' if args.watch
+                else 'exact')
+        report = stats.report(inputs=inputs, mode=mode, ngram=args.ngram, top=args.top, workers=args.workers,
+                              dedup=args.dedup, exit_code=exit_code)
+        try:
+            save_report(report, args.report)
+        except OSError as e:
+            print(f"❌ 保存运行报告失败: {e}", file=sys.stderr)
+            return exit_code or EXIT_FAILURE
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,56 @@
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
+from tkinter import ttk, filedialog, messagebox
 import re
-from collections import Counter
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import threading
 import os
+import time
+from collections import Counter
 from datetime import datetime
 
+from ris_title_analyzer import (ANALYSIS_FIELDS, DEFAULT_FIELDS, KEYWORD_FIELD, NGRAM_LABELS, STOP_WORDS,
+                                WATCH_INTERVAL, AnalysisCancelled, IncrementalAnalysis, apply_stop_words,
+                                count_ngrams, count_ngrams_in_file, count_raw_tokens_in_records,
+                                count_raw_tokens_parallel, fields_label, frequency_chart_title,
+                                iter_texts_from_records, save_word_counts_csv)
+from ris_cache import ParseCache
+from ris_dedup import DEDUP_MODES, RecordDeduplicator, format_dedup_summary
+from ris_export import PYARROW_FORMATS, PYARROW_REQUIRED, export_format, export_vocabulary, pyarrow_available
+from ris_stats import RunStats
+from ris_vocabulary_table import VocabularyTable
+
+# 进度信息刷新的最小间隔（秒），避免后台线程过于频繁地更新界面
+PROGRESS_UPDATE_INTERVAL = 0.25
+# 监视模式只增量统计单词，短语模式下每次文件变化都要完整解析
+WATCH_NGRAM_ERROR = "监视模式只统计单词，不能与二元/三元短语同时使用"
+
+class AnalysisJob:
+    """一次分析请求：文件、分析设置，以及被新请求取代时使用的取消标志"""
+
+    def __init__(self, file_path, file_key, word_count, ngram, custom_stop_words, fields=DEFAULT_FIELDS,
+                 dedup_mode=None, watch=False):
+        self.file_path = file_path
+        self.file_key = file_key
+        self.word_count = word_count
+        self.ngram = ngram
+        self.fields = fields  # 要分析的字段，如 ('TI', 'AB')
+        self.dedup_mode = dedup_mode  # 去除重复记录：None、'exact'或'near'
+        self.watch = watch  # 监视文件变化，追加的记录增量统计
+        self.watch_message = None  # 监视模式下本次更新的说明
+        # 决定解析结果的设置，相同时可复用已建立的索引
+        self.parse_key = (file_key, fields, dedup_mode, watch)
+        self.custom_stop_words = custom_stop_words
+        self.stop_words = frozenset(STOP_WORDS.union(custom_stop_words))
+        self.cancel_event = threading.Event()
+        self.stats = RunStats()  # 本次请求各阶段的耗时和计数，显示在运行统计标签页
+
+    @property
+    def index_key(self):
+        """本请求建立（或需要）的索引：单词模式为原始词频索引，与停用词无关；
+        短语模式为短语频次索引（一次统计全部二元和三元短语），与停用词有关"""
+        if self.ngram == 1:
+            return ('raw', self.parse_key)
+        return ('ngram', self.parse_key, self.stop_words)
+
 class RISAnalyzerGUI:
     def __init__(self, root):
         self.root = root
@@ -22,10 +65,45 @@ class RISAnalyzerGUI:
         self.setup_style()
 
         # 数据存储
-        self.titles = []
+        self.title_count = 0
         self.word_counts = []
+        self.vocabulary = []  # 当前结果的完整词汇表 [(词, 频次), ...]，按频次从高到低
         self.custom_stop_words = set()
         self.analysis_thread = None  # 跟踪分析线程
+        self.exporting = False  # 正在后台导出完整词汇表，期间导出按钮保持禁用
+        # 分析请求调度：新请求取代正在进行的请求，只有最新请求的结果会显示
+        self.job_lock = threading.Lock()
+        self.current_job = None  # 最新的分析请求
+        self.running_job = None  # 后台线程正在处理的请求，线程空闲时为None
+        self.last_progress_time = 0.0
+        # 当前文件的原始词频索引（停用词过滤前）：(解析设置, 原始词频Counter, 文本数量, 去重说明)
+        # 只修改停用词或词汇数量时直接在索引上重新计算，无需重新解析文件
+        self.raw_index = None
+        # 当前文件的短语频次索引：(解析设置, 停用词, {n: Counter}, 文本数量, 去重说明)，切换二元/三元短语时直接复用
+        self.ngram_index = None
+        self.dedup_summary = None  # 当前结果的去重说明，未去重时为None
+        self.result_job = None  # 当前显示结果对应的分析请求，导出完整词汇表时使用
+        # 监视模式的增量统计：((文件路径, 字段, 去重方式), IncrementalAnalysis)，只在后台线程中使用
+        self.incremental = None
+        self.watch_after_id = None  # 下一次检查文件变化的root.after标识
+        self.watch_message = None  # 结果摘要中显示的监视状态
+        self.current_ngram = 1  # 当前结果的统计单位
+        self.current_fields = DEFAULT_FIELDS  # 当前结果的分析字段
+        # 嵌入的词频图表只创建一次，之后每次分析原地更新柱高和标签
+        self.chart_figure = None
+        self.chart_ax = None
+        self.chart_canvas = None
+        self.chart_bars = None
+        self.chart_value_labels = []
+        self.chart_message_label = None
+        self.current_figure = None
+
+        # 持久化解析缓存，缓存目录不可用时不影响正常分析
+        try:
+            self.parse_cache = ParseCache()
+        except Exception as e:
+            print(f"解析缓存不可用: {e}")
+            self.parse_cache = None
 
         self.setup_ui()
 
@@ -165,6 +243,43 @@ class RISAnalyzerGUI:
         ttk.Label(count_frame, text="个 (10-200)",
                  font=('Arial', 9), foreground=self.colors['muted']).pack(side=tk.LEFT, padx=(10, 0))
 
+        # 统计单位：单词或短语，停用词作为短语边界
+        ttk.Label(settings_frame, text="统计单位:",
+                 font=('Arial', 10, 'bold')).pack(anchor=tk.W)
+
+        self.ngram_var = tk.StringVar(value=NGRAM_LABELS[1])
+        ngram_combobox = ttk.Combobox(settings_frame, textvariable=self.ngram_var, state='readonly',
+                                      values=list(NGRAM_LABELS.values()), font=('Arial', 10))
+        ngram_combobox.pack(fill=tk.X, pady=(5, 15))
+        ngram_combobox.bind('<<ComboboxSelected>>', self.on_ngram_selected)
+
+        # 分析字段：标题、摘要、关键词，可多选
+        ttk.Label(settings_frame, text="分析字段:",
+                 font=('Arial', 10, 'bold')).pack(anchor=tk.W)
+
+        fields_frame = tk.Frame(settings_frame)
+        fields_frame.pack(fill=tk.X, pady=(5, 15))
+
+        self.field_vars = {}
+        for field, label in ANALYSIS_FIELDS.items():
+            self.field_vars[field] = tk.BooleanVar(value=field in DEFAULT_FIELDS)
+            ttk.Checkbutton(fields_frame, text=f"{label} ({field})",
+                            variable=self.field_vars[field]).pack(side=tk.LEFT, padx=(0, 10))
+
+        # 去除重复记录：合并多个数据库的导出文件时同一篇文章可能出现多次
+        ttk.Label(settings_frame, text="重复记录:",
+                 font=('Arial', 10, 'bold')).pack(anchor=tk.W)
+
+        self.dedup_labels = {None: "不去除", **DEDUP_MODES}
+        self.dedup_var = tk.StringVar(value=self.dedup_labels[None])
+        ttk.Combobox(settings_frame, textvariable=self.dedup_var, state='readonly',
+                     values=list(self.dedup_labels.values()), font=('Arial', 10)).pack(fill=tk.X, pady=(5, 10))
+
+        # 监视模式：文件追加记录后自动增量更新结果
+        self.watch_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(settings_frame, text="👀 监视文件变化（追加记录时只解析新增部分）",
+                        variable=self.watch_var, command=self.on_watch_toggled).pack(anchor=tk.W, pady=(0, 15))
+
         # 自定义停用词
         ttk.Label(settings_frame, text="自定义停用词:",
                  font=('Arial', 10, 'bold')).pack(anchor=tk.W)
@@ -180,6 +295,15 @@ class RISAnalyzerGUI:
                                         command=self.start_analysis, style='Custom.TButton')
         self.analyze_button.pack(fill=tk.X, pady=(0, 10))
 
+        self.cancel_button = ttk.Button(settings_frame, text="⏹️ 取消分析",
+                                       command=self.cancel_analysis,
+                                       state="disabled", style='Custom.TButton')
+        self.cancel_button.pack(fill=tk.X, pady=(0, 10))
+
+        self.clear_cache_button = ttk.Button(settings_frame, text="🗑️ 清除解析缓存",
+                                            command=self.clear_parse_cache, style='Custom.TButton')
+        self.clear_cache_button.pack(fill=tk.X)
+
         # 保存选项
         save_frame = ttk.LabelFrame(parent, text="💾 保存选项", padding="15")
         save_frame.pack(fill=tk.X, pady=(0, 15))
@@ -197,7 +321,14 @@ class RISAnalyzerGUI:
         self.save_csv_button = ttk.Button(save_frame, text="保存词频数据为CSV",
                                          command=lambda: self.save_results('csv'),
                                          state="disabled", style='Custom.TButton')
-        self.save_csv_button.pack(fill=tk.X)
+        self.save_csv_button.pack(fill=tk.X, pady=(0, 5))
+
+        self.export_button = ttk.Button(save_frame, text="保存完整词汇表（CSV/SQLite/Parquet）",
+                                        command=self.export_full_vocabulary,
+                                        state="disabled", style='Custom.TButton')
+        self.export_button.pack(fill=tk.X)
+        ttk.Label(save_frame, text="单词模式需重新解析文件统计文档频率，耗时与一次分析相当",
+                 font=('Arial', 9), foreground=self.colors['muted'], wraplength=260).pack(anchor=tk.W, pady=(2, 0))
 
         # 状态显示
         status_frame = ttk.LabelFrame(parent, text="📊 状态信息", padding="15")
@@ -219,12 +350,12 @@ class RISAnalyzerGUI:
         self.word_list_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.word_list_frame, text="📋 词频列表")
 
-        self.result_text = scrolledtext.ScrolledText(self.word_list_frame,
-                                                    font=('Consolas', 11),
-                                                    relief=tk.SOLID,
-                                                    borderwidth=1,
-                                                    bg='#ffffff')
-        self.result_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        # 结果摘要和完整词汇表；表格只填充可见的行，可容纳数十万个词
+        self.summary_var = tk.StringVar()
+        ttk.Label(self.word_list_frame, textvariable=self.summary_var, justify=tk.LEFT,
+                  font=('Arial', 10)).pack(fill=tk.X, padx=10, pady=(10, 5))
+        self.vocabulary_table = VocabularyTable(self.word_list_frame)
+        self.vocabulary_table.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
 
         # 图表标签页
         self.chart_frame = ttk.Frame(self.notebook)
@@ -232,11 +363,22 @@ class RISAnalyzerGUI:
 
         # 图表显示区域（直接使用整个框架）
         self.chart_display_frame = self.chart_frame
+
+        # 运行统计标签页：最近一次分析的各阶段耗时、计数和峰值内存
+        self.stats_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.stats_frame, text="📈 运行统计")
+
+        self.stats_tree = ttk.Treeview(self.stats_frame, columns=('name', 'value'), show='headings')
+        self.stats_tree.heading('name', text="项目")
+        self.stats_tree.heading('value', text="数值")
+        self.stats_tree.column('name', width=200)
+        self.stats_tree.column('value', width=200, anchor=tk.E)
+        self.stats_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
     def browse_file(self):
         filename = filedialog.askopenfilename(
             title="选择RIS文件",
-            filetypes=[("RIS files", "*.ris"), ("All files", "*.*")]
+            filetypes=[("RIS files", "*.ris *.ris.gz *.ris.bz2 *.ris.xz *.zip"), ("All files", "*.*")]
         )
         if filename:
             self.file_path_var.set(filename)
@@ -272,67 +414,271 @@ class RISAnalyzerGUI:
 
         # 获取自定义停用词
         try:
-            self.custom_stop_words = self.get_custom_stop_words()
+            custom_stop_words = self.get_custom_stop_words()
         except Exception as e:
             messagebox.showerror("❌ 错误", f"处理自定义停用词时出错: {str(e)}")
             return
 
-        # 在新线程中执行分析，避免界面冻结
-        self.analyze_button.config(state="disabled")
-        self.browse_button.config(state="disabled")
-        self.progress_var.set("🔄 正在分析文件，请稍候...")
-
-        # 清空之前的结果
-        self.result_text.delete("1.0", tk.END)
-        # 只清空图表显示区域，不清空控制按钮
-        if hasattr(self, 'chart_display_frame'):
-            for widget in self.chart_display_frame.winfo_children():
-                widget.destroy()
+        fields = self.get_fields()
+        if not fields:
+            messagebox.showerror("❌ 错误", "请至少选择一个分析字段")
+            return
+        if KEYWORD_FIELD in fields and self.get_ngram() > 1:
+            messagebox.showerror("❌ 错误", "关键词按整个短语统计，不能与二元/三元短语同时使用")
+            return
+        if self.watch_var.get() and self.get_ngram() > 1:
+            messagebox.showerror("❌ 错误", WATCH_NGRAM_ERROR)
+            return
 
-        self.analysis_thread = threading.Thread(target=self.analyze_file, args=(file_path, word_count))
-        self.analysis_thread.daemon = True
-        self.analysis_thread.start()
-    
-    def analyze_file(self, file_path, word_count):
-        try:
-            # 更新状态
-            self.root.after(0, lambda: self.progress_var.set("📖 正在解析RIS文件..."))
+        job = AnalysisJob(file_path, self.get_file_key(file_path), word_count, self.get_ngram(), custom_stop_words,
+                          fields, self.get_dedup_mode(), self.watch_var.get())
+        self.submit_job(job)
+
+    def submit_job(self, job, clear_results=True):
+        """提交分析请求：取代正在进行的请求，有可复用的索引时直接显示结果
+
+        clear_results为False时（监视模式的自动更新）保留当前结果，直到新结果算出。
+        """
+        with self.job_lock:
+            previous = self.running_job
+            self.current_job = job
+            if previous is not None and previous.index_key != job.index_key:
+                # 正在进行的分析建立的索引不能用于新请求（换了文件、字段、去重方式、统计单位，
+                # 或短语模式下改了停用词）：取消它；否则继续进行，完成后按最新设置复用其索引
+                previous.cancel_event.set()
+            worker_busy = previous is not None
+
+        # 后台空闲且同一文件未修改时，直接在已有的索引上重新计算结果
+        if not worker_busy and self.has_index(job):
+            self.finish_job(job, *self.compute_word_counts(job))
+            return
 
-            # 解析RIS文件
-            self.titles = self.parse_ris_file(file_path)
+        self.cancel_button.config(state="normal")
+        self.last_progress_time = 0.0
+        self.progress_var.set("🔄 正在分析文件，请稍候...")
 
-            if not self.titles:
-                self.root.after(0, lambda: messagebox.showerror("❌ 错误", "未找到任何标题，请检查文件格式是否正确"))
-                return
+        if clear_results:
+            # 清空之前的结果
+            self.summary_var.set("")
+            self.vocabulary_table.clear()
+            # 只隐藏图表显示区域，图表本身保留以便复用
+            self.clear_chart()
+
+        # 后台线程正在运行时由它接着处理最新请求，否则在新线程中执行分析，避免界面冻结
+        if not worker_busy:
+            self.analysis_thread = threading.Thread(target=self.run_jobs)
+            self.analysis_thread.daemon = True
+            self.analysis_thread.start()
+
+    def on_watch_toggled(self):
+        """勾选监视后，已有结果或正在分析时按当前设置重新分析并开始监视；取消勾选时停止检查"""
+        if self.watch_var.get():
+            if self.get_ngram() > 1:
+                self.watch_var.set(False)
+                messagebox.showerror("❌ 错误", WATCH_NGRAM_ERROR)
+            elif self.word_counts or self.running_job is not None:
+                self.start_analysis()
+        elif self.watch_after_id is not None:
+            self.root.after_cancel(self.watch_after_id)
+            self.watch_after_id = None
+
+    def stop_watching(self, reason):
+        """监视的分析被取消或出错后停止监视：取消勾选并在状态栏说明原因"""
+        self.watch_var.set(False)
+        if self.watch_after_id is not None:
+            self.root.after_cancel(self.watch_after_id)
+            self.watch_after_id = None
+        self.watch_message = None
+        self.progress_var.set(f"⏹️ {reason}，已停止监视文件变化")
+
+    def schedule_watch(self):
+        """WATCH_INTERVAL秒后检查一次文件变化"""
+        if self.watch_after_id is not None:
+            self.root.after_cancel(self.watch_after_id)
+        self.watch_after_id = self.root.after(int(WATCH_INTERVAL * 1000), self.poll_watched_file)
+
+    def poll_watched_file(self):
+        """主线程定时检查：文件变化后按当前结果的设置提交新的请求，后台增量统计"""
+        self.watch_after_id = None
+        job = self.result_job
+        if not self.watch_var.get() or job is None or not job.watch:
+            return
+        if job is not self.current_job:
+            # 正在进行的请求完成后会重新开始检查；已取消或出错的请求不会，需要告知用户
+            if self.running_job is None:
+                self.stop_watching("最近一次分析未完成")
+            return
+        try:
+            file_key = self.get_file_key(job.file_path)
+        except OSError:
+            file_key = job.file_key  # 文件暂时不可访问（如正在被替换），下次再检查
+        if file_key == job.file_key or self.running_job is not None:
+            self.schedule_watch()
+            return
+        self.submit_job(AnalysisJob(job.file_path, file_key, job.word_count, job.ngram, job.custom_stop_words,
+                                    job.fields, job.dedup_mode, watch=True), clear_results=False)
+
+    def get_ngram(self):
+        """当前选择的统计单位：1=单词，2=二元短语，3=三元短语"""
+        for n, label in NGRAM_LABELS.items():
+            if self.ngram_var.get() == label:
+                return n
+        return 1
+
+    def get_fields(self):
+        """当前勾选的分析字段，按 ANALYSIS_FIELDS 的顺序排列"""
+        return tuple(field for field in ANALYSIS_FIELDS if self.field_vars[field].get())
+
+    def get_dedup_mode(self):
+        """当前选择的去重方式：None、'exact'或'near'"""
+        for mode, label in self.dedup_labels.items():
+            if self.dedup_var.get() == label:
+                return mode
+        return None
+
+    def on_ngram_selected(self, event=None):
+        """切换统计单位后，如已有分析结果则立即刷新"""
+        if self.word_counts or self.running_job is not None:
+            self.start_analysis()
+
+    def cancel_jobs(self):
+        """取消最新请求和后台线程正在处理的请求，返回后台是否有正在进行的分析"""
+        with self.job_lock:
+            running, current = self.running_job, self.current_job
+        if running is None:
+            return False
+        running.cancel_event.set()
+        current.cancel_event.set()
+        return True
+
+    def cancel_analysis(self):
+        """请求取消正在进行的分析，分析线程在下一次进度回调时退出"""
+        if self.cancel_jobs():
+            self.cancel_button.config(state="disabled")
+            self.progress_var.set("⏹️ 正在取消分析...")
+
+    def report_progress(self, job, stage, total_bytes, bytes_read, records, tokens):
+        """分析线程的进度回调：检查取消请求，并按固定间隔通过root.after刷新状态信息"""
+        if job.cancel_event.is_set():
+            raise AnalysisCancelled()
+        now = time.monotonic()
+        if now - self.last_progress_time < PROGRESS_UPDATE_INTERVAL:
+            return
+        self.last_progress_time = now
+
+        message = f"{stage}\n记录: {records:,} 条  词: {tokens:,} 个"
+        if bytes_read is not None and total_bytes:
+            message += (f"\n已读取: {bytes_read / 1024 / 1024:.1f} / {total_bytes / 1024 / 1024:.1f} MB"
+                        f" ({bytes_read / total_bytes * 100:.0f}%)")
+        self.root.after(0, lambda: self.progress_var.set(message))
+
+    def make_progress(self, job, stage):
+        """为指定请求和阶段生成 progress(字节数, 记录数, 词数) 回调"""
+        total_bytes = os.path.getsize(job.file_path)
+        return lambda bytes_read, records, tokens: self.report_progress(
+            job, stage, total_bytes, bytes_read, records, tokens)
+
+    def run_jobs(self):
+        """后台线程：处理最新的分析请求，处理期间有新请求时接着处理，直到没有新请求"""
+        job = None
+        while True:
+            with self.job_lock:
+                latest = self.current_job
+                if latest is job or latest.cancel_event.is_set():
+                    self.running_job = None
+                    cancelled = latest.cancel_event.is_set()
+                    break
+                job = self.running_job = latest
+            self.analyze_file(job)
+
+        if cancelled:
+            self.root.after(0, self.analysis_complete)
 
-            # 更新状态
-            self.root.after(0, lambda: self.progress_var.set(f"🔍 正在分析 {len(self.titles)} 个标题的词频..."))
+    def analyze_file(self, job):
+        """建立job所需的索引并计算结果，结果交给主线程的finish_job显示"""
+        try:
+            # 边解析边统计原始词频（或短语频次），再按停用词和词汇数量计算结果；
+            # 同一文件上一个请求建立的索引直接复用
+            if not self.has_index(job):
+                if job.ngram == 1:
+                    self.build_raw_index(job)
+                else:
+                    self.build_ngram_index(job)
+            vocabulary, title_count, dedup_summary = self.compute_word_counts(job)
+        except AnalysisCancelled:
+            return
+        except Exception as e:
+            error_msg = f"分析过程中出错: {str(e)}"
+            self.root.after(0, lambda: self.fail_job(job, error_msg))
+            return
 
-            # 词频分析（使用用户设定的词汇数量）
-            self.word_counts = self.analyze_word_frequency(self.titles, word_count)
+        self.root.after(0, lambda: self.finish_job(job, vocabulary, title_count, dedup_summary))
 
-            if not self.word_counts:
-                self.root.after(0, lambda: messagebox.showwarning("⚠️ 警告", "未能提取到有效词汇，请检查文件内容或调整停用词设置"))
-                return
+    def finish_job(self, job, vocabulary, title_count, dedup_summary=None):
+        """在主线程中显示分析结果，已被新请求取代的结果直接丢弃
 
-            # 更新UI
-            self.root.after(0, self.update_results)
+        vocabulary为按频次从高到低排列的完整词汇表，前word_count个用于图表和保存的词频数据。
+        """
+        if job is not self.current_job:
+            return
 
-        except Exception as e:
-            error_msg = f"分析过程中出错: {str(e)}"
-            self.root.after(0, lambda: messagebox.showerror("❌ 错误", error_msg))
-        finally:
-            self.root.after(0, self.analysis_complete)
+        self.vocabulary = vocabulary
+        self.word_counts = vocabulary[:job.word_count]
+        self.title_count = title_count
+        self.dedup_summary = dedup_summary
+        self.result_job = job
+        if not job.watch:
+            self.watch_message = None
+        elif job.watch_message:
+            self.watch_message = job.watch_message
+        self.current_ngram = job.ngram
+        self.current_fields = job.fields
+        self.custom_stop_words = job.custom_stop_words
+
+        if not title_count:
+            messagebox.showerror("❌ 错误", f"未找到任何{fields_label(job.fields)}，请检查文件格式是否正确")
+        elif not vocabulary:
+            messagebox.showwarning("⚠️ 警告", "未能提取到有效词汇，请检查文件内容或调整停用词设置")
+        else:
+            with job.stats.stage('display'):
+                self.update_results()
+        self.update_stats(job.stats)
+        self.analysis_complete()
+        if job.watch:
+            self.schedule_watch()
+
+    def update_stats(self, stats):
+        """在运行统计标签页中显示一次分析的统计"""
+        self.stats_tree.delete(*self.stats_tree.get_children())
+        for name, value in stats.format_lines():
+            self.stats_tree.insert('', tk.END, values=(name, value))
+
+    def fail_job(self, job, error_msg):
+        """在主线程中报告分析错误，已被新请求取代的请求不再提示"""
+        if job is not self.current_job:
+            return
+        self.word_counts = []
+        self.vocabulary = []
+        messagebox.showerror("❌ 错误", error_msg)
+        self.analysis_complete()
+        if job.watch:
+            self.stop_watching("分析出错")
 
     def analysis_complete(self):
-        self.analyze_button.config(state="normal")
-        self.browse_button.config(state="normal")
+        self.cancel_button.config(state="disabled")
 
-        if self.word_counts:
+        if self.current_job is not None and self.current_job.cancel_event.is_set():
+            if self.current_job.watch:
+                self.stop_watching("分析已取消")
+            else:
+                self.progress_var.set("⏹️ 分析已取消")
+        elif self.word_counts:
             # 启用保存按钮
             try:
                 self.save_txt_button.config(state="normal")
                 self.save_csv_button.config(state="normal")
+                if not self.exporting:
+                    self.export_button.config(state="normal")
                 if hasattr(self, 'download_chart_button'):
                     self.download_chart_button.config(state="normal")
             except Exception as e:
@@ -342,61 +688,76 @@ class RISAnalyzerGUI:
             self.progress_var.set("❌ 分析失败")
     
     def update_results(self):
-        # 更新词频列表
-        self.result_text.delete("1.0", tk.END)
-
-        # 创建美观的结果显示
-        result_text = "✨ 词频分析结果\n"
-        result_text += "═" * 60 + "\n\n"
-        result_text += f"� 解析标题数量: {len(self.titles):,} 个\n"
-        result_text += f"🔍 高频词汇数量: {len(self.word_counts)} 个\n"
-
+        """显示结果摘要和完整词汇表，并更新图表"""
+        unit = NGRAM_LABELS[self.current_ngram]
+        lines = [
+            f"📋 分析字段: {fields_label(self.current_fields)}    "
+            f"解析{'标题' if self.current_fields == DEFAULT_FIELDS else '文本'}数量: {self.title_count:,} 个",
+            f"🔍 {unit}总数: {len(self.vocabulary):,} 个（图表和保存的词频数据取前 {len(self.word_counts)} 个）",
+        ]
+        if self.dedup_summary:
+            lines.append(self.dedup_summary)
         if self.custom_stop_words:
-            result_text += f"🚫 自定义停用词: {len(self.custom_stop_words)} 个\n"
-
-        result_text += "\n" + "🏆 词频排行榜" + "\n"
-        result_text += "─" * 60 + "\n"
-
-        for i, (word, count) in enumerate(self.word_counts, 1):
-            # 添加排名图标
-            if i == 1:
-                icon = "🥇"
-                result_text += f"{icon} {word:<25} : {count:4d} 次\n"
-            elif i == 2:
-                icon = "🥈"
-                result_text += f"{icon} {word:<25} : {count:4d} 次\n"
-            elif i == 3:
-                icon = "🥉"
-                result_text += f"{icon} {word:<25} : {count:4d} 次\n"
-            else:
-                result_text += f"{i:2d}. {word:<24} : {count:4d} 次\n"
-
-        result_text += "\n" + "─" * 60 + "\n"
-        result_text += "💡 提示: 可以在左侧添加自定义停用词来过滤不需要的词汇\n"
-        result_text += "📊 图表会根据设定的词汇数量动态调整尺寸和布局\n"
-
-        self.result_text.insert("1.0", result_text)
+            lines.append(f"🚫 自定义停用词: {len(self.custom_stop_words)} 个")
+        if self.watch_message:
+            lines.append(self.watch_message)
+        lines.append("💡 点击列标题排序，在搜索框中输入可即时筛选")
+        self.summary_var.set("\n".join(lines))
+        self.vocabulary_table.set_items(self.vocabulary, unit)
 
         # 更新图表
         self.update_chart()
-    
+
+    def setup_chart(self):
+        """创建嵌入的图表，整个程序运行期间只创建一次
+
+        matplotlib在第一次显示图表时才导入，窗口启动时不付出导入开销。
+        """
+        import matplotlib
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+
+        # 设置中文字体支持 - 参考原始版本
+        matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
+        matplotlib.rcParams['axes.unicode_minus'] = False
+
+        # 直接创建Figure而不经过pyplot，图表不会在pyplot中累积
+        self.chart_figure = Figure(figsize=(15, 8), facecolor='white')
+        self.chart_ax = self.chart_figure.add_subplot()
+        self.chart_ax.set_ylabel('频次 (Frequency)', fontsize=14)
+        # 添加网格 - 参考原始版本
+        self.chart_ax.grid(axis='y', alpha=0.3)
+        # 为标题和X轴标签留出空间
+        self.chart_figure.subplots_adjust(left=0.06, right=0.98, top=0.9, bottom=0.2)
+
+        # 将图表嵌入到tkinter中
+        self.chart_canvas = FigureCanvasTkAgg(self.chart_figure, self.chart_display_frame)
+        self.current_figure = self.chart_figure
+
+    def clear_chart(self):
+        """隐藏图表显示区域中的内容（不销毁图表）"""
+        for widget in self.chart_display_frame.winfo_children():
+            widget.pack_forget()
+
+    def show_chart_message(self, text, foreground='#7f8c8d', font_size=14):
+        """在图表区域显示提示信息"""
+        if self.chart_message_label is None:
+            self.chart_message_label = ttk.Label(self.chart_display_frame)
+        self.chart_message_label.config(text=text, font=('Arial', font_size), foreground=foreground)
+        self.chart_message_label.pack(expand=True)
+
     def update_chart(self):
-        # 清除之前的图表
-        if hasattr(self, 'chart_display_frame'):
-            for widget in self.chart_display_frame.winfo_children():
-                widget.destroy()
+        """更新词频图表：柱高、刻度标签和数值标签在同一个图表上原地更新"""
+        self.clear_chart()
 
         if not self.word_counts:
             # 显示空状态
-            empty_label = ttk.Label(self.chart_display_frame, text="📈 暂无图表数据",
-                                   font=('Arial', 14), foreground='#7f8c8d')
-            empty_label.pack(expand=True)
+            self.show_chart_message("📈 暂无图表数据")
             return
 
         try:
-            # 设置中文字体支持 - 参考原始版本
-            plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
-            plt.rcParams['axes.unicode_minus'] = False
+            if self.chart_figure is None:
+                self.setup_chart()
 
             # 获取用户设定的词汇数量
             try:
@@ -405,200 +766,204 @@ class RISAnalyzerGUI:
                 user_count = 50  # 默认值
             display_count = min(user_count, len(self.word_counts))
 
-            # 创建图表 - 参考原始版本的固定尺寸
-            fig, ax = plt.subplots(figsize=(15, 8))
-            fig.patch.set_facecolor('white')
-
             if display_count == 0:
                 raise Exception("没有词汇数据可显示")
 
             words, counts = zip(*self.word_counts[:display_count])
-
-            # 创建柱状图 - 使用原始版本的简洁样式
-            bars = ax.bar(words, counts, color='skyblue', alpha=0.7)
-
-            # 在柱状图上显示数值 - 参考原始版本
-            for bar, count in zip(bars, counts):
-                ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1,
-                       str(count), ha='center', va='bottom', fontsize=10)
+            ax = self.chart_ax
+
+            # 柱的数量不变时只修改柱高和数值标签，否则重新创建柱状图 - 使用原始版本的简洁样式
+            if self.chart_bars is not None and len(self.chart_bars) == display_count:
+                for bar, label, count in zip(self.chart_bars, self.chart_value_labels, counts):
+                    bar.set_height(count)
+                    label.xy = (label.xy[0], count)
+                    label.set_text(str(count))
+            else:
+                if self.chart_bars is not None:
+                    self.chart_bars.remove()
+                    for label in self.chart_value_labels:
+                        label.remove()
+                self.chart_bars = ax.bar(range(display_count), counts, color='skyblue', alpha=0.7)
+                # 在柱状图上显示数值，一次调用生成全部标签
+                self.chart_value_labels = ax.bar_label(self.chart_bars, labels=[str(count) for count in counts],
+                                                       fontsize=10)
 
             # 设置标签和标题 - 参考原始版本，移除加粗
-            ax.set_xticks(range(len(words)))
+            ax.set_xticks(range(display_count))
             ax.set_xticklabels(words, rotation=45, ha='right', fontsize=12)
-            ax.set_title('标题词频分布 (Title Word Frequency)', fontsize=16)
-            ax.set_xlabel('词语 (Words)', fontsize=14)
-            ax.set_ylabel('频次 (Frequency)', fontsize=14)
+            ax.set_title(frequency_chart_title(self.current_fields, self.current_ngram), fontsize=16)
+            ax.set_xlabel('短语 (Phrases)' if self.current_ngram > 1 else '词语 (Words)', fontsize=14)
+            # 直接设置坐标范围（比relim逐个计算柱的范围快得多），顶部为数值标签留出空间
+            ax.set_xlim(-0.6, display_count - 0.4)
+            ax.set_ylim(0, max(counts) * 1.08)
 
-            # 添加网格 - 参考原始版本
-            ax.grid(axis='y', alpha=0.3)
+            # 简单的显示方式：让图表适应窗口，但保持宽高比
+            self.chart_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+            self.chart_canvas.draw_idle()
 
-            # 调整布局，确保标题和标签完整显示
-            plt.tight_layout(pad=3.0)  # 增加边距
-            plt.subplots_adjust(top=0.9, bottom=0.2)  # 为标题和X轴标签留出空间
+        except Exception as e:
+            # 如果图表更新失败，显示错误信息
+            self.show_chart_message(f"❌ 图表生成失败: {str(e)}", '#e74c3c', 12)
 
-            # 将图表嵌入到tkinter中 - 简化版本
-            self.chart_canvas = FigureCanvasTkAgg(fig, self.chart_display_frame)
-            self.chart_canvas.draw()
+    @staticmethod
+    def get_file_key(file_path):
+        """文件标识：路径、大小和修改时间，任一变化都需要重新解析"""
+        stat = os.stat(file_path)
+        return os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns
 
-            # 获取图表widget
-            canvas_widget = self.chart_canvas.get_tk_widget()
+    def build_raw_index(self, job):
+        """解析RIS文件并建立原始词频索引，已解析过且未修改的文件直接读取解析缓存中的记录
 
-            # 简单的显示方式：让图表适应窗口，但保持宽高比
-            canvas_widget.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        解析缓存保存分析可能用到的全部字段，改变分析字段或去重方式时也不必重新解析文件。
+        """
+        file_path = job.file_path
+        self.raw_index = None
 
-            # 保存图表对象以便下载
-            self.current_figure = fig
+        if job.watch:
+            self.build_incremental_index(job)
+            return
 
+        dedup = self.make_deduplicator(job)
+        label = fields_label(job.fields)
+        with job.stats.stage('cache'):
+            records, file_state = self.load_cached_records(file_path)
+        if records is not None:
+            progress = self.make_progress(job, f"⚡ 已从缓存载入 {len(records):,} 条记录，正在统计{label}词频...")
+            raw_counts, title_count = count_raw_tokens_in_records(records, job.fields, dedup, progress, job.stats)
+        else:
+            try:
+                # 大文件按记录边界切块，多进程并行解析统计
+                progress = self.make_progress(job, f"📖 正在解析RIS文件并统计{label}词频...")
+                raw_counts, title_count, records = count_raw_tokens_parallel(
+                    file_path, keep_records=True, progress=progress, stats=job.stats, fields=job.fields, dedup=dedup)
+            except AnalysisCancelled:
+                raise
+            except Exception as e:
+                raise Exception(f"解析文件时出错: {e}")
+            with job.stats.stage('cache'):
+                self.store_cached_records(file_path, records, file_state)
+
+        self.raw_index = (job.parse_key, raw_counts, title_count, self.finish_dedup(job, dedup))
+
+    def build_incremental_index(self, job):
+        """监视模式：同一文件只在第一次完整解析，之后只解析追加的完整记录，累加到已有的原始词频上"""
+        settings = (job.file_key[0], job.fields, job.dedup_mode)
+        if self.incremental is None or self.incremental[0] != settings:
+            self.incremental = (settings, IncrementalAnalysis(job.file_path, job.fields,
+                                                              dedup_factory=lambda: self.make_deduplicator(job)))
+        analysis = self.incremental[1]
+        try:
+            progress = self.make_progress(job, f"📖 正在解析RIS文件并统计{fields_label(job.fields)}词频...")
+            status = analysis.update(progress=progress, stats=job.stats)
+        except AnalysisCancelled:
+            raise
         except Exception as e:
-            # 如果图表创建失败，显示错误信息
-            error_label = ttk.Label(self.chart_display_frame, text=f"❌ 图表生成失败: {str(e)}",
-                                   font=('Arial', 12), foreground='#e74c3c')
-            error_label.pack(expand=True)
-
-    def parse_ris_file(self, file_path):
-        """解析RIS文件并提取标题"""
-        titles = []
-        current_title = ""
-        in_title = False
+            raise Exception(f"解析文件时出错: {e}")
 
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                for line in file:
-                    line = line.strip()
-
-                    if line.startswith('TI  - '):  # 标题开始行
-                        current_title = line[6:].strip()
-                        in_title = True
-                    elif in_title and line and not line.startswith(('TY  -', 'AU  -', 'PY  -', 'T2  -', 'VL  -', 'IS  -', 'SP  -', 'EP  -', 'DO  -', 'UR  -', 'AB  -', 'KW  -', 'M3  -', 'DB  -', 'N1  -', 'ER  -', 'C7  -', 'ST  -')):
-                        # 标题可能跨多行，继续添加
-                        current_title += " " + line
-                    elif line.startswith('ER  - ') or (in_title and line.startswith(('AU  -', 'PY  -', 'T2  -', 'AB  -'))):  # 记录结束或其他字段开始
-                        if current_title:
-                            # 清理标题，移除多余空格
-                            clean_title = ' '.join(current_title.split())
-                            titles.append(clean_title)
-                        current_title = ""
-                        in_title = False
-
-                # 处理文件末尾没有ER标记的情况
-                if current_title:
-                    clean_title = ' '.join(current_title.split())
-                    titles.append(clean_title)
-
-        except UnicodeDecodeError:
+        updated = time.strftime('%H:%M:%S')
+        if status == 'appended':
+            job.watch_message = f"👀 监视中: {updated} 新增 {analysis.new_titles:,} 个{fields_label(job.fields)}（只解析新增部分）"
+        elif status == 'rebuilt':
+            job.watch_message = f"👀 监视中: {updated} 完整解析文件"
+        self.raw_index = (job.parse_key, analysis.raw_counts(), analysis.title_count,
+                          self.finish_dedup(job, analysis.dedup))
+
+    def build_ngram_index(self, job):
+        """单遍统计单词、二元和三元短语，停用词作为短语边界"""
+        file_path = job.file_path
+        self.ngram_index = None
+
+        dedup = self.make_deduplicator(job)
+        label = fields_label(job.fields)
+        with job.stats.stage('cache'):
+            records, file_state = self.load_cached_records(file_path)
+        if records is not None:
+            progress = self.make_progress(job, f"🔍 正在统计 {len(records):,} 条记录中的{label}短语...")
+            ngram_counts, title_count = count_ngrams(iter_texts_from_records(records, job.fields, dedup=dedup),
+                                                     job.stop_words, progress=progress, stats=job.stats)
+        else:
             try:
-                with open(file_path, 'r', encoding='latin-1') as file:
-                    for line in file:
-                        line = line.strip()
-
-                        if line.startswith('TI  - '):
-                            current_title = line[6:].strip()
-                            in_title = True
-                        elif in_title and line and not line.startswith(('TY  -', 'AU  -', 'PY  -', 'T2  -', 'VL  -', 'IS  -', 'SP  -', 'EP  -', 'DO  -', 'UR  -', 'AB  -', 'KW  -', 'M3  -', 'DB  -', 'N1  -', 'ER  -', 'C7  -', 'ST  -')):
-                            current_title += " " + line
-                        elif line.startswith('ER  - ') or (in_title and line.startswith(('AU  -', 'PY  -', 'T2  -', 'AB  -'))):
-                            if current_title:
-                                clean_title = ' '.join(current_title.split())
-                                titles.append(clean_title)
-                            current_title = ""
-                            in_title = False
-
-                    if current_title:
-                        clean_title = ' '.join(current_title.split())
-                        titles.append(clean_title)
+                progress = self.make_progress(job, f"📖 正在解析RIS文件并统计{label}短语...")
+                ngram_counts, title_count, records = count_ngrams_in_file(
+                    file_path, job.stop_words, keep_records=True, progress=progress, stats=job.stats,
+                    fields=job.fields, dedup=dedup)
+            except AnalysisCancelled:
+                raise
             except Exception as e:
-                raise Exception(f"无法读取文件: {e}")
+                raise Exception(f"解析文件时出错: {e}")
+            with job.stats.stage('cache'):
+                self.store_cached_records(file_path, records, file_state)
+
+        self.ngram_index = (job.parse_key, job.stop_words, ngram_counts, title_count,
+                            self.finish_dedup(job, dedup))
+
+    @staticmethod
+    def make_deduplicator(job):
+        """按请求的去重方式创建RecordDeduplicator，不去重时返回None"""
+        return RecordDeduplicator(near=job.dedup_mode == 'near') if job.dedup_mode else None
+
+    @staticmethod
+    def finish_dedup(job, dedup):
+        """把去重结果记入运行统计，返回显示用的说明（不去重时为None）"""
+        if dedup is None:
+            return None
+        dedup.record_stats(job.stats)
+        return format_dedup_summary(dedup)
+
+    def has_index(self, job):
+        """检查请求的文件和设置是否已有可复用的索引"""
+        if job.ngram == 1:
+            return self.raw_index is not None and ('raw', self.raw_index[0]) == job.index_key
+        return (self.ngram_index is not None
+                and ('ngram',) + self.ngram_index[:2] == job.index_key)
+
+    def compute_word_counts(self, job):
+        """在索引上按频次排列全部词或短语，返回 (完整词汇表, 标题数量, 去重说明)
+
+        单词模式下重新应用停用词，耗时只与词汇量有关。
+        """
+        if job.ngram > 1:
+            _, _, ngram_counts, title_count, dedup_summary = self.ngram_index
+            return ngram_counts[job.ngram].most_common(), title_count, dedup_summary
+        _, raw_counts, title_count, dedup_summary = self.raw_index
+        word_counts, _ = apply_stop_words(raw_counts, job.stop_words, job.stats)
+        job.stats.set('titles', title_count)
+        return word_counts.most_common(), title_count, dedup_summary
+
+    def load_cached_records(self, file_path):
+        """从解析缓存读取记录，返回 (记录列表, 文件状态)
+
+        未命中时记录列表为None，文件状态在解析前取得，解析后传给store_cached_records；
+        缓存不可用时两者都为None。
+        """
+        if self.parse_cache is None:
+            return None, None
+        try:
+            file_state = self.parse_cache.file_state(file_path)
+            return self.parse_cache.get(file_path, file_state), file_state
         except Exception as e:
-            raise Exception(f"解析文件时出错: {e}")
+            print(f"读取解析缓存失败: {e}")
+            return None, None
 
-        return titles
-
-    def normalize_word(self, word):
-        """词形规范化：将复数形式转换为单数形式"""
-        # 处理常见的复数形式
-        if word.endswith('ies') and len(word) > 4:
-            # studies -> study, theories -> theory
-            return word[:-3] + 'y'
-        elif word.endswith('es') and len(word) > 3:
-            # processes -> process, analyses -> analysis
-            if word.endswith('ses'):
-                return word[:-2]  # analyses -> analysis
-            elif word.endswith('ches') or word.endswith('shes') or word.endswith('xes'):
-                return word[:-2]  # approaches -> approach
-            else:
-                return word[:-1]  # nodes -> node
-        elif word.endswith('s') and len(word) > 3:
-            # systems -> system, networks -> network
-            # 但要避免误处理以s结尾的单数词
-            if not word.endswith(('ss', 'us', 'is', 'as', 'os')):
-                return word[:-1]
-
-        return word
-
-    def analyze_word_frequency(self, titles, top_n=50):
-        """分析标题中的词频"""
-        # 学术文章标题专用停用词列表
-        base_stop_words = {
-            # 基础功能词
-            'a', 'an', 'the', 'and', 'or', 'but', 'if', 'of', 'at', 'by',
-            'for', 'with', 'about', 'to', 'from', 'in', 'on', 'is', 'are',
-            'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had',
-            'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may',
-            'might', 'must', 'can', 'this', 'that', 'these', 'those',
-
-            # 代词
-            'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her',
-            'us', 'them', 'my', 'your', 'his', 'its', 'our', 'their',
-
-            # 疑问词和副词
-            'what', 'which', 'who', 'whom', 'whose', 'where', 'when', 'why', 'how',
-
-            # 量词和限定词
-            'all', 'any', 'both', 'each', 'few', 'more', 'most', 'other', 'some', 'such',
-            'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very',
-
-            # 常见副词和介词
-            'just', 'now', 'also', 'as', 'up', 'out', 'down', 'off', 'over', 'under',
-            'again', 'further', 'then', 'once', 'here', 'there', 'into', 'onto',
-            'upon', 'within', 'without', 'through', 'during', 'before', 'after',
-            'above', 'below', 'between', 'among',
-
-            # 学术标题中常见但信息量较低的词汇
-            'study', 'studies', 'research', 'investigation', 'paper', 'article',
-            'review', 'survey', 'overview', 'introduction', 'conclusion',
-            'case', 'cases', 'example', 'examples', 'method', 'methods',
-            'approach', 'approaches', 'technique', 'techniques', 'way', 'ways',
-            'new', 'novel', 'improved', 'enhanced', 'advanced', 'modern',
-            'recent', 'current', 'latest', 'state', 'art', 'based', 'using',
-            'via', 'through', 'toward', 'towards', 'into', 'onto', 'upon'
-        }
+    def store_cached_records(self, file_path, records, file_state):
+        """保存解析出的记录到缓存，解析期间文件发生变化时不保存，失败时只记录错误"""
+        if self.parse_cache is None or file_state is None:
+            return
+        try:
+            self.parse_cache.put(file_path, records, file_state)
+        except Exception as e:
+            print(f"写入解析缓存失败: {e}")
 
-        # 合并基础停用词和用户自定义停用词
-        stop_words = base_stop_words.union(self.custom_stop_words)
-
-        # 使用简单的空格分词
-        all_words = []
-
-        for title in titles:
-            # 转小写，移除标点符号，保留字母、数字和空格
-            clean_title = re.sub(r'[^\w\s]', ' ', title.lower())
-            # 分词
-            words = clean_title.split()
-            # 过滤并规范化：只保留字母单词，长度大于2，不在停用词中，然后进行词形规范化
-            filtered_words = []
-            for word in words:
-                if word.isalpha() and len(word) > 2 and word not in stop_words:
-                    normalized_word = self.normalize_word(word)
-                    # 再次检查规范化后的词是否在停用词中
-                    if normalized_word not in stop_words:
-                        filtered_words.append(normalized_word)
-            all_words.extend(filtered_words)
-
-        # 计算词频
-        word_counts = Counter(all_words)
-        most_common = word_counts.most_common(top_n)
-
-        return most_common
+    def clear_parse_cache(self):
+        """清除解析缓存"""
+        if self.parse_cache is None:
+            messagebox.showwarning("⚠️ 警告", "解析缓存不可用")
+            return
+        try:
+            self.parse_cache.clear()
+            messagebox.showinfo("✅ 成功", "解析缓存已清除")
+        except Exception as e:
+            messagebox.showerror("❌ 错误", f"清除缓存失败: {str(e)}")
 
     def save_results(self, format_type='txt'):
         """保存分析结果 - 支持多种格式"""
@@ -639,15 +1004,98 @@ class RISAnalyzerGUI:
             except Exception as e:
                 messagebox.showerror("❌ 错误", f"保存失败: {str(e)}")
 
+    def export_full_vocabulary(self):
+        """把当前结果的完整词汇表（排名、词、频次、文档频率）导出到文件，在后台线程中进行"""
+        job = self.result_job
+        if job is None or not self.word_counts:
+            messagebox.showwarning("⚠️ 警告", "没有分析结果可导出")
+            return
+
+        filename = filedialog.asksaveasfilename(
+            title="保存完整词汇表",
+            defaultextension=".csv",
+            filetypes=[
+                ("CSV文件", "*.csv"),
+                ("TSV文件", "*.tsv"),
+                ("SQLite数据库", "*.sqlite *.db"),
+                ("Parquet文件", "*.parquet"),
+                ("Arrow文件", "*.arrow *.feather"),
+                ("所有文件", "*.*")
+            ]
+        )
+        if not filename:
+            return
+        try:
+            fmt = export_format(filename)
+        except ValueError as e:
+            messagebox.showerror("❌ 错误", str(e))
+            return
+        if fmt in PYARROW_FORMATS and not pyarrow_available():
+            messagebox.showerror("❌ 错误", PYARROW_REQUIRED)
+            return
+
+        self.exporting = True
+        self.export_button.config(state="disabled")
+        if job.ngram == 1:
+            self.progress_var.set("💾 正在导出完整词汇表：重新解析文件统计文档频率，耗时与一次分析相当...")
+        else:
+            self.progress_var.set("💾 正在导出完整词汇表...")
+        thread = threading.Thread(target=self.run_export, args=(job, filename))
+        thread.daemon = True
+        thread.start()
+
+    def run_export(self, job, filename):
+        """后台线程：统计完整词汇表并导出，结果交给主线程提示
+
+        单词模式下重新解析文件以同时统计文档频率；短语模式直接导出短语频次索引，不含文档频率。
+        """
+        try:
+            doc_counts = None
+            if job.ngram == 1:
+                if self.get_file_key(job.file_path) != job.file_key:
+                    raise Exception("文件在分析后已被修改，请重新分析")
+                doc_counts = Counter()
+                raw_counts, title_count = count_raw_tokens_parallel(
+                    job.file_path, fields=job.fields, dedup=self.make_deduplicator(job), doc_counts=doc_counts)
+                word_counts, _ = apply_stop_words(raw_counts, job.stop_words)
+            else:
+                index = self.ngram_index
+                if index is None or index[:2] != (job.parse_key, job.stop_words):
+                    raise Exception("短语索引已被新的分析替换，请重新分析")
+                word_counts, title_count = index[2][job.ngram], index[3]
+            metadata = {'source': job.file_path, 'fields': ','.join(job.fields), 'ngram': job.ngram,
+                        'documents': title_count}
+            row_count = export_vocabulary(word_counts, filename, doc_counts=doc_counts, metadata=metadata)
+        except Exception as e:
+            error_msg = f"导出失败: {str(e)}"
+            self.root.after(0, lambda: self.finish_export(error_msg=error_msg))
+            return
+        self.root.after(0, lambda: self.finish_export(
+            f"已导出 {row_count:,} 个{NGRAM_LABELS[job.ngram]}到:\n{filename}"))
+
+    def finish_export(self, message=None, error_msg=None):
+        """在主线程中提示导出结果，导出按钮只在这里重新启用"""
+        self.exporting = False
+        self.export_button.config(state="normal" if self.word_counts else "disabled")
+        if error_msg:
+            self.progress_var.set("❌ 导出失败")
+            messagebox.showerror("❌ 错误", error_msg)
+        else:
+            self.progress_var.set("✅ 完整词汇表已导出")
+            messagebox.showinfo("✅ 成功", message)
+
     def _save_txt(self, filename):
         """保存为文本格式"""
         with open(filename, 'w', encoding='utf-8') as f:
-            f.write("📊 RIS文件标题词频分析结果\n")
+            f.write(f"📊 RIS文件{fields_label(self.current_fields)}词频分析结果\n")
             f.write("=" * 50 + "\n\n")
             f.write(f"📅 分析时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"📋 解析标题数量: {len(self.titles):,} 个\n")
-            f.write(f"🔍 高频词汇数量: {len(self.word_counts)} 个\n")
+            f.write(f"📋 分析字段: {fields_label(self.current_fields)}\n")
+            f.write(f"📋 解析{'标题' if self.current_fields == DEFAULT_FIELDS else '文本'}数量: {self.title_count:,} 个\n")
+            f.write(f"🔍 高频{NGRAM_LABELS[self.current_ngram]}数量: {len(self.word_counts)} 个\n")
 
+            if self.dedup_summary:
+                f.write(self.dedup_summary + "\n")
             if self.custom_stop_words:
                 f.write(f"🚫 自定义停用词: {len(self.custom_stop_words)} 个\n")
 
@@ -664,16 +1112,11 @@ class RISAnalyzerGUI:
 
     def _save_csv(self, filename):
         """保存为CSV格式"""
-        import csv
-        with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Rank', 'Word', 'Frequency'])  # 使用英文标题避免乱码
-            for i, (word, count) in enumerate(self.word_counts, 1):
-                writer.writerow([i, word, count])
+        save_word_counts_csv(self.word_counts, filename)
 
     def download_chart(self):
         """下载图表为图片文件"""
-        if not hasattr(self, 'current_figure') or self.current_figure is None:
+        if self.current_figure is None:
             messagebox.showwarning("⚠️ 警告", "没有可下载的图表")
             return
 
@@ -707,10 +1150,11 @@ class RISAnalyzerGUI:
     def on_closing(self):
         """处理窗口关闭事件"""
         try:
-            # 如果有分析线程正在运行，等待其完成或强制退出
-            if self.analysis_thread and self.analysis_thread.is_alive():
-                # daemon线程会自动结束
-                pass
+            if self.watch_after_id is not None:
+                self.root.after_cancel(self.watch_after_id)
+            # 如果有分析线程正在运行，请求取消并短暂等待其退出（daemon线程不会阻止程序结束）
+            if self.cancel_jobs():
+                self.analysis_thread.join(timeout=1)
 
             # 销毁窗口并退出程序
             self.root.quit()
@@ -0,0 +1,269 @@
+import tkinter as tk
+from bisect import bisect_left
+from tkinter import ttk
+
+# 表格列：(列名, 标题, 宽度, 对齐)
+TABLE_COLUMNS = (
+    ('rank', "排名", 70, tk.E),
+    ('word', "词汇", 260, tk.W),
+    ('count', "频次", 100, tk.E),
+    ('share', "占比", 90, tk.E),
+)
+FREQUENCY_COLUMNS = ('count', 'share')  # 按这两列降序排列即按排名升序排列
+SEARCH_MODES = {'contains': "包含", 'prefix': "开头为"}
+# 输入停顿多久后执行搜索（毫秒）
+SEARCH_DELAY_MS = 120
+DEFAULT_ROW_HEIGHT = 20
+WHEEL_ROWS = 3  # 鼠标滚轮每格滚动的行数
+
+
+class VocabularyModel:
+    """完整词汇表的排序和搜索，不依赖Tk
+
+    words和counts按频次从高到低排列（即most_common的顺序），排名就是下标加1。
+    排序和搜索只产生下标列表view，不复制词和频次；按词排序的顺序第一次使用时计算并缓存。
+    """
+
+    def __init__(self, items=()):
+        self.words = [word for word, _ in items]
+        self.counts = [count for _, count in items]
+        self.total = sum(self.counts)
+        self.sort_column = 'rank'
+        self.descending = False
+        self.query = ''
+        self.mode = 'contains'
+        self._word_order = None
+        self._sorted_words = None  # 按词排序的词列表，前缀搜索时二分查找
+        self.view = range(len(self.words))
+
+    def __len__(self):
+        return len(self.view)
+
+    @property
+    def size(self):
+        return len(self.words)
+
+    def row(self, position):
+        """view中第position行的 (排名, 词, 频次, 占比)"""
+        index = self.view[position]
+        count = self.counts[index]
+        share = f"{count / self.total * 100:.3g}%" if self.total else ""
+        return index + 1, self.words[index], count, share
+
+    def sort(self, column, descending=False):
+        """按列排序：频次从高到低即排名从小到大，同频次时保持排名顺序"""
+        self.sort_column = column
+        self.descending = descending
+        self._update_view()
+
+    def search(self, query, mode='contains'):
+        """只显示包含query（mode为'prefix'时以query开头）的词，query为空时显示全部"""
+        query = query.strip().lower()
+        narrowing = (mode == self.mode == 'contains' and self.query and query.startswith(self.query)
+                     and query != self.query)
+        previous = self.view
+        self.query, self.mode = query, mode
+        if narrowing:
+            # 继续输入时只在上一次的结果中查找，排序不变
+            words = self.words
+            self.view = [index for index in previous if query in words[index]]
+        else:
+            self._update_view()
+
+    def _base_order(self):
+        if self.sort_column == 'word':
+            return self._get_word_order()
+        # 排名升序等于频次降序
+        return range(len(self.words))
+
+    def _update_view(self):
+        reverse = self.descending != (self.sort_column in FREQUENCY_COLUMNS)
+        if self.query and self.mode == 'prefix':
+            matches = self._prefix_matches(self.query)
+            if self.sort_column != 'word':
+                matches.sort()
+            view = matches
+        elif self.query:
+            words, query = self.words, self.query
+            view = [index for index in self._base_order() if query in words[index]]
+        else:
+            view = self._base_order()
+        if reverse:
+            view = view[::-1]
+        self.view = view
+
+    def _get_word_order(self):
+        if self._word_order is None:
+            self._word_order = sorted(range(len(self.words)), key=self.words.__getitem__)
+        return self._word_order
+
+    def _prefix_matches(self, prefix):
+        """按词排序的顺序中以prefix开头的词是连续的一段，二分查找两端"""
+        order = self._get_word_order()
+        if self._sorted_words is None:
+            self._sorted_words = [self.words[index] for index in order]
+        start = bisect_left(self._sorted_words, prefix)
+        end = bisect_left(self._sorted_words, prefix + '\U0010ffff', start)
+        return order[start:end]
+
+
+class VocabularyTable(ttk.Frame):
+    """虚拟化的词汇表格：Treeview中只保留可见的几十行，滚动时按需填充
+
+    可容纳数十万个词，支持按列排序（点击列标题）和即时搜索。
+    """
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.model = VocabularyModel()
+        self.first = 0  # 可见区域第一行在view中的位置
+        self.visible_rows = 1
+        self.selected_word = None
+        self.word_label = "词汇"
+        self._search_after_id = None
+
+        search_frame = ttk.Frame(self)
+        search_frame.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(search_frame, text="🔎 搜索:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add('write', lambda *_: self._schedule_search())
+        ttk.Entry(search_frame, textvariable=self.search_var, width=24).pack(side=tk.LEFT, padx=(5, 5))
+        self.mode_var = tk.StringVar(value=SEARCH_MODES['contains'])
+        mode_combobox = ttk.Combobox(search_frame, textvariable=self.mode_var, state='readonly', width=6,
+                                     values=list(SEARCH_MODES.values()))
+        mode_combobox.pack(side=tk.LEFT)
+        mode_combobox.bind('<<ComboboxSelected>>', lambda event: self.apply_search())
+        self.match_var = tk.StringVar()
+        ttk.Label(search_frame, textvariable=self.match_var).pack(side=tk.RIGHT)
+
+        table_frame = ttk.Frame(self)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(table_frame, columns=[name for name, *_ in TABLE_COLUMNS], show='headings',
+                                 selectmode='browse')
+        for name, title, width, anchor in TABLE_COLUMNS:
+            self.tree.heading(name, text=title, command=lambda column=name: self.toggle_sort(column))
+            self.tree.column(name, width=width, anchor=anchor, stretch=name == 'word')
+        self.scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<MouseWheel>', lambda event: self.scroll_by(-WHEEL_ROWS if event.delta > 0 else WHEEL_ROWS))
+        self.tree.bind('<Button-4>', lambda event: self.scroll_by(-WHEEL_ROWS))
+        self.tree.bind('<Button-5>', lambda event: self.scroll_by(WHEEL_ROWS))
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        for key, rows in (('<Up>', -1), ('<Down>', 1)):
+            self.tree.bind(key, lambda event, rows=rows: self.move_selection(rows))
+        for key, pages in (('<Prior>', -1), ('<Next>', 1)):
+            self.tree.bind(key, lambda event, pages=pages: self.scroll_by(pages * self.visible_rows) or 'break')
+        self.tree.bind('<Home>', lambda event: self.scroll_to(0) or 'break')
+        self.tree.bind('<End>', lambda event: self.scroll_to(len(self.model)) or 'break')
+        self.update_headings()
+
+    def set_items(self, items, word_label="词汇"):
+        """显示新的词汇表（(词, 频次) 列表，按频次从高到低），保留当前的排序和搜索条件"""
+        model = VocabularyModel(items)
+        model.sort_column, model.descending = self.model.sort_column, self.model.descending
+        self.model = model
+        self.word_label = word_label
+        self.selected_word = None
+        self.update_headings()
+        self.apply_search()
+
+    def clear(self):
+        self.set_items([])
+
+    def toggle_sort(self, column):
+        """点击列标题：同一列再次点击时反转顺序"""
+        descending = not self.model.descending if column == self.model.sort_column else column in FREQUENCY_COLUMNS
+        self.model.sort(column, descending)
+        self.first = 0
+        self.update_headings()
+        self.refresh()
+
+    def update_headings(self):
+        """列标题上用箭头标出当前的排序列和方向"""
+        for name, title, *_ in TABLE_COLUMNS:
+            if name == 'word':
+                title = self.word_label
+            if name == self.model.sort_column:
+                title += " ▼" if self.model.descending else " ▲"
+            self.tree.heading(name, text=title)
+
+    def _schedule_search(self):
+        if self._search_after_id is not None:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(SEARCH_DELAY_MS, self.apply_search)
+
+    def apply_search(self):
+        self._search_after_id = None
+        mode = next((key for key, label in SEARCH_MODES.items() if label == self.mode_var.get()), 'contains')
+        self.model.search(self.search_var.get(), mode)
+        self.first = 0
+        self.refresh()
+
+    def on_resize(self, event):
+        row_height = ttk.Style().lookup('Treeview', 'rowheight') or DEFAULT_ROW_HEIGHT
+        # 减去一行列标题，最后一行不会被遮住
+        rows = max(1, int(event.height) // int(row_height) - 1)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.refresh()
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(amount) * len(self.model)))
+        elif unit == 'pages':
+            self.scroll_by(int(amount) * self.visible_rows)
+        else:
+            self.scroll_by(int(amount))
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.first + rows)
+
+    def scroll_to(self, first):
+        first = max(0, min(first, len(self.model) - self.visible_rows))
+        if first != self.first:
+            self.first = first
+            self.refresh()
+
+    def refresh(self):
+        """用view中可见的几行重新填充Treeview"""
+        model = self.model
+        self.first = max(0, min(self.first, len(model) - self.visible_rows))
+        self.tree.delete(*self.tree.get_children())
+        last = min(len(model), self.first + self.visible_rows)
+        for position in range(self.first, last):
+            values = model.row(position)
+            item = self.tree.insert('', tk.END, iid=str(position), values=values)
+            if values[1] == self.selected_word:
+                self.tree.selection_set(item)
+        if len(model):
+            self.scrollbar.set(self.first / len(model), last / len(model))
+        else:
+            self.scrollbar.set(0, 1)
+        if model.query:
+            self.match_var.set(f"匹配 {len(model):,} / {model.size:,}")
+        else:
+            self.match_var.set(f"共 {model.size:,} 个")
+
+    def on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            self.selected_word = self.tree.set(selection[0], 'word')
+
+    def move_selection(self, rows):
+        """上下方向键移动选中行，到达可见区域边缘时滚动"""
+        if not len(self.model):
+            return 'break'
+        selection = self.tree.selection()
+        position = int(selection[0]) + rows if selection else self.first
+        position = max(0, min(position, len(self.model) - 1))
+        if position < self.first:
+            self.scroll_to(position)
+        elif position >= self.first + self.visible_rows:
+            self.scroll_to(position - self.visible_rows + 1)
+        self.selected_word = self.model.row(position)[1]
+        self.tree.selection_set(str(position))
+        self.tree.focus(str(position))
+        return 'break'